@@ -0,0 +1 @@
+"""Benchmark suites for md_dataset, run with `python -m md_dataset.bench.<suite>`."""
@@ -0,0 +1,145 @@
+"""The md-dataset-bench command.
+
+    md-dataset-bench flow --flow md_dataset.bench.flows:passthrough --features 10000 --samples 48
+    md-dataset-bench storage --sizes xs s m --output storage.json
+
+`flow` generates a synthetic input dataset, runs an md_py or md_r flow on it
+end to end against local storage and prints a phase by phase report. The
+other commands run the benchmark suites.
+"""
+
+from __future__ import annotations
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from md_dataset.telemetry.resources import format_bytes
+
+SUITES = {
+    "storage": "md_dataset.bench.storage",
+    "models": "md_dataset.bench.models",
+    "r-bridge": "md_dataset.bench.r_bridge",
+    "r-convert": "md_dataset.bench.r_convert",
+    "memory": "md_dataset.bench.memory",
+    "imports": "md_dataset.bench.imports",
+}
+
+DEFAULT_FLOW = "md_dataset.bench.flows:passthrough"
+
+
+def load_flow(path: str):  # noqa: ANN201
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def span_summary(otlp: dict) -> list[dict]:
+    """Total the duration, bytes and rows of the spans in an OTLP/JSON trace by span name."""
+    totals = defaultdict(lambda: {"count": 0, "seconds": 0.0, "bytes": 0, "rows": 0})
+    for resource_spans in otlp["resourceSpans"]:
+        for scope_spans in resource_spans["scopeSpans"]:
+            for span in scope_spans["spans"]:
+                total = totals[span["name"]]
+                total["count"] += 1
+                total["seconds"] += (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e9
+                for attribute in span["attributes"]:
+                    if attribute["key"] in ("bytes", "rows") and "intValue" in attribute["value"]:
+                        total[attribute["key"]] += int(attribute["value"]["intValue"])
+    return [{"name": name, **total} for name, total in totals.items()]
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Run {report['run_id']}: {report['tables']} tables written", "",
+             f"{'phase':<16} {'wall':>10} {'cpu':>10} {'peak rss':>12} {'read':>12} {'written':>12}"]
+    lines.extend(
+        f"{phase['phase']:<16} {phase['wall_seconds']:>9.3f}s {phase['cpu_seconds']:>9.3f}s "
+        f"{format_bytes(phase['peak_rss_bytes']):>12} {format_bytes(phase['read_bytes']):>12} "
+        f"{format_bytes(phase['written_bytes']):>12}" for phase in report["resource_usage"]["phases"])
+    lines.append(f"{'process peak':<16} {'':>21} {format_bytes(report['resource_usage']['peak_rss_bytes']):>12}")
+    if report["spans"]:
+        lines.extend(["", f"{'span':<16} {'count':>6} {'total':>10} {'bytes':>12} {'rows':>12}"])
+        lines.extend(
+            f"{span['name']:<16} {span['count']:>6} {span['seconds']:>9.3f}s {format_bytes(span['bytes']):>12} "
+            f"{span['rows']:>12}" for span in report["spans"])
+    return "\n".join(lines)
+
+
+def run_flow(args: argparse.Namespace, storage_dir: str) -> dict:
+    # The flow reads and writes local storage and keeps Prefect results local
+    os.environ["LOCAL_STORAGE_DIR"] = storage_dir
+    os.environ.pop("RESULTS_BUCKET", None)
+    os.environ.setdefault("TRACE_EXPORTERS", "otel")
+
+    from md_dataset.bench.synthetic import SyntheticConfig
+    from md_dataset.bench.synthetic import write_input_dataset
+    from md_dataset.models.dataset import DatasetType
+    from md_dataset.storage import get_file_manager
+
+    file_manager = get_file_manager()
+    config = SyntheticConfig(
+        features=args.features,
+        samples=args.samples,
+        entities=tuple(args.entities),
+        missing_fraction=args.missing_fraction,
+        id_cardinality=args.id_cardinality,
+        seed=args.seed,
+    )
+    input_dataset = write_input_dataset(file_manager, config)
+    flow = load_flow(args.flow)
+
+    result = flow(input_datasets=[input_dataset], params=json.loads(args.params), \
+            output_dataset_type=DatasetType(args.output_dataset_type))
+
+    run_id = result["run_id"]
+    trace = file_manager.load_bytes(f"job_runs/{run_id}/trace.json")
+    return {
+        "run_id": str(run_id),
+        "flow": args.flow,
+        "config": config._asdict(),
+        "tables": len(result["tables"]),
+        "resource_usage": json.loads(file_manager.load_bytes(f"job_runs/{run_id}/resource_usage.json")),
+        "spans": span_summary(json.loads(trace)) if trace is not None else [],
+    }
+
+
+def flow_command(args: argparse.Namespace) -> None:
+    if args.storage_dir:
+        report = run_flow(args, args.storage_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="md-dataset-bench-") as storage_dir:
+            report = run_flow(args, storage_dir)
+
+    print(format_report(report))  # noqa: T201
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUITES:
+        importlib.import_module(SUITES[argv[0]]).main(argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(prog="md-dataset-bench", description="Benchmark md_dataset flows")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in SUITES:
+        subparsers.add_parser(name, help=f"Run the {name} benchmark suite, see {name} --help")
+
+    flow_parser = subparsers.add_parser("flow", help="Run a flow end to end on a synthetic dataset")
+    flow_parser.add_argument("--flow", default=DEFAULT_FLOW, help="module:attribute of an md_py or md_r flow")
+    flow_parser.add_argument("--params", default="{}", help="Flow params as JSON")
+    flow_parser.add_argument("--output-dataset-type", default="INTENSITY")
+    flow_parser.add_argument("--features", type=int, default=2_000)
+    flow_parser.add_argument("--samples", type=int, default=12)
+    flow_parser.add_argument("--entities", nargs="+", default=["Protein"])
+    flow_parser.add_argument("--missing-fraction", type=float, default=0.2)
+    flow_parser.add_argument("--id-cardinality", type=int, help="Distinct protein ids, default one per feature")
+    flow_parser.add_argument("--seed", type=int, default=0)
+    flow_parser.add_argument("--storage-dir", help="Keep inputs and outputs in this directory")
+    flow_parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    flow_command(args)
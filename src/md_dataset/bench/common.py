@@ -0,0 +1,133 @@
+"""Timing, reporting and result files shared by the benchmark suites."""
+
+from __future__ import annotations
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import UTC
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+import numpy as np
+from md_dataset.telemetry import ResourceSampler
+from md_dataset.telemetry.resources import format_bytes
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# RSS sampling interval while a case runs
+SAMPLER_INTERVAL = 0.005
+
+PERCENTILES = (50, 90, 99)
+
+
+def run_case(  # noqa: PLR0913
+    name: str,
+    func: Callable[[], Any],
+    data_bytes: int,
+    repeat: int = 5,
+    warmup: int = 1,
+    params: dict | None = None,
+) -> dict:
+    """Time repeated calls of a function and record the peak RSS above the starting point.
+
+    Args:
+        name: The operation being measured
+        func: Called once per repetition
+        data_bytes: In-memory size of the data the operation handles, for throughput
+        repeat: Timed repetitions
+        warmup: Untimed repetitions run first
+        params: Describe the case, e.g. the table shape
+
+    Returns:
+        The case result
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    with ResourceSampler(interval=SAMPLER_INTERVAL) as sampler, sampler.phase(name):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - start)
+    usage = sampler.phases[0]
+
+    return {
+        "name": name,
+        "params": params or {},
+        "data_bytes": data_bytes,
+        "repeat": repeat,
+        "latency_seconds": latency_summary(latencies),
+        "throughput_mb_per_second": data_bytes / 1e6 / float(np.median(latencies)),
+        "peak_rss_delta_bytes": usage.peak_rss_bytes - usage.start_rss_bytes,
+    }
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    summary = {"min": min(latencies), "mean": float(np.mean(latencies)), "max": max(latencies)}
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}"] = float(np.percentile(latencies, percentile))
+    return summary
+
+
+def environment() -> dict:
+    """Describe where results were produced, so runs can be compared over time."""
+    versions = {}
+    for package in ("md_dataset", "pandas", "pyarrow", "numpy", "pydantic", "rpy2"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "git_commit": _git_commit(),
+        "packages": versions,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str | Path, suite: str, results: list[dict]) -> None:
+    """Write a suite's results with the environment they were produced in."""
+    report = {
+        "suite": suite,
+        "created_at": datetime.now(UTC).isoformat(),
+        "environment": environment(),
+        "results": results,
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+
+
+def format_results(results: list[dict]) -> str:
+    """Render results as a fixed width table."""
+    lines = [f"{'case':<60} {'p50':>10} {'p90':>10} {'p99':>10} {'MB/s':>10} {'peak rss':>12}"]
+    for result in results:
+        labels = "/".join(value if isinstance(value, str) else f"{key}={value}" \
+                for key, value in result["params"].items() if not key.endswith("bytes"))
+        latency = result["latency_seconds"]
+        lines.append(
+            f"{result['name'] + ' ' + labels:<60} {latency['p50']:>9.4f}s {latency['p90']:>9.4f}s "
+            f"{latency['p99']:>9.4f}s {result['throughput_mb_per_second']:>10.1f} "
+            f"{format_bytes(peak) if (peak := result['peak_rss_delta_bytes']) is not None else '-':>12}",
+        )
+    return "\n".join(lines)
@@ -0,0 +1,87 @@
+"""Proteomics shaped tables for benchmarks.
+
+Intensity tables are long format, one row per feature and sample, with the
+columns and nullable dtypes of the intensity datasets the platform produces.
+"""
+
+from __future__ import annotations
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+
+class TableShape(NamedTuple):
+    features: int
+    samples: int
+
+    @property
+    def rows(self) -> int:
+        return self.features * self.samples
+
+
+# From a few KB up to several GB in memory, long format rows = features * samples
+SIZES = {
+    "xs": TableShape(features=100, samples=6),
+    "s": TableShape(features=2_000, samples=12),
+    "m": TableShape(features=10_000, samples=48),
+    "l": TableShape(features=10_000, samples=500),
+    "xl": TableShape(features=100_000, samples=500),
+}
+
+DEFAULT_SIZES = ("xs", "s", "m")
+
+
+def intensity_frame(shape: TableShape, seed: int = 0, missing_fraction: float = 0.0) -> pd.DataFrame:
+    """A long format intensity table of `shape.features` features measured in `shape.samples` samples.
+
+    Args:
+        shape: Features and samples
+        seed: Seeds the random intensities
+        missing_fraction: Fraction of intensities left missing, as unobserved features are
+
+    Returns:
+        The intensity table
+    """
+    rng = np.random.default_rng(seed)
+    group_ids = np.repeat(np.arange(1, shape.features + 1), shape.samples)
+    replicates = np.tile(np.arange(1, shape.samples + 1), shape.features)
+    conditions = np.array([f"condition_{i}" for i in range(max(1, shape.samples // 3))])
+    intensity = pd.array(rng.lognormal(mean=10, sigma=2, size=shape.rows), dtype="Float64")
+    if missing_fraction > 0:
+        intensity[rng.random(shape.rows) < missing_fraction] = pd.NA
+    return pd.DataFrame({
+        "GroupId": pd.array(group_ids, dtype="Int64"),
+        "NormalisedIntensity": intensity,
+        "Imputed": pd.array(rng.integers(0, 2, size=shape.rows), dtype="Int64"),
+        "replicate": (replicates).astype(str),
+        "condition": pd.array(conditions[(replicates - 1) % len(conditions)], dtype="string"),
+    })
+
+
+def metadata_frame(shape: TableShape, seed: int = 0, id_cardinality: int | None = None) -> pd.DataFrame:
+    """The metadata table matching an intensity table of the same shape.
+
+    Args:
+        shape: Features and samples
+        seed: Seeds the random identifiers
+        id_cardinality: Distinct ProteinIds and GeneNames, fewer than features
+            when several features map to the same protein, default one per feature
+
+    Returns:
+        The metadata table
+    """
+    rng = np.random.default_rng(seed)
+    labels = [f"P{value:06d}" for value in rng.choice(10 * shape.features, shape.features, replace=False)]
+    ids = rng.integers(0, id_cardinality, size=shape.features) if id_cardinality else np.arange(shape.features)
+    return pd.DataFrame({
+        "GroupId": pd.array(np.arange(1, shape.features + 1), dtype="Int64"),
+        "GroupLabel": pd.array(labels, dtype="string"),
+        "GroupLabelType": pd.array(["ProteinAccession"] * shape.features, dtype="string"),
+        "ProteinIds": pd.array([f"Q{value:06d}" for value in ids], dtype="string"),
+        "GeneNames": pd.array([f"GENE{value}" for value in ids], dtype="string"),
+        "Description": pd.array([f"Protein {label} description" for label in labels], dtype="string"),
+    })
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
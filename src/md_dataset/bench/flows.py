@@ -0,0 +1,21 @@
+"""Flows for measuring the flow machinery with md-dataset-bench."""
+
+from md_dataset.models.dataset import DatasetType
+from md_dataset.models.dataset import InputParams
+from md_dataset.models.dataset import IntensityData
+from md_dataset.models.dataset import IntensityEntity
+from md_dataset.models.dataset import IntensityInputDataset
+from md_dataset.models.dataset import IntensityTable
+from md_dataset.models.dataset import IntensityTableType
+from md_dataset.process import md_py
+
+
+@md_py
+def passthrough(input_datasets: list[IntensityInputDataset], params: InputParams, \
+        output_dataset_type: DatasetType) -> list[IntensityData]:  # noqa: ARG001
+    """Return the intensity and metadata tables of every entity unchanged."""
+    dataset = input_datasets[0]
+    table_types = (IntensityTableType.INTENSITY, IntensityTableType.METADATA)
+    return [IntensityData(entity=entity, tables=[IntensityTable(type=table_type, \
+                data=dataset.table(table_type, entity).data) for table_type in table_types]) \
+            for entity in IntensityEntity if dataset.table(IntensityTableType.INTENSITY, entity) is not None]
@@ -0,0 +1,150 @@
+"""Benchmarks for the cold start of flow modules.
+
+    python -m md_dataset.bench.imports --flows 1 5 20 --output imports.json
+
+Writes a module defining md_py, md_r and md_upload flows and imports it in a
+fresh interpreter per repetition, as a deployment does before a flow runs.
+RESULTS_BUCKET is set so that the flows have result storage. Besides the
+timings, each result records the import time Python reports for the module
+and the heavy packages it loaded.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from md_dataset.bench.common import format_results
+from md_dataset.bench.common import latency_summary
+from md_dataset.bench.common import write_results
+
+DEFAULT_FLOWS = (1, 5, 20)
+DECORATORS = ("md_py", "md_r", "md_upload")
+MODULE_NAME = "bench_flows"
+
+# Packages a flow module should not need to import
+HEAVY_PACKAGES = ("boto3", "prefect_aws", "rpy2", "pyarrow.parquet")
+
+FLOW_TEMPLATES = {
+    "md_py": """
+@md_py
+def flow_{index}(input_datasets: list, params: InputParams, output_dataset_type: DatasetType) -> dict:
+    return {{}}
+""",
+    "md_r": """
+@md_r(r_file="flows.R", r_function="flow_{index}")
+def flow_{index}(input_datasets: list, params: InputParams, output_dataset_type: DatasetType) -> RFuncArgs:
+    return RFuncArgs(data_frames=[])
+""",
+    "md_upload": """
+@md_upload
+def flow_{index}(experiment_id: UUID, params: InputParams) -> dict:
+    return {{}}
+""",
+}
+
+MODULE_HEADER = """from uuid import UUID
+from md_dataset.models.dataset import DatasetType
+from md_dataset.models.dataset import InputParams
+from md_dataset.models.r import RFuncArgs
+from md_dataset.process import md_py
+from md_dataset.process import md_r
+from md_dataset.process import md_upload
+"""
+
+IMPORT_CODE = """import json, sys
+import {module}
+print(json.dumps(sorted(name for name in {heavy!r} if name in sys.modules)))
+"""
+
+
+def flow_module(flows: int) -> str:
+    """The source of a module defining `flows` flows, taking turns with each decorator."""
+    return MODULE_HEADER + "".join(FLOW_TEMPLATES[DECORATORS[index % len(DECORATORS)]].format(index=index) \
+            for index in range(flows))
+
+
+def import_module(directory: Path, env: dict) -> tuple[float, float, list[str]]:
+    """Import the flow module in a fresh interpreter.
+
+    Returns:
+        The wall seconds of the interpreter, the cumulative import seconds of the module and the
+        heavy packages it loaded
+    """
+    start = time.perf_counter()
+    process = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", IMPORT_CODE.format(module=MODULE_NAME, heavy=HEAVY_PACKAGES)],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=directory,
+        env=env,
+    )
+    seconds = time.perf_counter() - start
+    return seconds, module_import_seconds(process.stderr, MODULE_NAME), json.loads(process.stdout.splitlines()[-1])
+
+
+def module_import_seconds(importtime: str, module: str) -> float:
+    """The cumulative import seconds of a module in `python -X importtime` output."""
+    for line in importtime.splitlines():
+        fields = [field.strip() for field in line.removeprefix("import time:").split("|")]
+        if len(fields) == 3 and fields[2] == module:  # noqa: PLR2004
+            return int(fields[1]) / 1e6
+    msg = f"{module} not in the import times"
+    raise ValueError(msg)
+
+
+def run(flows: list[int], repeat: int, results_bucket: str) -> list[dict]:
+    env = {**os.environ, "RESULTS_BUCKET": results_bucket, "PYTHONPATH": os.pathsep.join(sys.path)}
+    env.pop("BOTO3_PROFILE", None)
+    results = []
+    for count in flows:
+        with tempfile.TemporaryDirectory(prefix="md-bench-imports-") as directory:
+            (Path(directory) / f"{MODULE_NAME}.py").write_text(flow_module(count))
+            # The first import writes the bytecode cache, which a deployed image already has
+            import_module(Path(directory), env)
+            runs = [import_module(Path(directory), env) for _ in range(repeat)]
+        latencies = [seconds for seconds, _, _ in runs]
+        results.append({
+            "name": "import_flows",
+            "params": {"flows": count},
+            "data_bytes": 0,
+            "repeat": repeat,
+            "latency_seconds": latency_summary(latencies),
+            "throughput_mb_per_second": 0.0,
+            "peak_rss_delta_bytes": None,
+            "module_import_seconds": latency_summary([seconds for _, seconds, _ in runs]),
+            "heavy_packages": runs[-1][2],
+        })
+    return results
+
+
+def format_imports(results: list[dict]) -> str:
+    lines = [f"{'case':<30} {'module p50':>12} heavy packages"]
+    lines.extend(f"{'import_flows flows=' + str(result['params']['flows']):<30} "
+                 f"{result['module_import_seconds']['p50']:>11.4f}s {', '.join(result['heavy_packages']) or '-'}"
+                 for result in results)
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the cold import of modules defining flows")
+    parser.add_argument("--flows", nargs="+", type=int, default=list(DEFAULT_FLOWS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--results-bucket", default="md-bench-results")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.flows, args.repeat, args.results_bucket)
+    print(format_results(results))  # noqa: T201
+    print(format_imports(results))  # noqa: T201
+    if args.output:
+        write_results(args.output, "imports", results)
+
+
+if __name__ == "__main__":
+    main()
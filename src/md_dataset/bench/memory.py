@@ -0,0 +1,182 @@
+"""Peak memory benchmarks for the load, build and save path.
+
+    python -m md_dataset.bench.memory --sizes s m --output memory.json --baseline previous.json
+
+Allocations are traced with tracemalloc, which sees Python objects and numpy
+buffers, while Arrow buffers are sampled from the Arrow memory pool. The peak
+of each operation is reported against the in-memory size of the data it
+handles. A ratio well above 1 means the operation holds copies of the data.
+With --baseline the ratios are compared with an earlier result file, and the
+command fails when one grew by more than the tolerance.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+from uuid import uuid4
+import pyarrow as pa
+from md_dataset.bench.common import write_results
+from md_dataset.bench.data import DEFAULT_SIZES
+from md_dataset.bench.data import SIZES
+from md_dataset.bench.data import frame_bytes
+from md_dataset.bench.data import intensity_frame
+from md_dataset.bench.data import metadata_frame
+from md_dataset.storage.file_manager import FileManager
+from md_dataset.storage.local import MemoryS3Client
+from md_dataset.telemetry.resources import format_bytes
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    import pandas as pd
+
+BUCKET = "bench"
+# Seconds between samples of the Arrow memory pool
+ARROW_SAMPLE_INTERVAL = 0.001
+
+CASES = ("load_parquet_to_df", "populate_tables", "save_df_to_parquet", "save_df_to_csv", "run_r_task")
+DEFAULT_CASES = CASES[:4]
+DEFAULT_TOLERANCE = 0.1
+
+
+def measure_peak(func: Callable[[], object]) -> dict:
+    """Peak bytes allocated while `func` runs, above what was allocated before it started."""
+    arrow_start = pa.total_allocated_bytes()
+    arrow_peak = [0]
+    stop = threading.Event()
+
+    def sample_arrow() -> None:
+        while not stop.wait(ARROW_SAMPLE_INTERVAL):
+            arrow_peak[0] = max(arrow_peak[0], pa.total_allocated_bytes() - arrow_start)
+
+    sampler = threading.Thread(target=sample_arrow, name="md-arrow-sampler", daemon=True)
+    tracemalloc.start()
+    sampler.start()
+    try:
+        result = func()
+        arrow_peak[0] = max(arrow_peak[0], pa.total_allocated_bytes() - arrow_start)
+        del result
+    finally:
+        stop.set()
+        sampler.join()
+        _, python_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"python_peak_bytes": python_peak, "arrow_peak_bytes": arrow_peak[0], \
+            "peak_bytes": python_peak + arrow_peak[0]}
+
+
+def _populate_tables(file_manager: FileManager, keys: dict[str, str]) -> Callable[[], object]:
+    from md_dataset.models.dataset import InputDatasetTable
+    from md_dataset.models.dataset import IntensityInputDataset
+
+    def populate() -> object:
+        dataset = IntensityInputDataset(id=uuid4(), name="bench", tables=[
+                InputDatasetTable(name=name, bucket=BUCKET, key=key) for name, key in keys.items()])
+        return dataset.populate_tables(file_manager)
+
+    return populate
+
+
+def _run_r_task(frames: list[pd.DataFrame], directory: str) -> Callable[[], object]:
+    from md_dataset.bench.r_bridge import IDENTITY_R
+    from md_dataset.models.r import RFuncArgs
+    from md_dataset.process import run_r_task
+
+    r_file = Path(directory) / "identity.r"
+    r_file.write_text(IDENTITY_R)
+    r_args = RFuncArgs(data_frames=frames)
+    return lambda: run_r_task(str(r_file), "identity_frames", r_args)
+
+
+def run(cases: list[str], sizes: list[str]) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            shape = SIZES[size]
+            intensity = intensity_frame(shape)
+            metadata = metadata_frame(shape)
+            file_manager = FileManager(MemoryS3Client(), default_bucket=BUCKET)
+            keys = {"Protein_Intensity": "bench/Protein_Intensity.parquet", \
+                    "Protein_Metadata": "bench/Protein_Metadata.parquet"}
+            file_manager.save_df_to_parquet(df=intensity, path=keys["Protein_Intensity"])
+            file_manager.save_df_to_parquet(df=metadata, path=keys["Protein_Metadata"])
+
+            for case in cases:
+                if case == "load_parquet_to_df":
+                    func = partial(file_manager.load_parquet_to_df, bucket=BUCKET, key=keys["Protein_Intensity"])
+                    data_bytes = frame_bytes(intensity)
+                elif case == "save_df_to_parquet":
+                    func = partial(file_manager.save_df_to_parquet, df=intensity, path="out.parquet")
+                    data_bytes = frame_bytes(intensity)
+                elif case == "save_df_to_csv":
+                    func = partial(file_manager.save_df_to_csv, df=intensity, path="out.csv")
+                    data_bytes = frame_bytes(intensity)
+                elif case == "populate_tables":
+                    func = _populate_tables(file_manager, keys)
+                    data_bytes = frame_bytes(intensity) + frame_bytes(metadata)
+                else:
+                    func = _run_r_task([intensity, metadata], directory)
+                    data_bytes = frame_bytes(intensity) + frame_bytes(metadata)
+                func()  # warm up imports and caches outside of the trace
+                peak = measure_peak(func)
+                results.append({
+                    "name": case,
+                    "params": {"size": size, "rows": shape.rows},
+                    "data_bytes": data_bytes,
+                    **peak,
+                    "peak_ratio": peak["peak_bytes"] / data_bytes,
+                })
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Describe every case whose peak ratio grew by more than `tolerance` over the baseline."""
+    previous = {(result["name"], result["params"]["size"]): result["peak_ratio"] for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["params"]["size"]))
+        if before is not None and result["peak_ratio"] > before * (1 + tolerance):
+            regressions.append(f"{result['name']} {result['params']['size']}: peak ratio "
+                               f"{before:.2f} -> {result['peak_ratio']:.2f}")
+    return regressions
+
+
+def format_results(results: list[dict]) -> str:
+    lines = [f"{'case':<28} {'data':>12} {'python peak':>12} {'arrow peak':>12} {'ratio':>8}"]
+    lines.extend(
+        f"{result['name'] + ' ' + result['params']['size']:<28} {format_bytes(result['data_bytes']):>12} "
+        f"{format_bytes(result['python_peak_bytes']):>12} {format_bytes(result['arrow_peak_bytes']):>12} "
+        f"{result['peak_ratio']:>8.2f}" for result in results)
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark peak memory of loads, builds and saves")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(DEFAULT_CASES))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare peak ratios with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, \
+            help="Relative peak ratio growth over the baseline reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.cases, args.sizes)
+    print(format_results(results))  # noqa: T201
+    if args.output:
+        write_results(args.output, "memory", results)
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text())["results"], args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")  # noqa: T201
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmarks for Dataset construction, validation, tables() and dump().
+
+    python -m md_dataset.bench.models --sizes xs s --entities 1 10 100 500 --output models.json
+
+Every dataset type is built through `create_dataset_from_run`. Intensity
+datasets are measured with increasing numbers of IntensityData entries, the
+others with every table field set, at increasing table sizes. Each result
+records how many tables came back from tables() as a different object than
+the frame passed in, i.e. copies made by the model layer.
+"""
+
+from __future__ import annotations
+import argparse
+import uuid
+from itertools import cycle
+from typing import TYPE_CHECKING
+from md_dataset.bench.common import format_results
+from md_dataset.bench.common import run_case
+from md_dataset.bench.common import write_results
+from md_dataset.bench.data import DEFAULT_SIZES
+from md_dataset.bench.data import SIZES
+from md_dataset.bench.data import frame_bytes
+from md_dataset.bench.data import intensity_frame
+from md_dataset.bench.data import metadata_frame
+from md_dataset.models.dataset import DatasetType
+from md_dataset.models.dataset import IntensityData
+from md_dataset.models.dataset import IntensityEntity
+from md_dataset.models.dataset import IntensityTable
+from md_dataset.models.dataset import IntensityTableType
+from md_dataset.models.dataset import to_pascal
+from md_dataset.models.factory import create_dataset_from_run
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from md_dataset.models.dataset import Dataset
+
+# Every table field of the dict based dataset types
+DATASET_FIELDS = {
+    DatasetType.INTENSITY: ["intensity", "metadata", "runtime_metadata"],
+    DatasetType.PAIRWISE: ["results", "runtime_metadata"],
+    DatasetType.ANOVA: ["results", "runtime_metadata"],
+    DatasetType.DOSE_RESPONSE: ["output_curves", "output_volcanoes", "input_drc", "runtime_metadata"],
+    DatasetType.DOSE_RESPONSE_COMPARE: ["output_comparisons", "output_curves", "input_drc", "runtime_metadata"],
+    DatasetType.ENRICHMENT: ["results", "runtime_metadata", "database_metadata"],
+    DatasetType.ORA: ["results", "runtime_metadata", "database_metadata"],
+    DatasetType.WGCNA: ["module_assignments", "module_eigenentities", "module_membership",
+                        "module_trait_correlation", "soft_threshold", "runtime_metadata"],
+    DatasetType.MOFA: ["factor_scores", "factor_loadings", "variance_explained",
+                       "factor_metadata_association", "runtime_metadata"],
+}
+
+DEFAULT_ENTITIES = (1, 10, 100)
+
+
+def intensity_tables(entities: int, intensity: pd.DataFrame, metadata: pd.DataFrame) -> list[IntensityData]:
+    """IntensityData entries sharing the same frames, cycling through the entity types."""
+    return [IntensityData(entity=entity, tables=[
+                IntensityTable(type=IntensityTableType.INTENSITY, data=intensity),
+                IntensityTable(type=IntensityTableType.METADATA, data=metadata),
+            ]) for entity, _ in zip(cycle(IntensityEntity), range(entities), strict=False)]
+
+
+def copies(tables: list[tuple[str, pd.DataFrame]], inputs: list[pd.DataFrame]) -> int:
+    """Count the tables that are not one of the input frames."""
+    input_ids = {id(frame) for frame in inputs}
+    return sum(id(data) not in input_ids for _, data in tables)
+
+
+def _measure(  # noqa: PLR0913
+    dataset_type: DatasetType,
+    tables: dict | list,
+    inputs: list[pd.DataFrame],
+    data_bytes: int,
+    repeat: int,
+    params: dict,
+) -> list[dict]:
+    def build() -> Dataset:
+        return create_dataset_from_run(run_id=uuid.uuid4(), dataset_type=dataset_type, tables=tables)
+
+    def dump() -> dict:
+        dataset._dump_cache = None  # noqa: SLF001
+        return dataset.dump()
+
+    def build_tables_dump() -> dict:
+        built = build()
+        built.tables()
+        return built.dump()
+
+    dataset = build()
+    params = {**params, "tables": len(dataset.tables()), "copies": copies(dataset.tables(), inputs)}
+    return [
+        run_case("build", build, data_bytes, repeat, params=params),
+        run_case("tables", dataset.tables, data_bytes, repeat, params=params),
+        run_case("dump", dump, data_bytes, repeat, params=params),
+        run_case("build_tables_dump", build_tables_dump, data_bytes, repeat, params=params),
+    ]
+
+
+def run(sizes: list[str], entities: list[int], repeat: int) -> list[dict]:
+    results = []
+    for size in sizes:
+        shape = SIZES[size]
+        intensity = intensity_frame(shape)
+        metadata = metadata_frame(shape)
+        for count in entities:
+            results.extend(_measure(DatasetType.INTENSITY, intensity_tables(count, intensity, metadata), \
+                    [intensity, metadata], count * (frame_bytes(intensity) + frame_bytes(metadata)), repeat, \
+                    {"dataset_type": DatasetType.INTENSITY.value, "format": "list", "size": size, "entities": count}))
+
+        for dataset_type, fields in DATASET_FIELDS.items():
+            frames = {field: intensity_frame(shape, seed=i) for i, field in enumerate(fields)}
+            results.extend(_measure(dataset_type, frames, list(frames.values()), \
+                    sum(frame_bytes(frame) for frame in frames.values()), repeat, \
+                    {"dataset_type": dataset_type.value, "format": "dict", "size": size}))
+
+    names = [table_type.value for table_type in IntensityTableType] * 100
+    results.append(run_case("to_pascal", lambda: [to_pascal(name) for name in names], 0, repeat, \
+            params={"names": len(names)}))
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Dataset model construction, tables() and dump()")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--entities", nargs="+", type=int, default=list(DEFAULT_ENTITIES), \
+            help="IntensityData entries per intensity dataset")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.entities, args.repeat)
+    print(format_results(results))  # noqa: T201
+    if args.output:
+        write_results(args.output, "models", results)
+
+
+if __name__ == "__main__":
+    main()
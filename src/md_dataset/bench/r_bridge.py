@@ -0,0 +1,125 @@
+"""Benchmarks for the rpy2 bridge in run_r_task.
+
+    python -m md_dataset.bench.r_bridge --kinds long wide_numeric strings nullable --sizes xs s --output r.json
+
+run_r_task is called with an R function returning its inputs unchanged, and
+the Python to R conversion, the R call and the R to Python conversion are
+timed separately from the spans run_r_task records, for each transfer mode.
+Needs R and rpy2, and the arrow R package for the arrow transfer.
+"""
+
+from __future__ import annotations
+import argparse
+import itertools
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from md_dataset.bench.common import format_results
+from md_dataset.bench.common import latency_summary
+from md_dataset.bench.common import write_results
+from md_dataset.bench.data import DEFAULT_SIZES
+from md_dataset.bench.data import SIZES
+from md_dataset.bench.data import TableShape
+from md_dataset.bench.data import frame_bytes
+from md_dataset.bench.data import intensity_frame
+from md_dataset.models.r import RFuncArgs
+from md_dataset.models.r import RTransfer
+from md_dataset.process import run_r_task
+from md_dataset.telemetry import InMemoryCollector
+from md_dataset.telemetry import Tracer
+
+IDENTITY_R = """
+identity_frames <- function(...) {
+  frames <- list(...)
+  names(frames) <- paste0("table_", seq_along(frames))
+  frames
+}
+"""
+
+STEPS = ("python_to_r", "r_call", "r_to_python")
+STRING_COLUMNS = 10
+
+
+def wide_numeric_frame(shape: TableShape) -> pd.DataFrame:
+    """Features by samples float64 matrix, the wide layout of intensity matrices."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.lognormal(10, 2, size=(shape.features, shape.samples)), \
+            columns=[f"sample_{i}" for i in range(shape.samples)])
+
+
+def strings_frame(shape: TableShape) -> pd.DataFrame:
+    """High cardinality string columns, like protein ids, names and descriptions."""
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, shape.rows, size=(STRING_COLUMNS, shape.rows))
+    return pd.DataFrame({f"label_{i}": pd.array([f"P{value:08d}" for value in column], dtype="string") \
+            for i, column in enumerate(values)})
+
+
+def nullable_frame(shape: TableShape) -> pd.DataFrame:
+    """Long intensity table with a fifth of the values missing."""
+    data = intensity_frame(shape)
+    missing = np.random.default_rng(0).random(len(data)) < 0.2  # noqa: PLR2004
+    data.loc[missing, "NormalisedIntensity"] = pd.NA
+    data.loc[missing, "Imputed"] = pd.NA
+    return data
+
+
+FRAMES = {
+    "long": intensity_frame,
+    "wide_numeric": wide_numeric_frame,
+    "strings": strings_frame,
+    "nullable": nullable_frame,
+}
+
+
+def run(kinds: list[str], sizes: list[str], repeat: int, transfers: list[str] | None = None) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        r_file = Path(directory) / "identity.r"
+        r_file.write_text(IDENTITY_R)
+        for kind, size, transfer in itertools.product(kinds, sizes, transfers or [RTransfer.PANDAS2RI.value]):
+            data = FRAMES[kind](SIZES[size])
+            data_bytes = frame_bytes(data)
+            r_args = RFuncArgs(data_frames=[data])
+
+            run_r_task(str(r_file), "identity_frames", r_args, transfer)  # warm up R and the converters
+            collector = InMemoryCollector()
+            with Tracer([collector]):
+                for _ in range(repeat):
+                    run_r_task(str(r_file), "identity_frames", r_args, transfer)
+
+            params = {"kind": kind, "size": size, "transfer": transfer, "rows": len(data), \
+                    "columns": len(data.columns)}
+            for step in STEPS:
+                latencies = [span.duration_seconds for span in collector.spans if span.name == step]
+                results.append({
+                    "name": step,
+                    "params": params,
+                    "data_bytes": data_bytes,
+                    "repeat": repeat,
+                    "latency_seconds": latency_summary(latencies),
+                    "throughput_mb_per_second": data_bytes / 1e6 / float(np.median(latencies)),
+                    "peak_rss_delta_bytes": None,
+                })
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the conversions of run_r_task")
+    parser.add_argument("--kinds", nargs="+", choices=list(FRAMES), default=list(FRAMES))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--transfers", nargs="+", choices=[transfer.value for transfer in RTransfer], \
+            default=[RTransfer.PANDAS2RI.value])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.kinds, args.sizes, args.repeat, args.transfers)
+    print(format_results(results))  # noqa: T201
+    if args.output:
+        write_results(args.output, "r_bridge", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Benchmarks for the conversion of R results to dataset tables.
+
+    python -m md_dataset.bench.r_convert --kinds intensity pairwise --entities 1 5 --sizes xs s --output r.json
+
+`intensity` results hold intensity and metadata tables for each entity, the
+layout md_r functions return for intensity datasets. `pairwise` results hold
+one table of comparison statistics made in R, with factor, integer, logical
+and character columns. They are converted with RResultConverter, with the
+default dtypes, the compact dtypes and the compact dtypes with Arrow strings,
+and with `recursive`, the per node conversion it replaced, which logged every
+node. Besides the timings, each result records the memory of the converted
+tables. Needs R and rpy2.
+"""
+
+from __future__ import annotations
+import argparse
+import itertools
+import logging
+from functools import partial
+from typing import TYPE_CHECKING
+import pandas as pd
+from md_dataset.bench.common import format_results
+from md_dataset.bench.common import run_case
+from md_dataset.bench.common import write_results
+from md_dataset.bench.data import DEFAULT_SIZES
+from md_dataset.bench.data import SIZES
+from md_dataset.bench.data import frame_bytes
+from md_dataset.bench.data import intensity_frame
+from md_dataset.bench.data import metadata_frame
+from md_dataset.models.dataset import DatasetType
+from md_dataset.models.dataset import IntensityData
+from md_dataset.models.dataset import IntensityEntity
+from md_dataset.models.dataset import IntensityTable
+from md_dataset.models.dataset import IntensityTableType
+from md_dataset.r.convert import RResultConverter
+from md_dataset.r.transfer import r_converter
+from md_dataset.telemetry.resources import format_bytes
+
+if TYPE_CHECKING:
+    from rpy2.robjects.conversion import Converter
+
+logger = logging.getLogger(__name__)
+
+CONVERTERS = ("recursive", "single_pass", "single_pass_compact", "single_pass_arrow_strings")
+KINDS = ("intensity", "pairwise")
+DEFAULT_ENTITIES = (1, 5)
+
+PAIRWISE_R = """
+function(rows) {
+  set.seed(0)
+  missing <- runif(rows) < 0.1
+  list(results = data.frame(
+    ProteinId = sprintf("P%08d", seq_len(rows)),
+    Comparison = factor(sample(c("A - B", "A - C", "B - C"), rows, replace = TRUE)),
+    Observations = ifelse(missing, NA_integer_, sample.int(48L, rows, replace = TRUE)),
+    Significant = ifelse(missing, NA, runif(rows) < 0.05),
+    LogFC = rnorm(rows),
+    PValue = runif(rows),
+    stringsAsFactors = FALSE
+  ))
+}
+"""
+
+
+def pairwise_result(size: str) -> object:
+    """An R list with a pairwise results table of `SIZES[size].rows` rows."""
+    import rpy2.robjects as ro
+
+    return ro.r(PAIRWISE_R)(SIZES[size].rows)
+
+
+def r_result(entities: int, size: str) -> object:
+    """An R list of `entities` entities, each with an intensity and a metadata data frame."""
+    import rpy2.robjects as ro
+
+    shape = SIZES[size]
+    with r_converter().context():
+        intensity = ro.conversion.get_conversion().py2rpy(intensity_frame(shape))
+        metadata = ro.conversion.get_conversion().py2rpy(metadata_frame(shape))
+    names = itertools.islice(itertools.cycle(entity.value for entity in IntensityEntity), entities)
+    return ro.r["list"](*[ro.r["list"](
+        entity=name,
+        tables=ro.r["list"](
+            ro.r["list"](type=IntensityTableType.INTENSITY.value, data=intensity),
+            ro.r["list"](type=IntensityTableType.METADATA.value, data=metadata),
+        ),
+    ) for name in names])
+
+
+def recursive(r_object: object) -> object:
+    """The conversion before RResultConverter, run inside the converter context."""
+    import rpy2.robjects as ro
+
+    if isinstance(r_object, ro.vectors.ListVector):
+        if r_object.names:
+            logger.info("Convert named ListVector to dict")
+            return {key: recursive(value) for key, value in r_object.items()}
+        logger.info("Convert unnamed ListVector to list")
+        converted = [recursive(value) for value in r_object]
+        if converted and isinstance(converted[0], dict) and {"entity", "tables"} <= set(converted[0]):
+            return [IntensityData(entity=IntensityEntity(_string(item["entity"])), tables=[
+                IntensityTable(type=IntensityTableType(_string(table["type"])), data=table["data"]) \
+                        for table in item["tables"]]) for item in converted]
+        return converted
+    if hasattr(r_object, "colnames") and hasattr(r_object, "nrow"):
+        logger.info("Convert R data frame to pandas DataFrame")
+        return ro.conversion.get_conversion().rpy2py(r_object)
+    logger.info("Convert: %s", type(r_object))
+    return ro.conversion.get_conversion().rpy2py(r_object)
+
+
+def _string(value: object) -> str:
+    return value if isinstance(value, str) else value[0]
+
+
+def frames(result: object) -> list[pd.DataFrame]:
+    if isinstance(result, dict):
+        return [value for value in result.values() if isinstance(value, pd.DataFrame)]
+    return [table.data for item in result for table in item.tables]
+
+
+def convert(name: str, result: object, dataset_type: DatasetType, converter: Converter) -> object:
+    """Convert an R result with the converter `name` of CONVERTERS."""
+    if name == "recursive":
+        with converter.context():
+            return recursive(result)
+    return RResultConverter(dataset_type, compact_dtypes=name != "single_pass", \
+            arrow_strings=name == "single_pass_arrow_strings").convert(result, converter)
+
+
+def run(kinds: list[str], converters: list[str], entities: list[int], sizes: list[str], repeat: int) -> list[dict]:
+    converter = r_converter()
+    results = []
+    for kind, size in itertools.product(kinds, sizes):
+        for count in entities if kind == "intensity" else [None]:
+            if kind == "intensity":
+                result, dataset_type = r_result(count, size), DatasetType.INTENSITY
+                params = {"kind": kind, "entities": count, "size": size}
+            else:
+                result, dataset_type = pairwise_result(size), DatasetType.PAIRWISE
+                params = {"kind": kind, "size": size}
+            for name in converters:
+                func = partial(convert, name, result, dataset_type, converter)
+                converted = frames(func())
+                result_bytes = sum(frame_bytes(frame) for frame in converted)
+                results.append({**run_case(name, func, result_bytes, repeat=repeat, \
+                        params={**params, "rows": sum(len(frame) for frame in converted)}), \
+                        "result_bytes": result_bytes})
+    return results
+
+
+def format_memory(results: list[dict]) -> str:
+    lines = [f"{'case':<60} {'tables':>12}"]
+    lines.extend(f"{result['name'] + ' ' + '/'.join(str(value) for value in result['params'].values()):<60} "
+                 f"{format_bytes(result['result_bytes']):>12}" for result in results)
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the conversion of multi entity R results")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--converters", nargs="+", choices=CONVERTERS, default=list(CONVERTERS))
+    parser.add_argument("--entities", nargs="+", type=int, default=list(DEFAULT_ENTITIES))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.kinds, args.converters, args.entities, args.sizes, args.repeat)
+    print(format_results(results))  # noqa: T201
+    print(format_memory(results))  # noqa: T201
+    if args.output:
+        write_results(args.output, "r_convert", results)
+
+
+if __name__ == "__main__":
+    main()
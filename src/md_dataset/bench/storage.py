@@ -0,0 +1,92 @@
+"""Storage benchmarks for FileManager loads and saves.
+
+    python -m md_dataset.bench.storage --storage memory local --sizes xs s m --output storage.json
+
+`memory` keeps objects in a dict, `local` in files under a temporary directory
+and `s3` uses `get_s3_client` and BENCH_BUCKET, e.g. against localstack with
+USE_LOCALSTACK=true and AWS_ENDPOINT_URL.
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+from md_dataset.bench.common import format_results
+from md_dataset.bench.common import run_case
+from md_dataset.bench.common import write_results
+from md_dataset.bench.data import DEFAULT_SIZES
+from md_dataset.bench.data import SIZES
+from md_dataset.bench.data import frame_bytes
+from md_dataset.bench.data import intensity_frame
+from md_dataset.storage.file_manager import FileManager
+from md_dataset.storage.local import DirectoryS3Client
+from md_dataset.storage.local import MemoryS3Client
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+BENCH_BUCKET = os.getenv("BENCH_BUCKET", "md-dataset-bench")
+STORAGES = ("memory", "local", "s3")
+
+
+@contextmanager
+def file_manager_for(storage: str) -> Iterator[FileManager]:
+    if storage == "memory":
+        yield FileManager(MemoryS3Client(), default_bucket=BENCH_BUCKET)
+    elif storage == "local":
+        with tempfile.TemporaryDirectory(prefix="md-dataset-bench-") as root:
+            yield FileManager(DirectoryS3Client(root), default_bucket=BENCH_BUCKET)
+    else:
+        from md_dataset.storage.s3 import get_s3_client
+
+        yield FileManager(get_s3_client(), default_bucket=BENCH_BUCKET)
+
+
+def run(storages: list[str], sizes: list[str], repeat: int) -> list[dict]:
+    results = []
+    for storage in storages:
+        with file_manager_for(storage) as file_manager:
+            for size in sizes:
+                shape = SIZES[size]
+                data = intensity_frame(shape)
+                data_bytes = frame_bytes(data)
+                params = {"storage": storage, "size": size, "rows": shape.rows}
+                key = f"bench/{size}/Protein_Intensity.parquet"
+
+                file_manager.save_df_to_parquet(df=data, path=key)
+                params["parquet_bytes"] = len(file_manager.load_bytes(key))
+
+                results.append(run_case("load_parquet_to_df", \
+                        lambda key=key: file_manager.load_parquet_to_df(bucket=None, key=key), \
+                        data_bytes, repeat, params=params))
+                results.append(run_case("save_df_to_parquet", \
+                        lambda data=data, key=key: file_manager.save_df_to_parquet(df=data, path=key), \
+                        data_bytes, repeat, params=params))
+                results.append(run_case("save_df_to_csv", \
+                        lambda data=data, key=key: file_manager.save_df_to_csv(df=data, \
+                                path=key.replace(".parquet", ".csv")), \
+                        data_bytes, repeat, params=params))
+                results.append(run_case("save_tables", \
+                        lambda data=data, key=key: file_manager.save_tables([(key, data)]), \
+                        data_bytes, repeat, params=params))
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark FileManager loads and saves")
+    parser.add_argument("--storage", nargs="+", choices=STORAGES, default=["memory", "local"])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.storage, args.sizes, args.repeat)
+    print(format_results(results))  # noqa: T201
+    if args.output:
+        write_results(args.output, "storage", results)
+
+
+if __name__ == "__main__":
+    main()
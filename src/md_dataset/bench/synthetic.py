@@ -0,0 +1,54 @@
+"""Synthetic IntensityInputDataset generation for benchmarks and load tests."""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+from uuid import uuid4
+from md_dataset.bench.data import TableShape
+from md_dataset.bench.data import intensity_frame
+from md_dataset.bench.data import metadata_frame
+from md_dataset.models.dataset import InputDatasetTable
+from md_dataset.models.dataset import IntensityEntity
+from md_dataset.models.dataset import IntensityInputDataset
+from md_dataset.models.dataset import IntensityTable
+from md_dataset.models.dataset import IntensityTableType
+
+if TYPE_CHECKING:
+    from md_dataset.storage import FileManager
+
+
+class SyntheticConfig(NamedTuple):
+    features: int = 2_000
+    samples: int = 12
+    entities: tuple[str, ...] = (IntensityEntity.PROTEIN.value,)
+    missing_fraction: float = 0.2
+    id_cardinality: int | None = None
+    seed: int = 0
+
+
+def write_input_dataset(file_manager: FileManager, config: SyntheticConfig, name: str = "synthetic") \
+        -> IntensityInputDataset:
+    """Write intensity and metadata tables per entity as parquet and describe them as an input dataset.
+
+    Args:
+        file_manager: Where the tables are written, under the `name` prefix of its default bucket
+        config: Shape and content of the tables
+        name: Name of the input dataset
+
+    Returns:
+        The input dataset referencing the written tables
+    """
+    shape = TableShape(features=config.features, samples=config.samples)
+    tables = []
+    for i, entity_name in enumerate(config.entities):
+        entity = IntensityEntity(entity_name)
+        seed = config.seed + i
+        for table_type, data in (
+            (IntensityTableType.INTENSITY, intensity_frame(shape, seed, config.missing_fraction)),
+            (IntensityTableType.METADATA, metadata_frame(shape, seed, config.id_cardinality)),
+        ):
+            table_name = IntensityTable.table_name(table_type, entity)
+            key = f"{name}/{table_name}.parquet"
+            file_manager.save_df_to_parquet(df=data, path=key)
+            tables.append(InputDatasetTable(name=table_name, bucket=file_manager.default_bucket, key=key))
+    return IntensityInputDataset(id=uuid4(), name=name, tables=tables)
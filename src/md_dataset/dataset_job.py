@@ -1,11 +1,17 @@
+from __future__ import annotations
 import logging
 import re
-import time
+from typing import TYPE_CHECKING
 from typing import NamedTuple
 import requests
-from md_form import translate_payload
-from prefect.utilities.callables import parameter_schema
-from md_dataset.models.dataset import DatasetType
+from md_dataset.job_params import import_job_params
+from md_dataset.job_params import read_job_params
+from md_dataset.service_client import ACCEPTED_STATUS_CODE
+from md_dataset.service_client import get_session
+from md_dataset.service_client import wait_for_accepted
+
+if TYPE_CHECKING:
+    from md_dataset.models.dataset import DatasetType
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -17,8 +23,6 @@ handler.setFormatter(formatter)
 
 logger.addHandler(handler)
 
-ACCEPTED_STATUS_CODE = 202
-
 # ruff: noqa: PLR0913
 def create_or_update_dataset_job_send_http_request(
     base_url: str,
@@ -60,7 +64,7 @@ def create_or_update_dataset_job_send_http_request(
     }
 
     url = f"{base_url}/jobs/create_or_update"
-    response = requests.post(url, json=payload, timeout=10)
+    response = get_session().post(url, json=payload, timeout=10)
     try:
         response.raise_for_status()
         return response.json()
@@ -104,7 +108,7 @@ def create_or_update_dataset_job_and_deployment_send_http_request(
         payload["slug"] = slug
 
     url = f"{base_url}/jobs/v2/create_or_update"
-    response = requests.post(url, json=payload, timeout=50)
+    response = get_session().post(url, json=payload, timeout=50)
     try:
         response.raise_for_status()
         log_status_code =f"url:{url} status_code: {response.status_code}"
@@ -121,35 +125,24 @@ def create_or_update_dataset_job_and_deployment_send_http_request(
         ) from e
 
 def get_job_deploy_request(base_url: str, url: str) -> requests.Response:
-    response = requests.get(f"{base_url}{url}", timeout=50)
-    response.raise_for_status()
-    log_status_code =f"url:{url} status_code: {response.status_code}"
-    logger.info(log_status_code)
-    if response.status_code == ACCEPTED_STATUS_CODE:
-        logger.info("waiting for deployment...")
-        time.sleep(2)
-        return get_job_deploy_request(base_url, response.headers["Location"])
-    return response
+    """Poll the job deploy request at `url` until the deployment is done, see wait_for_accepted."""
+    return wait_for_accepted(base_url, url, log=logger)
 
 def dataset_job_params(name: str, module: str) -> tuple[dict, str, dict]:
     """Get the parameters schema for a flow.
 
+    They are read from the artifact md-dataset-build-params renders, see
+    md_dataset.job_params, and the module is imported only without a current one.
+
     Args:
         name: Name of the function, must be an existing function name in the `module`.
         module: The path to the Python modules containing the function (e.g. 'module.thing')
     """
-    module = __import__(module, fromlist=[module])
-
-    # for old required_params
-    fn = getattr(module, name)
-    description = fn.__doc__
-    parameters = parameter_schema(fn)
-
-    # for new md_form properties
-    fn_new = getattr(module, f"{name}_properties", None)
-    parameters_new = translate_payload(dict(fn_new.parameters)) if fn_new else None
-
-    return parameters.dict(), description, parameters_new
+    job_params = read_job_params(name, module)
+    if job_params is not None:
+        return job_params
+    logger.info("No current parameter artifact for %s.%s, importing it", module, name)
+    return import_job_params(name, module)
 
 
 def name_to_slug(name: str) -> str:
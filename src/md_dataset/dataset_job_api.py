@@ -1,7 +1,9 @@
 import logging
-import time
 import requests
 from md_dataset.models.dataset import DatasetType
+from md_dataset.service_client import ACCEPTED_STATUS_CODE
+from md_dataset.service_client import get_session
+from md_dataset.service_client import wait_for_accepted
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -13,8 +15,6 @@ handler.setFormatter(formatter)
 
 logger.addHandler(handler)
 
-ACCEPTED_STATUS_CODE = 202
-
 
 # ruff: noqa: PLR0913
 def create_or_update_dataset_job_and_deployment_send_http_request(
@@ -53,7 +53,7 @@ def create_or_update_dataset_job_and_deployment_send_http_request(
     if public is not None:
         payload["public"] = public
     url = f"{base_url}/api/jobs/create_or_update"
-    response = requests.post(url, json=payload, timeout=50, headers={"Authorization": f"Bearer {api_key}"})
+    response = get_session().post(url, json=payload, timeout=50, headers={"Authorization": f"Bearer {api_key}"})
     try:
         response.raise_for_status()
         log_status_code =f"url:{url} status_code: {response.status_code}"
@@ -71,15 +71,8 @@ def create_or_update_dataset_job_and_deployment_send_http_request(
 
 
 def get_job_deploy_request(base_url: str, api_key: str, url: str) -> requests.Response:
-    response = requests.get(f"{base_url}{url}", timeout=50, headers={"Authorization": f"Bearer {api_key}"})
-    response.raise_for_status()
-    log_status_code =f"url:{url} status_code: {response.status_code}"
-    logger.info(log_status_code)
-    if response.status_code == ACCEPTED_STATUS_CODE:
-        logger.info("waiting for deployment...")
-        time.sleep(2)
-        return get_job_deploy_request(base_url, api_key,response.headers["Location"])
-    return response
+    """Poll the job deploy request at `url` until the deployment is done, see wait_for_accepted."""
+    return wait_for_accepted(base_url, url, headers={"Authorization": f"Bearer {api_key}"}, log=logger)
 
 
 def create_or_update_dataset_job_and_deployment(
@@ -2,6 +2,7 @@ import logging
 import os
 from md_dataset.dataset_job_api import create_or_update_dataset_job_and_deployment
 from md_dataset.models.dataset import DatasetType
+from md_dataset.storage import get_s3_block
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -23,8 +24,12 @@ FLOW_PACKAGE = os.environ["FLOW_PACKAGE"]
 PUBLIC = os.environ.get("PUBLIC", None)
 DATASET_RUN_TYPE = os.environ["DATASET_RUN_TYPE"]
 DATASET_SLUG = os.environ.get("DATASET_SLUG", None)
+RESULTS_BUCKET = os.environ.get("PREFECT_RESULTS_BUCKET") # optional, flows save it when they first run
 def main() -> None:
 
+    if RESULTS_BUCKET is not None:
+        get_s3_block(RESULTS_BUCKET)
+
     logger.info("DEPLOYING dataset job")
     job = create_or_update_dataset_job_and_deployment(
         base_url=MASSDYNAMICS_API_BASE_URL,
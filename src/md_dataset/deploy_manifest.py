@@ -0,0 +1,201 @@
+"""Deploy many flows from a manifest.
+
+    md-dataset-deploy-manifest jobs.json --max-workers 4
+
+The manifest is a JSON list of jobs, each a flow deployed to Prefect and
+created or updated in the dataset service, what md-dataset-deploy does for
+one job:
+
+    [{"name": "Dose response", "flow": "dose_response", "flow_package": "flows.dose_response",
+      "deployment_name": "dose-response", "run_type": "DOSE_RESPONSE"}]
+
+Each flow package is imported once, then up to `--max-workers` jobs deploy
+at the same time. Settings shared by the jobs come from the environment
+variables of md-dataset-deploy, see md_dataset.deploy_settings. A job that
+fails does not stop the others; the report lists each job and the command
+exits with 1 when any failed.
+"""
+
+from __future__ import annotations
+import argparse
+import importlib
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+from pydantic import BaseModel
+from pydantic import TypeAdapter
+from md_dataset.dataset_job import JobParams
+from md_dataset.dataset_job import create_or_update_dataset_job
+from md_dataset.deploy_settings import DATASET_SERVICE_API_BASE_URL
+from md_dataset.deploy_settings import POOL_NAME
+from md_dataset.deploy_settings import PREFECT_API_URL
+from md_dataset.deploy_settings import QUEUE_NAME
+from md_dataset.deploy_settings import job_variables
+from md_dataset.models.dataset import DatasetType
+from md_dataset.storage import get_s3_block
+
+if TYPE_CHECKING:
+    from uuid import UUID
+    from prefect import Flow
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+handler = logging.StreamHandler()
+formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+handler.setFormatter(formatter)
+
+logger.addHandler(handler)
+
+# Bounds how many jobs deploy at once
+DEPLOY_MAX_WORKERS = int(os.getenv("DEPLOY_MAX_WORKERS", "4"))
+
+
+class ManifestJob(BaseModel):
+    """A job of the manifest, `image` defaults to DOCKER_IMAGE."""
+
+    name: str
+    flow: str
+    flow_package: str
+    deployment_name: str
+    run_type: str
+    published: bool = True
+    image: str | None = None
+
+
+class DeployConfig(NamedTuple):
+    image: str | None
+    service_account_name: str
+    results_bucket: str
+    dataset_service_url: str | None
+
+    @classmethod
+    def from_env(cls, dataset_service: bool = True) -> DeployConfig:
+        return cls(
+            image=os.environ.get("DOCKER_IMAGE"),
+            service_account_name=os.environ["K8_SERVICE_ACCOUNT_NAME"],
+            results_bucket=os.environ["PREFECT_RESULTS_BUCKET"],
+            dataset_service_url=DATASET_SERVICE_API_BASE_URL if dataset_service else None,
+        )
+
+
+class JobReport(NamedTuple):
+    name: str
+    seconds: float
+    deployment_id: UUID | None = None
+    job: dict | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def read_manifest(path: str | Path) -> list[ManifestJob]:
+    return TypeAdapter(list[ManifestJob]).validate_json(Path(path).read_text())
+
+
+def import_flows(jobs: list[ManifestJob]) -> dict[tuple[str, str], Flow | Exception]:
+    """Import each flow package once, mapping (flow_package, flow) to the flow or the error importing it."""
+    modules = {}
+    for package in dict.fromkeys(job.flow_package for job in jobs):
+        try:
+            modules[package] = importlib.import_module(package)
+        except Exception as e:  # noqa: BLE001
+            modules[package] = e
+    flows = {}
+    for job in jobs:
+        module = modules[job.flow_package]
+        if isinstance(module, Exception):
+            flows[job.flow_package, job.flow] = module
+        else:
+            flows[job.flow_package, job.flow] = getattr(module, job.flow, None) or \
+                    AttributeError(f"{job.flow_package} has no flow {job.flow}")
+    return flows
+
+
+def deploy_job(job: ManifestJob, flow: Flow | Exception, config: DeployConfig) -> JobReport:
+    """Deploy the flow of a job to Prefect and create or update the job in the dataset service."""
+    start = time.perf_counter()
+    try:
+        deployment_id, dataset_job = _deploy(job, flow, config)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Deploying %s failed: %s", job.name, e)
+        return JobReport(job.name, time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+    logger.info("Deployed %s", job.name)
+    return JobReport(job.name, time.perf_counter() - start, deployment_id, dataset_job)
+
+
+def _deploy(job: ManifestJob, flow: Flow | Exception, config: DeployConfig) -> tuple[UUID, dict | None]:
+    if isinstance(flow, Exception):
+        raise flow
+    image = job.image or config.image
+    if image is None:
+        msg = "No image, set DOCKER_IMAGE or the image of the job"
+        raise ValueError(msg)
+    run_type = DatasetType[job.run_type]
+    deployment_id = flow.deploy(
+        name=job.deployment_name,
+        image=image,
+        build=False,
+        push=False,
+        work_pool_name=POOL_NAME,
+        work_queue_name=QUEUE_NAME,
+        job_variables=job_variables(image, config.service_account_name, config.results_bucket),
+        tags=[f"service={job.deployment_name}", f"job_name={job.name}", "type=custom"],
+        print_next_steps=False,
+    )
+    if config.dataset_service_url is None:
+        return deployment_id, None
+    return deployment_id, create_or_update_dataset_job(
+        base_url=config.dataset_service_url,
+        job_params=JobParams(function=job.flow, module=job.flow_package, name=job.name, published=job.published),
+        deployment_name=job.deployment_name,
+        run_type=run_type.value,
+    )
+
+
+def deploy_jobs(jobs: list[ManifestJob], config: DeployConfig, max_workers: int = DEPLOY_MAX_WORKERS) \
+        -> list[JobReport]:
+    """Deploy the jobs, `max_workers` at a time, reporting each in the order of `jobs`."""
+    flows = import_flows(jobs)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deploy") as executor:
+        futures = [executor.submit(deploy_job, job, flows[job.flow_package, job.flow], config) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def format_report(reports: list[JobReport]) -> str:
+    lines = [f"{'job':<40} {'status':<8} {'seconds':>8} detail"]
+    lines.extend(f"{report.name:<40} {'ok' if report.ok else 'failed':<8} {report.seconds:>8.1f} "
+                 f"{report.error if not report.ok else (report.job or {}).get('id', report.deployment_id)}"
+                 for report in reports)
+    failed = sum(not report.ok for report in reports)
+    lines.append(f"{len(reports) - failed} of {len(reports)} jobs deployed")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Deploy the flows of a manifest to Prefect and the dataset service")
+    parser.add_argument("manifest", help="JSON list of jobs")
+    parser.add_argument("--max-workers", type=int, default=DEPLOY_MAX_WORKERS)
+    parser.add_argument("--skip-dataset-service", action="store_true", \
+            help="Only deploy to Prefect, as md-dataset-deploy-prefect does")
+    args = parser.parse_args(argv)
+
+    logger.info("Prefect url: %s", PREFECT_API_URL)
+    jobs = read_manifest(args.manifest)
+    config = DeployConfig.from_env(dataset_service=not args.skip_dataset_service)
+    # Flows reference the block of their results, which Prefect loads when they run
+    get_s3_block(config.results_bucket)
+
+    logger.info("DEPLOYING %d jobs, %d at a time", len(jobs), args.max_workers)
+    reports = deploy_jobs(jobs, config, args.max_workers)
+    logger.info("\n%s", format_report(reports))
+    if not all(report.ok for report in reports):
+        sys.exit(1)
@@ -0,0 +1,72 @@
+"""Settings of the commands deploying flows to Prefect, from the environment.
+
+md-dataset-deploy, md-dataset-deploy-prefect and md-dataset-deploy-manifest
+deploy flows to the same work pool and give their Kubernetes jobs the same
+variables.
+"""
+
+import os
+import tempfile
+
+STAGE = os.environ.get("STAGE", "production")
+AWS_REGION = os.environ.get("AWS_REGION", "ap-southeast-2")
+
+PREFECT_API_URL = os.environ.get("PREFECT_API_URL", "http://prefect-server:4200/api")
+os.environ["PREFECT_API_URL"] = PREFECT_API_URL
+
+K8_NAMESPACE = os.environ.get("K8_NAMESPACE", "md")
+POOL_NAME = os.environ.get("POOL_NAME", "kubernetes-workpool")
+QUEUE_NAME = os.environ.get("QUEUE_NAME", "default")
+
+HONEYBADGER_KEY = os.environ.get("HONEYBADGER_KEY", "")
+
+MEMORY_REQUESTS = os.environ.get("PREFECT_DEPLOYMENT_MEMORY_REQUESTS", "2Gi")
+CPU_REQUESTS = os.environ.get("PREFECT_DEPLOYMENT_CPU_REQUESTS", "1000m")
+EPHEMERAL_STORAGE_REQUESTS = os.environ.get("PREFECT_DEPLOYMENT_EPHEMERAL_STORAGE_REQUESTS", "5Gi")
+MEMORY_LIMITS = os.environ.get("PREFECT_DEPLOYMENT_MEMORY_LIMITS", "4Gi")
+CPU_LIMITS = os.environ.get("PREFECT_DEPLOYMENT_CPU_LIMITS", "2000m")
+EPHEMERAL_STORAGE_LIMITS = os.environ.get("PREFECT_DEPLOYMENT_EPHEMERAL_STORAGE_LIMITS", "10Gi")
+
+IMAGE_PULL_POLICY = os.environ.get("IMAGE_PULL_POLICY", "Always")
+
+DATASET_SERVICE_API_BASE_URL = os.environ.get("DATASET_SERVICE_API_BASE_URL", "http://md-data-set-web")
+INITIAL_DATA_BUCKET_NAME = os.environ.get("INITIAL_DATA_BUCKET_NAME") # optional
+
+
+def job_variables(image: str, service_account_name: str, results_bucket: str) -> dict:
+    """The job variables of a deployment to the Kubernetes work pool."""
+    env_vars = {
+        "IMAGE": image,
+        "STAGE": STAGE,
+        "PREFECT_HOME": f"{tempfile.gettempdir()}/prefect/",
+        "RESULTS_BUCKET": results_bucket,  # prefect results
+        "PREFECT_LOCAL_STORAGE_PATH": f"{tempfile.gettempdir()}/prefect/storage/",
+        "HONEYBADGER_KEY": HONEYBADGER_KEY,
+        "PREFECT_API_URL": PREFECT_API_URL,
+        "AWS_REGION": AWS_REGION,
+        "AWS_DEFAULT_REGION": AWS_REGION,  # boto3, https://docs.aws.amazon.com/sdkref/latest/guide/feature-region.html#feature-region-sdk-compat
+    }
+
+    # legacy md_converter loads its own data from s3
+    if INITIAL_DATA_BUCKET_NAME is not None:
+        env_vars["INITIAL_DATA_BUCKET_NAME"] = INITIAL_DATA_BUCKET_NAME
+
+    return {
+        "env": env_vars,
+        "image": image,
+        "image_pull_policy": IMAGE_PULL_POLICY,
+        "namespace": K8_NAMESPACE,
+        "finished_job_ttl": 10 * 60,
+        "pod_watch_timeout_seconds": 15 * 60,
+        "service_account_name": service_account_name,
+        "cpu_request": CPU_REQUESTS,
+        "memory_request": MEMORY_REQUESTS,
+        "ephemeral_storage_request": EPHEMERAL_STORAGE_REQUESTS,
+        "cpu_limit": CPU_LIMITS,
+        "memory_limit": MEMORY_LIMITS,
+        "ephemeral_storage_limit": EPHEMERAL_STORAGE_LIMITS,
+        "pod_labels": {
+            "node-group": "fargate",
+            "env": STAGE,
+        },
+    }
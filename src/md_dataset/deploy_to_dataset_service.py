@@ -4,6 +4,7 @@ from warnings import deprecated
 from md_dataset.dataset_job import JobParams
 from md_dataset.dataset_job import create_or_update_dataset_job_and_deployment
 from md_dataset.models.dataset import DatasetType
+from md_dataset.storage import get_s3_block
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -24,9 +25,13 @@ FLOW_PACKAGE = os.environ["FLOW_PACKAGE"]
 PUBLISHED = os.environ.get("PUBLISHED", "false")
 DATASET_RUN_TYPE = os.environ["DATASET_RUN_TYPE"]
 DATASET_SLUG = os.environ.get("DATASET_SLUG", None)
+RESULTS_BUCKET = os.environ.get("PREFECT_RESULTS_BUCKET") # optional, flows save it when they first run
 @deprecated("use md-deploy-dataset-job")
 def main() -> None:
 
+    if RESULTS_BUCKET is not None:
+        get_s3_block(RESULTS_BUCKET)
+
     logger.info("DEPLOYING dataset job")
     job = create_or_update_dataset_job_and_deployment(
         base_url=DATASET_SERVICE_API_BASE_URL,
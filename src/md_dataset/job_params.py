@@ -0,0 +1,157 @@
+"""Parameter schemas of dataset jobs, rendered at build time.
+
+    md-dataset-build-params flows.dose_response flows.mofa
+
+Deploying a dataset job sends the parameter schema of its flow and the
+md_form properties of its `<flow>_properties` companion, which takes
+importing the flow module with its runtime dependencies. The build command
+renders them to an artifact next to the module source,
+`dose_response.py` to `dose_response.params.json`, together with a hash of
+the md_dataset version and of every source of the package of the module,
+`flows` for `flows.dose_response`, since the flow may use its models and
+helpers. dataset_job_params reads the artifact and imports the module only
+when there is no artifact for the flow, it cannot be read, or the hash has
+changed since it was built.
+
+The artifacts only reach a deployment when the flow package ships them, so
+`*.params.json` must be declared as package data of the flow package, e.g.
+with setuptools:
+
+    [tool.setuptools.package-data]
+    flows = ["*.params.json"]
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_SUFFIX = ".params.json"
+PROPERTIES_SUFFIX = "_properties"
+
+
+def md_dataset_version() -> str:
+    try:
+        return importlib.metadata.version("md_dataset")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def package_sources(source: Path, module: str) -> tuple[Path, list[Path]]:
+    """The directory and sources of the top-level package of a module, or only its source outside a package."""
+    depth = module.count(".") + (source.name == "__init__.py")
+    if depth == 0:
+        return source.parent, [source]
+    root = source.parents[depth - 1]
+    return root, sorted(root.rglob("*.py"))
+
+
+def source_hash(source: Path, module: str) -> str:
+    """Hash of the md_dataset version and the package sources of a module, see package_sources."""
+    digest = hashlib.sha256(md_dataset_version().encode())
+    root, sources = package_sources(source, module)
+    for path in sources:
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def module_source(module: str) -> Path | None:
+    """The source file of a module, found without importing it, though its parent packages are imported."""
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.has_location or spec.origin is None:
+        return None
+    return Path(spec.origin)
+
+
+def artifact_path(source: Path) -> Path:
+    return source.with_suffix(ARTIFACT_SUFFIX)
+
+
+def import_job_params(name: str, module: str) -> tuple[dict, str, dict]:
+    """The parameter schema, description and md_form properties of a flow, from importing its module."""
+    from md_form import translate_payload
+    from prefect.utilities.callables import parameter_schema
+
+    module = importlib.import_module(module)
+
+    # for old required_params
+    fn = getattr(module, name)
+    description = fn.__doc__
+    parameters = parameter_schema(fn)
+
+    # for new md_form properties
+    fn_new = getattr(module, f"{name}{PROPERTIES_SUFFIX}", None)
+    parameters_new = translate_payload(dict(fn_new.parameters)) if fn_new else None
+
+    return parameters.dict(), description, parameters_new
+
+
+def read_job_params(name: str, module: str) -> tuple[dict, str, dict] | None:
+    """The job params of a flow from the artifact of its module, None when it has none or is out of date."""
+    source = module_source(module)
+    if source is None or not artifact_path(source).exists():
+        return None
+    try:
+        artifact = json.loads(artifact_path(source).read_text())
+        if artifact["source_hash"] != source_hash(source, module):
+            logger.info("Parameter artifact of %s is out of date", module)
+            return None
+        job = artifact["jobs"].get(name)
+        if job is None:
+            return None
+        return job["params"], job["description"], job["params_new"]
+    except (json.JSONDecodeError, KeyError):
+        logger.warning("Parameter artifact of %s cannot be read, rebuild it", module)
+        return None
+
+
+def flow_names(module: str) -> list[str]:
+    """The flows a module defines, without their `_properties` companions."""
+    from prefect import Flow
+
+    imported = importlib.import_module(module)
+    return [name for name, value in vars(imported).items() if isinstance(value, Flow) and \
+            getattr(value.fn, "__module__", None) == imported.__name__ and not name.endswith(PROPERTIES_SUFFIX)]
+
+
+def write_job_params(module: str, names: list[str] | None = None) -> Path:
+    """Render the job params of the flows of a module, all of them by default, to its artifact.
+
+    Raises:
+        ValueError: If the module has no source file to write the artifact next to
+    """
+    source = module_source(module)
+    if source is None:
+        msg = f"Module {module} has no source file to write its job params next to"
+        raise ValueError(msg)
+    jobs = {}
+    for name in names or flow_names(module):
+        params, description, params_new = import_job_params(name, module)
+        jobs[name] = {"params": params, "description": description, "params_new": params_new}
+    path = artifact_path(source)
+    path.write_text(json.dumps({"module": module, "source_hash": source_hash(source, module), "jobs": jobs}, \
+            indent=2))
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Render the parameter schemas of flows for deployment")
+    parser.add_argument("modules", nargs="+", help="Modules defining flows, e.g. flows.dose_response")
+    parser.add_argument("--flows", nargs="+", help="Names of the flows to render, by default every flow")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        path = write_job_params(module, args.flows)
+        print(f"Wrote {path}")  # noqa: T201
+    print("Deployments only read the artifacts when *.params.json is package data of the flow package")  # noqa: T201
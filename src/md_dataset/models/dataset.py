@@ -1,8 +1,10 @@
 from __future__ import annotations
 import abc
 import re
+import threading
 import uuid
 from enum import Enum
+from functools import cache
 from typing import TYPE_CHECKING
 from typing import Literal
 import pandas as pd
@@ -16,6 +18,7 @@ from pydantic import PrivateAttr
 from pydantic import model_validator
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from md_dataset.file_manager import FileManager
 
 
@@ -47,14 +50,43 @@ class EntityInputParams(InputParams):
   )
 
 class InputDatasetTable(MdDatasetBaseModel):
+    """A table of an input dataset, in storage at `bucket` and `key`.
+
+    `data` is the loaded table. A table bound to a loader is loaded on first
+    access of `data`, so tables a flow never reads are never downloaded.
+    """
+
     name: str
     bucket: str = None
     key: str = None
     data: pd.DataFrame = None
+    _loader: Callable[[], pd.DataFrame] | None = PrivateAttr(default=None)
+    _lock: threading.Lock | None = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
 
+    def __getattribute__(self, name: str) -> object:
+        value = super().__getattribute__(name)
+        if name == "data" and value is None and self._loader is not None:
+            return self._load()
+        return value
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["data"] is not None
+
+    def bind(self, loader: Callable[[], pd.DataFrame]) -> None:
+        """Load `data` with `loader` on its first access."""
+        self._loader = loader
+        self._lock = threading.Lock()
+
+    def _load(self) -> pd.DataFrame:
+        with self._lock:
+            if self.__dict__["data"] is None:
+                self.__dict__["data"] = self._loader()
+        return self.__dict__["data"]
+
 class InputDataset(MdDatasetBaseModel):
     id: uuid.UUID
     name: str
@@ -63,12 +95,13 @@ class InputDataset(MdDatasetBaseModel):
     tables: list[InputDatasetTable]
 
     def populate_tables(self, file_manager: FileManager) -> InputDataset:
-        tables = [
-                InputDatasetTable(**table.dict(exclude={"data", "bucket", "key"}), \
-                        data = file_manager.load_parquet_to_df( \
-                            bucket = table.bucket, key = table.key)) \
-                for table in self.tables]
-        self.tables = tables
+        self.set_table_data([file_manager.load_parquet_to_df(bucket = table.bucket, key = table.key) \
+                for table in self.tables])
+
+    def set_table_data(self, data: list[pd.DataFrame]) -> None:
+        self.tables = [
+                InputDatasetTable(**table.dict(exclude={"data", "bucket", "key"}), data = df) \
+                for table, df in zip(self.tables, data, strict=True)]
 
 class IntensityEntity(str, Enum):
     PROTEIN = "Protein"
@@ -97,13 +130,17 @@ class IntensityTable(MdDatasetBaseModel):
             entity_type: IntensityEntity = IntensityEntity.PROTEIN) -> str:
         return f"{entity_type.value}_{to_pascal(intensity_type.value)}"
 
+@cache
+def intensity_table_name(table_type: IntensityTableType, entity_type: IntensityEntity) -> str:
+    return IntensityTable.table_name(table_type, entity_type)
+
 class IntensityInputDataset(InputDataset):
     type: DatasetType = DatasetType.INTENSITY
 
     def table(self, table_type: IntensityTableType, \
             entity_type: IntensityEntity = IntensityEntity.PROTEIN) -> InputDatasetTable:
-        return next(filter(lambda table: table.name == IntensityTable.table_name(table_type, entity_type), \
-                self.tables), None)
+        name = intensity_table_name(table_type, entity_type)
+        return next((table for table in self.tables if table.name == name), None)
 
 class Dataset(MdDatasetBaseModel, abc.ABC):
     run_id: uuid.UUID
@@ -1,23 +1,95 @@
 from __future__ import annotations
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING
 import pandas as pd
 from pydantic import BaseModel
 from pydantic import model_validator
 
+if TYPE_CHECKING:
+    from md_dataset.models.dataset import InputDatasetTable
+    from md_dataset.storage import FileManager
+
+
+class RTransfer(str, Enum):
+    """How data frames are moved between pandas and R.
+
+    PANDAS2RI converts column by column with rpy2. ARROW hands Arrow record
+    batches to the arrow R package through the C data interface, so numeric
+    buffers are shared rather than copied. It needs the arrow R package and
+    falls back to PANDAS2RI without it.
+    """
+
+    PANDAS2RI = "pandas2ri"
+    ARROW = "arrow"
+
+
+class RExecution(str, Enum):
+    """Where R functions run.
+
+    EMBEDDED runs them in the R session embedded in the flow process with
+    rpy2. WORKER runs them in a pool of Rscript worker processes, exchanging
+    tables as Arrow IPC files, so several calls can run at once, R memory is
+    not held by the flow process and an R crash fails only the call.
+    """
+
+    EMBEDDED = "embedded"
+    WORKER = "worker"
+
+
+class RTableRef(BaseModel):
+    """A parquet table the R function reads itself instead of a data frame.
+
+    R receives `list(uri = , columns = )` and reads it with
+    `arrow::read_parquet(ref$uri, col_select = ref$columns)`, so only the
+    selected columns are read and the table never passes through pandas.
+    """
+
+    uri: str
+    columns: list[str] | None = None
+
+    @classmethod
+    def from_table(cls, table: InputDatasetTable, file_manager: FileManager, columns: list[str] | None = None, \
+            cache_dir: str | None = None) -> RTableRef:
+        """Reference an input dataset table that has not been loaded.
+
+        Args:
+            table: The table, with its bucket and key
+            file_manager: Storage the table is in
+            columns: Columns R reads, default all
+            cache_dir: Download the parquet file to this directory and reference the local copy,
+                default reference the object in storage
+
+        Returns:
+            The reference
+        """
+        if cache_dir is None:
+            return cls(uri=file_manager.uri(table.bucket, table.key), columns=columns)
+        path = Path(cache_dir) / table.bucket / table.key
+        if not path.is_file():
+            file_manager.download_file(table.bucket, table.key, path)
+        return cls(uri=str(path), columns=columns)
+
 
 class RFuncArgs(BaseModel):
-    data_frames: list[pd.DataFrame]
+    data_frames: list[pd.DataFrame | RTableRef]
     r_args: list[str] = []
 
     class Config:
         arbitrary_types_allowed = True
 
+    def counts(self) -> dict:
+        """Count the tables and DataFrame rows passed to R, for span attributes."""
+        return {"tables": len(self.data_frames), \
+                "rows": sum(len(df) for df in self.data_frames if isinstance(df, pd.DataFrame))}
+
     @model_validator(mode="before")
     def validate_data_frames(cls, values: dict) -> dict:
         data_frames = values.get("data_frames")
         if not isinstance(data_frames, list):
             msg = "data_frames must be a list."
             raise TypeError(msg)
-        if not all(isinstance(df, pd.DataFrame) for df in data_frames):
-            msg = "All items in data_frames must be pandas DataFrame objects."
+        if not all(isinstance(df, pd.DataFrame | RTableRef) for df in data_frames):
+            msg = "All items in data_frames must be pandas DataFrame or RTableRef objects."
             raise TypeError(msg)
         return values
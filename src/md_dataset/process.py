@@ -1,250 +1,521 @@
 from __future__ import annotations
+import json
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextlib import nullcontext
+from contextvars import copy_context
+from functools import partial
 from functools import wraps
+from pathlib import Path
 from typing import TYPE_CHECKING
 from typing import ParamSpec
 from typing import TypeVar
-from prefect import flow
+from deprecated import deprecated
+from prefect import Flow
 from prefect import get_run_logger
 from prefect import runtime
 from prefect import task
+from prefect.artifacts import create_table_artifact
+from prefect.cache_policies import NO_CACHE
+from prefect.task_runners import ThreadPoolTaskRunner
 from md_dataset.models.dataset import DatasetType
 from md_dataset.models.dataset import InputDataset
 from md_dataset.models.dataset import InputParams
 from md_dataset.models.factory import create_dataset_from_run
+from md_dataset.models.r import RExecution
+from md_dataset.models.r import RTransfer
+from md_dataset.storage import Checkpoint
 from md_dataset.storage import FileManager
+from md_dataset.storage import get_checkpoint
 from md_dataset.storage import get_file_manager
-from md_dataset.storage import get_s3_block
+from md_dataset.storage import get_result_storage
+from md_dataset.telemetry import InMemoryCollector
+from md_dataset.telemetry import Profiler
+from md_dataset.telemetry import ResourceSampler
+from md_dataset.telemetry import Tracer
+from md_dataset.telemetry import current_profiler
+from md_dataset.telemetry import exporters_from_env
+from md_dataset.telemetry import profile_section
+from md_dataset.telemetry import profiler_from_env
+from md_dataset.telemetry import resource_phase
+from md_dataset.telemetry import trace_span
 
 if TYPE_CHECKING:
     from collections.abc import Callable
+    from collections.abc import Collection
+    from collections.abc import Iterator
     from uuid import UUID
+    import pandas as pd
+    from prefect.results import ResultStorage
     from md_dataset.models.r import RFuncArgs
 
 P = ParamSpec("P")
 T = TypeVar("T", bound="InputDataset")
 
+# Bounds how many table loads and saves run at once within a flow run
+TASK_RUNNER_MAX_WORKERS = int(os.getenv("TASK_RUNNER_MAX_WORKERS", "4"))
+
 
 def get_deployment_image() -> str:
     return os.getenv("IMAGE", "unknown")
 
+# Phase tasks pass DataFrames around, so they are neither cached (hashing every
+# input) nor persisted to result storage.
+@task(task_run_name="load-{name}", persist_result=False, cache_policy=NO_CACHE)
+def load_table_task(file_manager: FileManager, name: str, bucket: str, key: str) -> pd.DataFrame:
+    get_run_logger().info("Loading table %s", name)
+    return load_table(file_manager, name, bucket, key)
+
+@task(task_run_name="save-{path}", persist_result=False, cache_policy=NO_CACHE)
+def save_table_task(file_manager: FileManager, path: str, data: pd.DataFrame) -> None:
+    file_manager.save_tables([(path, data)])
+
+def compute_task(func: Callable) -> Callable:
+    return task(func, name=f"{func.__name__}-compute", persist_result=False, cache_policy=NO_CACHE)
+
 def load_data(input_datasets: list[T], file_manager: FileManager) -> None:
     logger = get_run_logger()
-    for dataset in input_datasets:
+    futures = [[load_table_task.submit(file_manager, table.name, table.bucket, table.key) \
+            for table in dataset.tables] for dataset in input_datasets]
+    for dataset, table_futures in zip(input_datasets, futures, strict=True):
         try:
-            dataset.populate_tables(file_manager)
+            dataset.set_table_data([future.result() for future in table_futures])
         except Exception:
             logger.exception("Failed to load dataset %s", dataset.name)
             raise
 
-# Python based datasets
-def md_py(func: Callable) -> Callable:
-    result_storage = get_s3_block() if os.getenv("RESULTS_BUCKET") is not None else None
+def save_tables(file_manager: FileManager, tables: list[tuple[str, pd.DataFrame]]) -> None:
+    futures = [save_table_task.submit(file_manager, path, data) for path, data in tables]
+    for future in futures:
+        future.result()
 
-    @flow(
-            log_prints=True,
-            persist_result=True,
-            result_storage=result_storage,
-            description = func.__doc__,
-    )
-    @wraps(func)
-    def wrapper(input_datasets: list[T], params: InputParams, output_dataset_type: DatasetType, \
-            *args: P.args, **kwargs: P.kwargs) -> dict:
-        logger = get_run_logger()
-        logger.info("Running Deployment: %s", runtime.deployment.name)
-        logger.info("Version: %s", runtime.deployment.version)
-        logger.info("Image: %s", get_deployment_image())
+def load_table(file_manager: FileManager, name: str, bucket: str, key: str) -> pd.DataFrame:
+    """Load a table, measured as a load_table phase and span of its own.
+
+    Tables loaded on demand load within compute, so their usage is not in the
+    load phase.
+    """
+    with resource_phase("load_table"), trace_span("load_table", table=name):
+        return file_manager.load_parquet_to_df(bucket=bucket, key=key)
 
-        file_manager = get_file_manager()
+def bind_data(input_datasets: list[T], file_manager: FileManager, prefetch: Collection[str] | None = None) -> None:
+    """Bind the tables of the input datasets to storage, each loaded on the first access of its data.
 
+    Args:
+        input_datasets: The datasets
+        file_manager: Storage the tables are in
+        prefetch: Names of tables to start loading at once, concurrently, e.g. "Protein_Intensity"
+    """
+    for dataset in input_datasets:
+        for table in dataset.tables:
+            if table.loaded:
+                continue
+            if prefetch is not None and table.name in prefetch:
+                table.bind(load_table_task.submit(file_manager, table.name, table.bucket, table.key).result)
+            else:
+                table.bind(partial(load_table, file_manager, table.name, table.bucket, table.key))
+
+def load_data_with_checkpoint(input_datasets: list[T], file_manager: FileManager, checkpoint: Checkpoint, \
+        prefetch: Collection[str] | None = None) -> None:
+    # Checkpoints hold every input table, so only runs without one load tables on demand
+    if not checkpoint.enabled:
+        bind_data(input_datasets, file_manager, prefetch)
+    elif not checkpoint.restore_inputs(input_datasets):
         load_data(input_datasets, file_manager)
+        checkpoint.save_inputs(input_datasets)
+
+def save_resource_usage(file_manager: FileManager, run_id: UUID, sampler: ResourceSampler) -> None:
+    summary = sampler.summary()
+    file_manager.save_bytes(json.dumps(summary, indent=2).encode("utf-8"), f"job_runs/{run_id}/resource_usage.json")
+    create_table_artifact(key="resource-usage", table=summary["phases"], \
+            description="Peak RSS, CPU time and I/O bytes per phase")
 
-        results = func(input_datasets, params, output_dataset_type, *args, **kwargs)
+def save_trace(file_manager: FileManager, run_id: UUID, tracer: Tracer) -> None:
+    for exporter in tracer.exporters:
+        if isinstance(exporter, InMemoryCollector):
+            file_manager.save_bytes(json.dumps(exporter.to_otlp()).encode("utf-8"), f"job_runs/{run_id}/trace.json")
 
-        dataset = create_dataset_from_run(run_id=runtime.flow_run.id, \
-                dataset_type=output_dataset_type, tables=results)
+def save_profiles(file_manager: FileManager, run_id: UUID, profiler: Profiler) -> None:
+    logger = get_run_logger()
+    for name, content in profiler.artifacts.items():
+        path = f"job_runs/{run_id}/profiles/{name}"
+        file_manager.save_bytes(content, path)
+        logger.info("Saved profile %s", path)
+
+def table_counts(results: dict | list) -> dict:
+    """Count the tables and rows returned by a user function, for span attributes."""
+    frames = []
+    if isinstance(results, dict):
+        frames = [value for value in results.values() if hasattr(value, "shape")]
+    elif isinstance(results, list):
+        frames = [table.data for datum in results for table in getattr(datum, "tables", [])]
+    return {"tables": len(frames), "rows": sum(len(frame) for frame in frames)}
+
+@contextmanager
+def run_in_background(func: Callable[[], None] | None, name: str) -> Iterator[None]:
+    """Run `func` in a thread while the block runs and wait for it when the block ends.
+
+    `func` runs in a copy of the current context, so its spans join the run's
+    trace. It only prepares work the block does, so a failure is logged rather
+    than raised, and the work is left to be done again.
+    """
+    if func is None:
+        yield
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+    future = executor.submit(copy_context().run, func)
+    try:
+        yield
+    finally:
+        try:
+            future.result()
+        except Exception:  # noqa: BLE001
+            get_run_logger().warning("%s failed in the background", name, exc_info=True)
+        executor.shutdown()
+
+def run_dataset_flow(dataset_type: DatasetType, compute: Callable[[], dict | list], \
+        input_datasets: list[T] | None = None, warm_up: Callable[[], None] | None = None, \
+        prefetch: Collection[str] | None = None) -> dict:
+    """Run the load, compute, build and save phases shared by all dataset flows.
+
+    Args:
+        dataset_type: The type of dataset the run creates
+        compute: Produces the output tables once inputs are loaded
+        input_datasets: Datasets to load, if any. Without a checkpoint their tables load on first access,
+            within compute, and each load is measured as a load_table phase and span
+        warm_up: Prepares compute, run in the background while inputs load and compute runs. Compute waits
+            for the parts it needs itself, e.g. for the R session lock
+        prefetch: Names of input tables to start loading before compute
+
+    Returns:
+        The dumped dataset
+    """
+    logger = get_run_logger()
+    logger.info("Running Deployment: %s", runtime.deployment.name)
+    logger.info("Version: %s", runtime.deployment.version)
+    logger.info("Image: %s", get_deployment_image())
+
+    run_id = runtime.flow_run.id
+    file_manager = get_file_manager()
+    checkpoint = get_checkpoint(run_id, file_manager)
+
+    sampler = ResourceSampler()
+    trace_id = str(run_id).replace("-", "")
+    tracer = Tracer(exporters_from_env(trace_id, logger), trace_id=trace_id)
+    profiler = profiler_from_env()
+    try:
+        with sampler, tracer, profiler or nullcontext(), \
+                tracer.span("flow_run", run_id=str(run_id), dataset_type=dataset_type.value):
+            results = checkpoint.load_results()
+            if results is None:
+                # Tables load on demand within compute, so the warm-up overlaps both
+                with run_in_background(warm_up, "md-warm-up"):
+                    if input_datasets:
+                        with sampler.phase("load"), trace_span("load"):
+                            load_data_with_checkpoint(input_datasets, file_manager, checkpoint, prefetch)
+
+                    with sampler.phase("compute"), trace_span("compute"):
+                        results = compute()
+                checkpoint.save_results(results)
+
+            with sampler.phase("build"), trace_span("build", **table_counts(results)):
+                dataset = create_dataset_from_run(run_id=run_id, dataset_type=dataset_type, tables=results)
+
+            with sampler.phase("save"), trace_span("save"):
+                save_tables(file_manager, dataset.tables())
+    finally:
+        sampler.log_summary(logger)
+
+    checkpoint.clear()
+    save_resource_usage(file_manager, run_id, sampler)
+    save_trace(file_manager, run_id, tracer)
+    if profiler is not None:
+        save_profiles(file_manager, run_id, profiler)
+
+    return dataset.dump()
+
+class DatasetFlow(Flow):
+    """A flow whose result storage, when none is given, is resolved when the flow runs.
+
+    Prefect reads the result storage of a flow before its run starts. Resolving it
+    then saves the block of RESULTS_BUCKET once per process, so a flow persists to
+    the bucket of the run on a fresh server and no Prefect API is needed to
+    define it.
+    """
+
+    @property
+    def result_storage(self) -> ResultStorage | str | None:
+        if self._result_storage is None:
+            return get_result_storage()
+        return self._result_storage
+
+    @result_storage.setter
+    def result_storage(self, value: ResultStorage | str | None) -> None:
+        self._result_storage = value
+
+def dataset_flow(description: str | None = None) -> Callable[[Callable], DatasetFlow]:
+    return partial(
+            DatasetFlow,
+            log_prints=True,
+            persist_result=True,
+            description=description,
+            task_runner=ThreadPoolTaskRunner(max_workers=TASK_RUNNER_MAX_WORKERS),
+    )
 
-        file_manager.save_tables(dataset.tables())
+# Python based datasets
+def md_py(func: Callable | None = None, *, prefetch: Collection[str] | None = None) -> Callable:
+    """Run a Python function on the input datasets, as `@md_py` or `@md_py(prefetch=[...])`.
+
+    Args:
+        func: The function
+        prefetch: Names of input tables, e.g. "Protein_Intensity", to load before the function runs.
+            Other tables load when the function first accesses their data
+    """
+    if func is None:
+        return partial(md_py, prefetch=prefetch)
+
+    compute = compute_task(func)
+    @dataset_flow(description=func.__doc__)
+    @wraps(func)
+    def wrapper(input_datasets: list[T], params: InputParams, output_dataset_type: DatasetType, \
+            *args: P.args, **kwargs: P.kwargs) -> dict:
+        def traced_compute() -> dict | list:
+            with trace_span("user_function", function=func.__name__) as span, profile_section("user_function"):
+                results = compute(input_datasets, params, output_dataset_type, *args, **kwargs)
+                span.set_attributes(**table_counts(results))
+            return results
 
-        return dataset.dump()
+        return run_dataset_flow(output_dataset_type, traced_compute, input_datasets, prefetch=prefetch)
 
     return wrapper
 
 # New uploaded "experiments"
 def md_upload(func: Callable) -> Callable:
-    result_storage = get_s3_block() if os.getenv("RESULTS_BUCKET") is not None else None
-
-    @flow(
-            log_prints=True,
-            persist_result=True,
-            result_storage=result_storage,
-    )
+    compute = compute_task(func)
+    @dataset_flow()
     @wraps(func)
     def wrapper(experiment_id: UUID, params: InputParams, \
             *args: P.args, **kwargs: P.kwargs) -> dict:
-        logger = get_run_logger()
-        logger.info("Running Deployment: %s", runtime.deployment.name)
-        logger.info("Version: %s", runtime.deployment.version)
-        logger.info("Image: %s", get_deployment_image())
-
-        results = func(experiment_id, params, *args, **kwargs)
+        def traced_compute() -> dict | list:
+            with trace_span("user_function", function=func.__name__) as span, profile_section("user_function"):
+                results = compute(experiment_id, params, *args, **kwargs)
+                span.set_attributes(**table_counts(results))
+            return results
 
-        dataset = create_dataset_from_run(run_id=runtime.flow_run.id, \
-                dataset_type=DatasetType.INTENSITY, tables=results)
-
-        get_file_manager().save_tables(dataset.tables())
-
-        return dataset.dump()
+        return run_dataset_flow(DatasetType.INTENSITY, traced_compute)
 
     return wrapper
 
 # R based datasets
-def md_r(r_file: str, r_function: str) -> Callable:
+def md_r(r_file: str, r_function: str, transfer: RTransfer | str = RTransfer.PANDAS2RI, \
+        libraries: list[str] | None = None, execution: RExecution | str = RExecution.EMBEDDED, \
+        load_inputs: bool = True, parquet_outputs: bool = False, prefetch: Collection[str] | None = None, \
+        compact_dtypes: bool = False) -> Callable:  # noqa: PLR0913
+    """Run an R function on the data frames a prepare function returns.
+
+    The R session is kept for the life of the process: `r_file` is sourced
+    again only when it changes, and `libraries` are attached once. R is
+    started, `libraries` attached and `r_file` sourced in the background from
+    the start of the run, while the inputs load.
+
+    Args:
+        r_file: R script defining the function
+        r_function: Name of the R function
+        transfer: How data frames are moved between pandas and R, see RTransfer
+        libraries: R libraries the function uses, attached before the first call
+        execution: Where the R function runs, see RExecution
+        load_inputs: Load the input tables before the prepare function runs. Without loading
+            the tables keep their bucket and key, for passing RTableRef references to R
+        parquet_outputs: Pass each R call a directory of its own as its last argument to write its
+            output tables to as parquet files, see md_dataset.r.outputs
+        prefetch: Names of input tables to load before the prepare function runs. Other tables load
+            when it first accesses their data
+        compact_dtypes: Convert R integer, logical and factor columns to Int32, boolean and category,
+            keeping their missing values, see md_dataset.r.dtypes. By default they convert as rpy2 or Arrow
+            give them
+    """
+    transfer = RTransfer(transfer)
+    execution = RExecution(execution)
+
     def decorator(func: Callable) -> Callable:
-        result_storage = get_s3_block() if os.getenv("RESULTS_BUCKET") is not None else None
-
-        @flow(
-                log_prints=True,
-                persist_result=True,
-                result_storage=result_storage,
-                description = func.__doc__,
-                )
+        @dataset_flow(description=func.__doc__)
         @wraps(func)
         def wrapper(input_datasets: list[T] , params: InputParams, output_dataset_type: DatasetType, \
                 *args: P.args, **kwargs: P.kwargs) -> dict:
-            logger = get_run_logger()
-            logger.info("Running Deployment: %s", runtime.deployment.name)
-            logger.info("Version: %s", runtime.deployment.version)
-            logger.info("Image: %s", get_deployment_image())
-
-            file_manager = get_file_manager()
+            def compute(output_dir: str | None = None) -> dict | list:
+                with trace_span("user_function", function=func.__name__) as span, \
+                        profile_section("user_function"):
+                    r_args = func(input_datasets, params, output_dataset_type, *args, **kwargs)
+                    calls = r_args if isinstance(r_args, list) else [r_args]
+                    span.set_attributes(**r_call_counts(calls))
+                call_dirs = [None] * len(calls)
+                if output_dir is not None:
+                    # Each call writes to its own directory, so calls using the same file names do not clash
+                    call_dirs = [str(Path(output_dir) / str(index)) for index in range(len(calls))]
+                    for call_dir in call_dirs:
+                        Path(call_dir).mkdir()
+                    calls = [call.model_copy(update={"r_args": [*call.r_args, call_dir]}) \
+                            for call, call_dir in zip(calls, call_dirs, strict=True)]
+                runs = list(zip(calls, call_dirs, strict=True))
+                if execution is RExecution.WORKER:
+                    futures = [run_r_worker_task.submit(r_file, r_function, call, libraries, call_dir, \
+                            output_dataset_type, compact_dtypes) for call, call_dir in runs]
+                    results = [future.result() for future in futures]
+                else:
+                    results = [run_r_task(r_file, r_function, call, transfer, libraries, call_dir, \
+                            output_dataset_type, compact_dtypes) for call, call_dir in runs]
+                return merge_r_results(results) if isinstance(r_args, list) else results[0]
+
+            def r_warm_up() -> None:
+                with trace_span("r_warm_up", execution=execution.value):
+                    if execution is RExecution.WORKER:
+                        from md_dataset.r.worker import get_pool
+
+                        get_pool().warm_up(r_file, libraries)
+                    else:
+                        from md_dataset.r.session import warm_up
+
+                        warm_up(r_file, libraries or [])
+
+            inputs = input_datasets if load_inputs else None
+            if not parquet_outputs:
+                return run_dataset_flow(output_dataset_type, compute, inputs, r_warm_up, prefetch)
+            # The output files are uploaded in the save phase, so they live as long as the run
+            with tempfile.TemporaryDirectory(prefix="md-r-outputs-") as output_dir:
+                return run_dataset_flow(output_dataset_type, partial(compute, output_dir), inputs, r_warm_up, \
+                        prefetch)
 
-            load_data(input_datasets, file_manager)
-
-            r_args = func(input_datasets, params, output_dataset_type, *args, **kwargs)
-
-            results = run_r_task(r_file, r_function, r_args)
-
-            dataset = create_dataset_from_run(run_id=runtime.flow_run.id, \
-                    dataset_type=output_dataset_type, tables=results)
+        return wrapper
+    return decorator
 
-            file_manager.save_tables(dataset.tables())
+def r_call_counts(calls: list[RFuncArgs]) -> dict:
+    """Count the calls, tables and DataFrame rows passed to R, for span attributes."""
+    counts = [call.counts() for call in calls]
+    return {"calls": len(calls), "tables": sum(count["tables"] for count in counts), \
+            "rows": sum(count["rows"] for count in counts)}
+
+def merge_r_results(results: list[dict | list]) -> dict | list:
+    """Merge the results of the R calls of a run, concatenating lists and joining dicts.
+
+    Raises:
+        ValueError: If the results mix lists and dicts or two dicts have the same table
+    """
+    if all(isinstance(result, list) for result in results):
+        return [item for result in results for item in result]
+    if not all(isinstance(result, dict) for result in results):
+        msg = "The R calls of a run must all return lists or all return dicts"
+        raise ValueError(msg)
+    merged = {}
+    for result in results:
+        duplicates = merged.keys() & result.keys()
+        if duplicates:
+            msg = f"R calls returned the same tables: {', '.join(sorted(duplicates))}"
+            raise ValueError(msg)
+        merged.update(result)
+    return merged
+
+@contextmanager
+def r_profile_section(name: str) -> Iterator[None]:
+    """Profile R code with Rprof when profiling is enabled for the run."""
+    profiler = current_profiler()
+    if profiler is None:
+        yield
+        return
 
-            return dataset.dump()
+    import rpy2.robjects as ro
 
-        return wrapper
-    return decorator
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "Rprof.out"
+        ro.r["Rprof"](str(path), interval=max(profiler.interval, 0.001), memory_profiling=True)
+        try:
+            yield
+        finally:
+            ro.r["Rprof"](ro.NULL)
+            profiler.add(f"{name}.Rprof.out", path.read_bytes())
 
-@task
-def run_r_task(
+@task(persist_result=False, cache_policy=NO_CACHE)
+def run_r_task(  # noqa: PLR0913
     r_file: str,
     r_function: str,
     r_preparation: RFuncArgs,
-) -> dict:
+    transfer: RTransfer | str = RTransfer.PANDAS2RI,
+    libraries: list[str] | None = None,
+    output_dir: str | None = None,
+    dataset_type: DatasetType | None = None,
+    compact_dtypes: bool = False,
+) -> dict | list:
     import rpy2.robjects as ro
-    from rpy2.robjects import pandas2ri
     from rpy2.robjects.conversion import localconverter
+    from md_dataset.r.convert import RResultConverter
+    from md_dataset.r.session import get_session
+    from md_dataset.r.stats import RCallStats
+    from md_dataset.r.stats import r_snapshot
+    from md_dataset.r.transfer import r_converter
 
     logger = get_run_logger()
     logger.info("Running R task with function %s in file %s", r_function, r_file)
 
-    r = ro.r
-    r.source(r_file)
-    r_func = getattr(r, r_function)
-
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        r_data_frames = [ro.conversion.py2rpy(df) for df in r_preparation.data_frames]
-
-    r_out = r_func(*r_data_frames, *r_preparation.r_args)
-
-    with (ro.default_converter + pandas2ri.converter).context():
-        return recursive_conversion(r_out)
-
-def _convert_r_string_to_python(r_obj) -> str: # noqa: ANN001
-    """Convert R string object to Python string."""
-    import rpy2.robjects as ro
+    session = get_session()
+    with session.lock:
+        session.load_libraries(libraries or [])
+        r_func = session.function(r_file, r_function)
+        converter = r_converter(transfer)
+
+        start = time.perf_counter()
+        with resource_phase("python_to_r"), trace_span("python_to_r", transfer=RTransfer(transfer).value, \
+                **r_preparation.counts()), localconverter(converter):
+            r_data_frames = [ro.conversion.py2rpy(df) for df in r_preparation.data_frames]
+        python_to_r_seconds = time.perf_counter() - start
+
+        before = r_snapshot(reset=True)
+        with resource_phase("r_call"), trace_span("r_call", function=r_function), r_profile_section("r_call"):
+            r_out = r_func(*r_data_frames, *r_preparation.r_args)
+        after = r_snapshot()
+
+        result_converter = RResultConverter(dataset_type, output_dir, compact_dtypes)
+        with resource_phase("r_to_python"), trace_span("r_to_python") as span:
+            results = result_converter.convert(r_out, converter)
+            span.set_attributes(**result_converter.summary())
+        result_converter.log_summary(logger)
+        RCallStats.from_snapshots(r_function, before, after, python_to_r_seconds, result_converter.seconds) \
+                .report(logger)
+        return results
+
+@task(persist_result=False, cache_policy=NO_CACHE)
+def run_r_worker_task(  # noqa: PLR0913
+    r_file: str,
+    r_function: str,
+    r_preparation: RFuncArgs,
+    libraries: list[str] | None = None,
+    output_dir: str | None = None,
+    dataset_type: DatasetType | None = None,
+    compact_dtypes: bool = False,
+) -> dict | list:
+    from md_dataset.r.convert import RResultConverter
+    from md_dataset.r.worker import get_pool
 
-    if isinstance(r_obj, ro.vectors.StrVector):
-        return r_obj[0]  # Extract first element
-    return ro.conversion.get_conversion().rpy2py(r_obj)
-
-
-def _extract_table_items(tables_data) -> list: # noqa: ANN001
-    """Extract table items from tables data structure."""
-    if isinstance(tables_data, dict):
-        # Handle OrdDict - access values directly
-        if hasattr(tables_data, "items"):
-            # This is an OrdDict or similar R object
-            return [recursive_conversion(value) for key, value in tables_data.items()]
-        # Regular Python dict
-        return list(tables_data.values())
-    # Already a list
-    return tables_data
-
-
-def _convert_to_intensity_data_objects(converted_list) -> list: # noqa: ANN001
-    """Convert list of dictionaries to IntensityData objects."""
-    from md_dataset.models.dataset import IntensityData
-    from md_dataset.models.dataset import IntensityEntity
-    from md_dataset.models.dataset import IntensityTable
-    from md_dataset.models.dataset import IntensityTableType
     logger = get_run_logger()
-
-    logger.info("Converting to IntensityData objects")
-    intensity_data_list = []
-
-    for item in converted_list:
-        # Convert entity
-        entity_str = _convert_r_string_to_python(item["entity"])
-        entity = IntensityEntity(entity_str)
-
-        # Convert tables
-        tables = []
-        table_items = _extract_table_items(item["tables"])
-
-        for table_item in table_items:
-            table_type_str = _convert_r_string_to_python(table_item["type"])
-            table_type = IntensityTableType(table_type_str)
-            table_data = table_item["data"]  # Already converted to DataFrame
-            tables.append(IntensityTable(type=table_type, data=table_data))
-
-        intensity_data_list.append(IntensityData(entity=entity, tables=tables))
-
-    return intensity_data_list
-
-
-def _is_intensity_data_structure(converted_list) -> bool: # noqa: ANN001
-    """Check if the converted list looks like IntensityData objects."""
-    return (len(converted_list) > 0 and
-            isinstance(converted_list[0], dict) and
-            "entity" in converted_list[0] and
-            "tables" in converted_list[0])
-
-
-def recursive_conversion(r_object) -> dict | list: # noqa: ANN001
+    logger.info("Running R task with function %s in file %s on an R worker", r_function, r_file)
+
+    result_converter = RResultConverter(dataset_type, output_dir)
+    results = result_converter.convert_python(get_pool().run(r_file, r_function, r_preparation, libraries, \
+            compact_dtypes))
+    result_converter.log_summary(logger)
+    return results
+
+@deprecated(reason="use md_dataset.r.convert.RResultConverter")
+def recursive_conversion(r_object, output_dir: str | None = None) -> dict | list: # noqa: ANN001
+    """Convert an R result to Python with the active rpy2 conversion.
+
+    Args:
+        r_object: The R result
+        output_dir: Directory of the parquet output files, whose names are replaced with stand-ins
+    """
     import rpy2.robjects as ro
-    logger = get_run_logger()
-
-    if isinstance(r_object, ro.vectors.ListVector):
-        # Check if it's a named list (has names, i.e LEGACY) or regular list
-        if r_object.names:
-            logger.info("Convert named ListVector to dict")
-            return {key: recursive_conversion(value) for key, value in r_object.items()}
-
-        logger.info("Convert unnamed ListVector to list")
-        converted_list = [recursive_conversion(value) for value in r_object]
-
-        # Check if this looks like a list of IntensityData objects
-        if _is_intensity_data_structure(converted_list):
-            return _convert_to_intensity_data_objects(converted_list)
-
-        return converted_list
-
-    # Handle R data frames
-    if hasattr(r_object, "colnames") and hasattr(r_object, "nrow"):
-        logger.info("Convert R data frame to pandas DataFrame")
-        return ro.conversion.get_conversion().rpy2py(r_object)
-
-    logger.info("Convert: %s", type(r_object))
-    return ro.conversion.get_conversion().rpy2py(r_object)
+    from md_dataset.r.convert import RResultConverter
 
+    return RResultConverter(output_dir=output_dir).convert(r_object, ro.conversion.get_conversion())
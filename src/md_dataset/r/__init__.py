@@ -0,0 +1,11 @@
+"""R runtime support for md_r flows.
+
+The embedded session and transfer modules need rpy2, the worker pool needs
+Rscript with the arrow and jsonlite R packages.
+"""
+
+import os
+
+# Comma separated R libraries attached when an R session or worker starts
+R_PRELOAD_LIBRARIES = [library.strip() for library in os.getenv("R_PRELOAD_LIBRARIES", "").split(",") \
+        if library.strip()]
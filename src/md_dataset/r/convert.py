@@ -0,0 +1,175 @@
+"""Conversion of R function results to the tables of a dataset.
+
+A result is walked once, without recursion. Data frames are converted with
+the transfer converter, optionally into the compact dtypes of
+md_dataset.r.dtypes, character scalars are read as str, and when the
+dataset is an intensity dataset the list of entities is built into
+IntensityData objects directly. Results of R workers, already Python
+structures, go through the same building.
+"""
+
+from __future__ import annotations
+import time
+from typing import TYPE_CHECKING
+import pandas as pd
+from md_dataset.models.dataset import DatasetType
+from md_dataset.models.dataset import IntensityData
+from md_dataset.models.dataset import IntensityEntity
+from md_dataset.models.dataset import IntensityTable
+from md_dataset.models.dataset import IntensityTableType
+from md_dataset.r.dtypes import R_ARROW_STRINGS
+from md_dataset.r.dtypes import compact_frame
+from md_dataset.r.dtypes import r_column_classes
+from md_dataset.r.outputs import output_frame
+from md_dataset.r.outputs import output_name
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from logging import Logger
+    from logging import LoggerAdapter
+    from rpy2.robjects.conversion import Converter
+
+INTENSITY_FIELDS = {"entity", "tables"}
+
+
+class RResultConverter:
+    """Converts R results for a dataset type, counting what it converted.
+
+    Args:
+        dataset_type: Type of the dataset the result is for, None to infer intensity results from their layout
+        output_dir: Directory of the parquet output files, whose names are replaced with stand-ins
+        compact_dtypes: Map data frame columns to the compact dtypes of their R classes, see md_dataset.r.dtypes
+        arrow_strings: With compact_dtypes, convert R character columns to Arrow backed strings
+    """
+
+    def __init__(self, dataset_type: DatasetType | None = None, output_dir: str | None = None, \
+            compact_dtypes: bool = False, arrow_strings: bool = R_ARROW_STRINGS):
+        self.dataset_type = dataset_type
+        self.output_dir = output_dir
+        self.compact_dtypes = compact_dtypes
+        self.arrow_strings = arrow_strings
+        self.tables = 0
+        self.rows = 0
+        self.values = 0
+        self.seconds = 0.0
+        self._converter: Converter | None = None
+
+    def convert(self, r_object: object, converter: Converter) -> dict | list:
+        """Convert an R result, with data frames converted by `converter`."""
+        import rpy2.robjects as ro
+
+        start = time.perf_counter()
+        self._converter = converter
+        # Lists are walked as plain R objects, only data frames go through `converter`
+        with ro.default_converter.context():
+            result = self._build(r_object, self._r_fields, self._r_items)
+        self.seconds += time.perf_counter() - start
+        return result
+
+    def convert_python(self, result: object) -> dict | list:
+        """Convert the result of an R worker, a structure of dicts, lists, str and DataFrames."""
+        start = time.perf_counter()
+        self._converter = None
+        result = self._build(result, lambda value: value if isinstance(value, dict) else None, \
+                lambda value: value if isinstance(value, list) else None)
+        self.seconds += time.perf_counter() - start
+        return result
+
+    def log_summary(self, logger: Logger | LoggerAdapter) -> None:
+        logger.info("Converted R result in %.3fs: %d tables, %d rows, %d other values", \
+                self.seconds, self.tables, self.rows, self.values)
+
+    def summary(self) -> dict:
+        return {"tables": self.tables, "rows": self.rows}
+
+    # `fields` gives the named fields of a list and `items` the items of an unnamed list, None for other values
+    def _build(self, value: object, fields: Callable[[object], dict | None], \
+            items: Callable[[object], list | None]) -> dict | list:
+        entries = items(value)
+        if self.dataset_type in (None, DatasetType.INTENSITY) and entries and \
+                all(set(fields(entry) or ()) >= INTENSITY_FIELDS for entry in entries):
+            return [self._intensity_data(fields(entry), fields, items) for entry in entries]
+        return self._walk(value, fields, items)
+
+    def _intensity_data(self, entry: dict, fields: Callable[[object], dict | None], \
+            items: Callable[[object], list | None]) -> IntensityData:
+        tables = items(entry["tables"])
+        if tables is None:
+            tables = list((fields(entry["tables"]) or {}).values())
+        return IntensityData(entity=IntensityEntity(output_name(entry["entity"])), tables=[
+            IntensityTable(type=IntensityTableType(output_name(table["type"])), data=self._table(table["data"])) \
+                    for table in map(fields, tables)])
+
+    def _walk(self, value: object, fields: Callable[[object], dict | None], \
+            items: Callable[[object], list | None]) -> object:
+        root = [None]
+        stack = [(value, root, 0)]
+        while stack:
+            current, parent, key = stack.pop()
+            named, unnamed = fields(current), items(current)
+            if named is not None:
+                container = dict.fromkeys(named)
+                stack.extend((item, container, name) for name, item in named.items())
+            elif unnamed is not None:
+                container = [None] * len(unnamed)
+                stack.extend((item, container, i) for i, item in enumerate(unnamed))
+            else:
+                container = self._leaf(current)
+            parent[key] = container
+        return root[0]
+
+    def _table(self, value: object) -> pd.DataFrame:
+        table = self._leaf(value)
+        if not isinstance(table, pd.DataFrame):
+            msg = f"Table data must be a data frame or a parquet output file name, got {type(value).__name__}"
+            raise TypeError(msg)
+        return table
+
+    def _leaf(self, value: object) -> object:
+        if isinstance(value, pd.DataFrame):
+            return self._counted(value)
+        if "data.frame" in getattr(value, "rclass", ()):
+            import rpy2.robjects as ro
+
+            with self._converter.context():
+                frame = ro.conversion.get_conversion().rpy2py(value)
+            if self.compact_dtypes:
+                frame = compact_frame(frame, r_column_classes(value), self.arrow_strings)
+            return self._counted(frame)
+
+        name = output_name(value)
+        if name is not None and self.output_dir is not None:
+            frame = output_frame(name, self.output_dir)
+            if frame is not None:
+                return self._counted(frame)
+        self.values += 1
+        if name is not None:
+            return name
+        if self._converter is None:
+            return value
+
+        import rpy2.robjects as ro
+
+        with self._converter.context():
+            return ro.conversion.get_conversion().rpy2py(value)
+
+    def _counted(self, frame: pd.DataFrame) -> pd.DataFrame:
+        self.tables += 1
+        self.rows += len(frame)
+        return frame
+
+    @staticmethod
+    def _r_fields(value: object) -> dict | None:
+        import rpy2.robjects as ro
+
+        if isinstance(value, ro.vectors.ListVector) and "data.frame" not in value.rclass and value.names:
+            return dict(zip(value.names, value, strict=True))
+        return None
+
+    @staticmethod
+    def _r_items(value: object) -> list | None:
+        import rpy2.robjects as ro
+
+        if isinstance(value, ro.vectors.ListVector) and "data.frame" not in value.rclass and not value.names:
+            return list(value)
+        return None
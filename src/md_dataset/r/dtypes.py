@@ -0,0 +1,91 @@
+"""Compact pandas dtypes for the data frames of R results.
+
+Converted as is, R integer columns with missing values become float64 and
+logical ones object, and character columns become object strings. With
+md_r(..., compact_dtypes=True) columns are mapped by their R class instead:
+integer to Int32, logical to boolean and factor to category, which keep their
+width and missing values, and character to Arrow backed strings with
+R_ARROW_STRINGS.
+"""
+
+from __future__ import annotations
+import os
+from functools import cache
+from typing import TYPE_CHECKING
+import pandas as pd
+import pyarrow as pa
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pandas.api.extensions import ExtensionDtype
+
+# Convert R character columns to Arrow backed strings rather than Python objects
+R_ARROW_STRINGS = os.getenv("R_ARROW_STRINGS", "false").lower() == "true"
+
+# NA of R integer and logical vectors when they reach numpy as int32
+NA_INTEGER = -(2**31)
+
+_R_COLUMN_CLASSES = "function(df) vapply(df, function(column) class(column)[1], character(1), USE.NAMES = FALSE)"
+
+
+def arrow_types_mapper(arrow_strings: bool = R_ARROW_STRINGS) -> Callable[[pa.DataType], ExtensionDtype | None]:
+    """The types_mapper of Table.to_pandas for tables of R data frames, dictionaries become categoricals anyway."""
+    mapping = {
+        pa.int8(): pd.Int8Dtype(),
+        pa.int16(): pd.Int16Dtype(),
+        pa.int32(): pd.Int32Dtype(),
+        pa.int64(): pd.Int64Dtype(),
+        pa.bool_(): pd.BooleanDtype(),
+    }
+    if arrow_strings:
+        mapping[pa.string()] = pd.StringDtype("pyarrow")
+        mapping[pa.large_string()] = pd.StringDtype("pyarrow")
+    return mapping.get
+
+
+def compact_frame(df: pd.DataFrame, r_classes: list[str], arrow_strings: bool = R_ARROW_STRINGS) -> pd.DataFrame:
+    """Map the columns of a converted R data frame to the compact dtypes of their R classes."""
+    compacted = None
+    for i, ((_, values), r_class) in enumerate(zip(df.items(), r_classes, strict=True)):
+        compact = compact_column(values, r_class, arrow_strings)
+        if compact is not values:
+            if compacted is None:
+                compacted = df.copy(deep=False)
+            compacted.isetitem(i, compact)
+    return df if compacted is None else compacted
+
+
+def compact_column(values: pd.Series, r_class: str, arrow_strings: bool = R_ARROW_STRINGS) -> pd.Series:
+    """The column in the compact dtype of R class `r_class`, `values` itself when it already has it."""
+    if r_class == "factor":
+        return values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category")
+    if r_class == "integer":
+        return _nullable(values, pd.Int32Dtype())
+    if r_class == "logical":
+        return _nullable(values, pd.BooleanDtype())
+    if r_class == "character" and arrow_strings and getattr(values.dtype, "storage", None) != "pyarrow":
+        return values.astype(pd.StringDtype("pyarrow"))
+    return values
+
+
+def _nullable(values: pd.Series, dtype: ExtensionDtype) -> pd.Series:
+    if values.dtype == dtype:
+        return values
+    if values.dtype.kind in "iu":
+        values = values.mask(values == NA_INTEGER)
+    return values.astype(dtype)
+
+
+@cache
+def _r_column_classes():  # noqa: ANN202
+    import rpy2.robjects as ro
+
+    return ro.r(_R_COLUMN_CLASSES)
+
+
+def r_column_classes(r_frame: object) -> list[str]:
+    """The first class of each column of an R data frame."""
+    import rpy2.robjects as ro
+
+    with ro.default_converter.context():
+        return list(_r_column_classes()(r_frame))
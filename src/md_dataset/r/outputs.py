@@ -0,0 +1,41 @@
+"""Output tables R functions write as parquet files themselves.
+
+With md_r(..., parquet_outputs=True) each R call gets a directory of its own
+as its last argument, writes each output table there with
+arrow::write_parquet and returns the usual layout with the file names in
+place of the data frames:
+
+    list(list(entity = "Protein", tables = list(
+      list(type = "intensity", data = "Protein_Intensity.parquet"))))
+
+The files are checked from their footers and uploaded as they are.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import TYPE_CHECKING
+from md_dataset.storage.parquet import parquet_file_frame
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def output_name(value: object) -> str | None:
+    """The string of a character scalar, as a str or a one element sequence."""
+    if isinstance(value, str):
+        return value
+    if hasattr(value, "__len__") and len(value) == 1 and isinstance(value[0], str):
+        return value[0]
+    return None
+
+
+def output_frame(value: object, output_dir: str) -> pd.DataFrame | None:
+    """The stand-in of the parquet file `value` names in `output_dir`, None if it names none."""
+    name = output_name(value)
+    if name is None or not name.endswith(".parquet"):
+        return None
+    path = Path(output_dir, name).resolve()
+    if not path.is_relative_to(Path(output_dir).resolve()) or not path.is_file():
+        return None
+    return parquet_file_frame(path)
+
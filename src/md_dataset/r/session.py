@@ -0,0 +1,109 @@
+"""The embedded R session shared by the R tasks of a process.
+
+Each R file is sourced once into its own environment, so functions of the same
+name in different files do not clash, and is sourced again only when its
+modification time and content change. R libraries are attached once, those in
+R_PRELOAD_LIBRARIES when the session starts and those an md_r flow declares on
+first use.
+"""
+
+from __future__ import annotations
+import hashlib
+import logging
+import threading
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+import rpy2.robjects as ro
+from md_dataset.r import R_PRELOAD_LIBRARIES
+from md_dataset.telemetry import trace_span
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class SourcedFile(NamedTuple):
+    mtime_ns: int
+    digest: str
+    environment: ro.Environment
+
+
+class RSession:
+    """Sources R files and attaches R libraries once per process.
+
+    R is single threaded, so R tasks hold `lock` while they use the session.
+    """
+
+    def __init__(self, libraries: Iterable[str] = ()):
+        self.lock = threading.RLock()
+        self.libraries: set[str] = set()
+        self.files: dict[str, SourcedFile] = {}
+        self.load_libraries(libraries)
+
+    def load_libraries(self, libraries: Iterable[str]) -> None:
+        """Attach the libraries not attached yet."""
+        with self.lock:
+            missing = [library for library in libraries if library not in self.libraries]
+            if not missing:
+                return
+            with trace_span("r_libraries", libraries=",".join(missing)):
+                for library in missing:
+                    ro.r["library"](library, character_only=True, quietly=True)
+                    self.libraries.add(library)
+            logger.info("Attached R libraries %s", ", ".join(missing))
+
+    def source(self, r_file: str) -> bool:
+        """Source `r_file` unless it is unchanged since it was last sourced.
+
+        Returns:
+            Whether the file was sourced
+        """
+        path = Path(r_file).resolve()
+        with self.lock:
+            mtime_ns = path.stat().st_mtime_ns
+            sourced = self.files.get(str(path))
+            if sourced is not None and sourced.mtime_ns == mtime_ns:
+                return False
+
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            if sourced is not None and sourced.digest == digest:
+                self.files[str(path)] = sourced._replace(mtime_ns=mtime_ns)
+                return False
+
+            environment = ro.r["new.env"](parent=ro.globalenv)
+            with trace_span("r_source", file=r_file):
+                ro.r["source"](str(path), local=environment)
+            self.files[str(path)] = SourcedFile(mtime_ns=mtime_ns, digest=digest, environment=environment)
+            logger.info("%s R file %s", "Reloaded" if sourced is not None else "Sourced", r_file)
+            return True
+
+    def function(self, r_file: str, r_function: str) -> ro.functions.Function:
+        """The R function `r_function` of `r_file`, sourcing the file if it is new or changed."""
+        with self.lock:
+            self.source(r_file)
+            environment = self.files[str(Path(r_file).resolve())].environment
+            return ro.r["get"](r_function, envir=environment, mode="function")
+
+
+_session_lock = threading.Lock()
+
+
+@cache
+def _get_session() -> RSession:
+    return RSession(R_PRELOAD_LIBRARIES)
+
+
+def get_session() -> RSession:
+    """The R session of this process, created once when R tasks and the warm-up ask for it at once."""
+    with _session_lock:
+        return _get_session()
+
+
+def warm_up(r_file: str, libraries: Iterable[str] = ()) -> None:
+    """Start R, attach `libraries` and source `r_file` ahead of the first call of one of its functions."""
+    session = get_session()
+    session.load_libraries(libraries)
+    session.source(r_file)
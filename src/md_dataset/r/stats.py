@@ -0,0 +1,83 @@
+"""Time and memory of R calls, measured by R.
+
+R is asked for a snapshot before and after each call: its CPU and elapsed
+time, the time it spent collecting garbage and the memory of its heap. The
+first snapshot resets R's "max used" counters, so the second one holds the
+peak heap of the call. Taking a snapshot runs the garbage collector.
+"""
+
+from __future__ import annotations
+from functools import cache
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+from md_dataset.telemetry import record_usage
+from md_dataset.telemetry.resources import format_bytes
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from logging import Logger
+    from logging import LoggerAdapter
+
+# user, system and elapsed seconds, gc seconds, heap used and max used MB; the same function is in worker.R
+R_SNAPSHOT = """
+function(reset) {
+  if (reset) memory <- gc(reset = TRUE)
+  times <- c(proc.time()[1:3], gc.time()[3])
+  if (!reset) memory <- gc()
+  unname(c(times, sum(memory[, 2]), sum(memory[, 6])))
+}
+"""
+
+MB = 1024 * 1024
+
+
+class RCallStats(NamedTuple):
+    function: str
+    python_to_r_seconds: float
+    r_elapsed_seconds: float
+    r_cpu_seconds: float
+    r_gc_seconds: float
+    r_heap_before_bytes: int
+    r_heap_after_bytes: int
+    r_heap_peak_bytes: int
+    r_to_python_seconds: float
+
+    @classmethod
+    def from_snapshots(cls, function: str, before: Sequence[float], after: Sequence[float], \
+            python_to_r_seconds: float, r_to_python_seconds: float) -> RCallStats:
+        """The stats of a call from the R snapshots taken before and after it."""
+        return cls(
+            function=function,
+            python_to_r_seconds=python_to_r_seconds,
+            r_elapsed_seconds=after[2] - before[2],
+            r_cpu_seconds=after[0] + after[1] - before[0] - before[1],
+            r_gc_seconds=after[3] - before[3],
+            r_heap_before_bytes=int(before[4] * MB),
+            r_heap_after_bytes=int(after[4] * MB),
+            r_heap_peak_bytes=int(after[5] * MB),
+            r_to_python_seconds=r_to_python_seconds,
+        )
+
+    def report(self, logger: Logger | LoggerAdapter) -> None:
+        """Log the stats and add them to the r_calls of the run's resource usage."""
+        logger.info("R call %s: python to R %.3fs, R elapsed %.3fs, cpu %.3fs, gc %.3fs, heap %s before, "
+                    "%s after, %s peak, R to python %.3fs", self.function, self.python_to_r_seconds,
+                    self.r_elapsed_seconds, self.r_cpu_seconds, self.r_gc_seconds,
+                    format_bytes(self.r_heap_before_bytes), format_bytes(self.r_heap_after_bytes),
+                    format_bytes(self.r_heap_peak_bytes), self.r_to_python_seconds)
+        record_usage("r_calls", self._asdict())
+
+
+@cache
+def _r_snapshot():  # noqa: ANN202
+    import rpy2.robjects as ro
+
+    return ro.r(R_SNAPSHOT)
+
+
+def r_snapshot(reset: bool = False) -> list[float]:
+    """A snapshot of the embedded R session, `reset` before a call and not after it."""
+    import rpy2.robjects as ro
+
+    with ro.default_converter.context():
+        return list(_r_snapshot()(reset))
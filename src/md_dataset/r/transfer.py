@@ -0,0 +1,136 @@
+"""Data frame transfer between pandas and R over the Arrow C data interface.
+
+pyarrow exports a record batch stream into an ArrowArrayStream struct, which
+the arrow R package imports by address, and the other way round for results.
+Arrow buffers are moved rather than serialized, and numeric columns of the R
+data frames stay backed by them. Frames Arrow cannot represent, and sessions
+without the arrow R package, fall back to pandas2ri.
+"""
+
+from __future__ import annotations
+import ctypes
+import logging
+from functools import cache
+import pandas as pd
+import pyarrow as pa
+import rpy2.robjects as ro
+from rpy2.rinterface import ListSexpVector
+from rpy2.rinterface_lib.embedded import RRuntimeError
+from rpy2.robjects import pandas2ri
+from rpy2.robjects.conversion import Converter
+from rpy2.robjects.vectors import DataFrame
+from md_dataset.models.r import RTableRef
+from md_dataset.models.r import RTransfer
+
+logger = logging.getLogger(__name__)
+
+_R_HELPERS = """
+list(
+  import_frame = function(address) {
+    as.data.frame(arrow::RecordBatchStreamReader$import_from_c(address)$read_table())
+  },
+  export_frame = function(df, address) {
+    arrow::as_record_batch_reader(arrow::as_arrow_table(df))$export_to_c(address)
+  }
+)
+"""
+
+
+class _ArrowArrayStream(ctypes.Structure):
+    """The ArrowArrayStream struct of the Arrow C stream interface."""
+
+    _fields_ = (
+        ("get_schema", ctypes.c_void_p),
+        ("get_next", ctypes.c_void_p),
+        ("get_last_error", ctypes.c_void_p),
+        ("release", ctypes.c_void_p),
+        ("private_data", ctypes.c_void_p),
+    )
+
+    def release_if_owned(self) -> None:
+        # The importer sets release to NULL once it took ownership
+        if self.release:
+            ctypes.CFUNCTYPE(None, ctypes.c_void_p)(self.release)(ctypes.addressof(self))
+
+
+@cache
+def r_arrow_available() -> bool:
+    """Whether the arrow R package can be loaded in the embedded R session."""
+    return bool(ro.r('requireNamespace("arrow", quietly = TRUE)')[0])
+
+
+@cache
+def _helpers() -> ro.vectors.ListVector:
+    return ro.r(_R_HELPERS)
+
+
+def py2rpy_arrow(df: pd.DataFrame) -> ro.vectors.DataFrame:
+    """Move a pandas DataFrame into an R data frame as Arrow record batches."""
+    try:
+        reader = pa.Table.from_pandas(df, preserve_index=False).to_reader()
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        logger.debug("Columns %s have no Arrow type, converting with pandas2ri", list(df.columns))
+        return pandas2ri.py2rpy(df)
+
+    stream = _ArrowArrayStream()
+    try:
+        reader._export_to_c(ctypes.addressof(stream))  # noqa: SLF001
+        with ro.default_converter.context():
+            return _helpers().rx2("import_frame")(float(ctypes.addressof(stream)))
+    finally:
+        stream.release_if_owned()
+
+
+def rpy2py_arrow(obj: ro.vectors.DataFrame) -> pd.DataFrame:
+    """Move an R data frame into a pandas DataFrame as Arrow record batches."""
+    stream = _ArrowArrayStream()
+    try:
+        with ro.default_converter.context():
+            _helpers().rx2("export_frame")(obj, float(ctypes.addressof(stream)))
+        return pa.RecordBatchReader._import_from_c(ctypes.addressof(stream)).read_all().to_pandas()  # noqa: SLF001
+    except RRuntimeError:
+        logger.debug("R data frame has columns without an Arrow type, converting with pandas2ri")
+        return pandas2ri.rpy2py(obj)
+    finally:
+        stream.release_if_owned()
+
+
+arrow_converter = Converter("md_dataset arrow")
+
+
+@arrow_converter.py2rpy.register(pd.DataFrame)
+def _py2rpy_data_frame(obj: pd.DataFrame) -> ro.vectors.DataFrame:
+    return py2rpy_arrow(obj)
+
+
+@arrow_converter.rpy2py.register(DataFrame)
+def _rpy2py_data_frame(obj: DataFrame) -> pd.DataFrame:
+    return rpy2py_arrow(obj)
+
+
+@arrow_converter.rpy2py.register(ListSexpVector)
+def _rpy2py_list(obj: ListSexpVector) -> object:
+    # Elements of R lists reach the converter as plain list vectors
+    if "data.frame" in obj.rclass:
+        return rpy2py_arrow(DataFrame(obj))
+    return pandas2ri.converter.rpy2py.dispatch(ListSexpVector)(obj)
+
+
+table_ref_converter = Converter("md_dataset table references")
+
+
+@table_ref_converter.py2rpy.register(RTableRef)
+def _py2rpy_table_ref(obj: RTableRef) -> ro.vectors.ListVector:
+    columns = ro.StrVector(obj.columns) if obj.columns is not None else ro.NULL
+    return ro.ListVector({"uri": ro.StrVector([obj.uri]), "columns": columns})
+
+
+def r_converter(transfer: RTransfer | str = RTransfer.PANDAS2RI) -> Converter:
+    """The rpy2 converter moving data frames between pandas and R with `transfer`."""
+    converter = ro.default_converter + pandas2ri.converter + table_ref_converter
+    if RTransfer(transfer) is not RTransfer.ARROW:
+        return converter
+    if not r_arrow_available():
+        logger.warning("The arrow R package is not installed, converting data frames with pandas2ri")
+        return converter
+    return converter + arrow_converter
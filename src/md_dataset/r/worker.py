@@ -0,0 +1,276 @@
+"""R functions run in a pool of Rscript worker processes.
+
+Each worker is a persistent Rscript running worker.R, which keeps its sourced
+files and attached libraries between calls. Tables go to the worker and back
+as Arrow IPC files in a per call directory under R_WORKER_TMPDIR, which can be
+pointed at /dev/shm to keep them in shared memory. Workers are started on
+demand, up to R_WORKERS at once. A worker is replaced after
+R_WORKER_MAX_CALLS calls, which returns the memory R keeps, and one that
+crashed or was killed for running longer than R_WORKER_CALL_TIMEOUT is
+replaced on the next call.
+"""
+
+from __future__ import annotations
+import atexit
+import json
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+import pyarrow as pa
+from md_dataset.models.r import RTableRef
+from md_dataset.r import R_PRELOAD_LIBRARIES
+from md_dataset.r.dtypes import arrow_types_mapper
+from md_dataset.r.stats import RCallStats
+from md_dataset.telemetry import resource_phase
+from md_dataset.telemetry import trace_span
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from md_dataset.models.r import RFuncArgs
+
+logger = logging.getLogger(__name__)
+
+# Worker processes running R functions at once
+R_WORKERS = int(os.getenv("R_WORKERS", str(os.cpu_count() or 1)))
+# Calls after which a worker is replaced, returning all of its memory. 0 keeps workers
+R_WORKER_MAX_CALLS = int(os.getenv("R_WORKER_MAX_CALLS", "20"))
+# Seconds a worker may take to start or to answer a call before it is killed. 0 waits forever
+R_WORKER_CALL_TIMEOUT = float(os.getenv("R_WORKER_CALL_TIMEOUT", "14400"))
+# Directory for the Arrow IPC files exchanged with workers, default the system temp directory
+R_WORKER_TMPDIR = os.getenv("R_WORKER_TMPDIR") or None
+RSCRIPT = os.getenv("RSCRIPT", "Rscript")
+
+WORKER_SCRIPT = Path(__file__).with_name("worker.R")
+TABLE_KEY = "__table__"
+
+
+class RWorkerError(RuntimeError):
+    """An R function failed in a worker, or the worker exited."""
+
+
+class RWorkerTimeoutError(RWorkerError):
+    """A worker did not answer in time and was killed."""
+
+
+class RWorker:
+    """A persistent Rscript process running worker.R."""
+
+    def __init__(self, libraries: list[str] | None = None, timeout: float = R_WORKER_CALL_TIMEOUT):
+        """Start a worker.
+
+        Args:
+            libraries: R libraries attached when it starts
+            timeout: Seconds it may take to start or to answer a call before it is killed, 0 waits forever
+        """
+        self.calls = 0
+        self.timeout = timeout
+        self.process = subprocess.Popen(  # noqa: S603
+            [RSCRIPT, "--vanilla", str(WORKER_SCRIPT), *(libraries or [])],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        self._stderr = threading.Thread(target=self._log_stderr, name=f"md-r-worker-{self.pid}", daemon=True)
+        self._stderr.start()
+        # Responses are read in a thread, so waiting for one can time out
+        self._responses: queue.Queue[str] = queue.Queue()
+        self._stdout = threading.Thread(target=self._read_stdout, name=f"md-r-worker-out-{self.pid}", daemon=True)
+        self._stdout.start()
+        self._read_response()
+        logger.info("Started R worker %d", self.pid)
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _log_stderr(self) -> None:
+        for line in self.process.stderr:
+            logger.info("R worker %d: %s", self.pid, line.rstrip())
+
+    def _read_stdout(self) -> None:
+        for line in self.process.stdout:
+            self._responses.put(line)
+        self._responses.put("")
+
+    def _read_response(self) -> dict:
+        try:
+            line = self._responses.get(timeout=self.timeout or None)
+        except queue.Empty:
+            self.process.kill()
+            self.process.wait()
+            msg = f"R worker {self.pid} did not answer within {self.timeout:.0f}s and was killed"
+            raise RWorkerTimeoutError(msg) from None
+        if not line:
+            msg = f"R worker {self.pid} exited with code {self.process.wait()}"
+            raise RWorkerError(msg)
+        response = json.loads(line)
+        if response["status"] == "error":
+            raise RWorkerError(response["message"])
+        return response
+
+    def call(self, request: dict) -> dict:
+        """Send a request and wait for its response."""
+        self.calls += 1
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except BrokenPipeError as e:
+            msg = f"R worker {self.pid} exited with code {self.process.wait()}"
+            raise RWorkerError(msg) from e
+        return self._read_response()
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self.alive:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._stderr.join(timeout=timeout)
+        self._stdout.join(timeout=timeout)
+
+
+class RWorkerPool:
+    """Runs R functions on up to `size` worker processes at once."""
+
+    def __init__(self, size: int = R_WORKERS, max_calls: int = R_WORKER_MAX_CALLS, \
+            libraries: list[str] | None = None, call_timeout: float = R_WORKER_CALL_TIMEOUT):
+        self.size = size
+        self.max_calls = max_calls
+        self.call_timeout = call_timeout
+        self.libraries = list(R_PRELOAD_LIBRARIES if libraries is None else libraries)
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: list[RWorker] = []
+
+    def _acquire(self) -> RWorker:
+        self._slots.acquire()
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        if worker is not None and worker.alive:
+            return worker
+        try:
+            return RWorker(self.libraries, self.call_timeout)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker: RWorker) -> None:
+        if worker.alive and (not self.max_calls or worker.calls < self.max_calls):
+            with self._lock:
+                self._idle.append(worker)
+        else:
+            worker.close()
+        self._slots.release()
+
+    def warm_up(self, r_file: str, libraries: list[str] | None = None) -> None:
+        """Start a worker, if none is idle, and have it attach `libraries` and source `r_file`."""
+        worker = self._acquire()
+        try:
+            worker.call({"r_file": str(Path(r_file).resolve()), "libraries": libraries or [], "warm_up": True})
+        finally:
+            self._release(worker)
+
+    def run(self, r_file: str, r_function: str, r_preparation: RFuncArgs, \
+            libraries: list[str] | None = None, compact_dtypes: bool = False) -> dict | list:
+        """Call `r_function` of `r_file` with the data frames and arguments of `r_preparation`.
+
+        Args:
+            r_file: R script defining the function
+            r_function: Name of the R function
+            r_preparation: Data frames and arguments of the call
+            libraries: R libraries the function uses
+            compact_dtypes: Read result tables in the compact dtypes of md_dataset.r.dtypes
+
+        Returns:
+            The R result with named lists as dicts, unnamed lists as lists and data frames as DataFrames
+        """
+        with tempfile.TemporaryDirectory(prefix="md-r-", dir=R_WORKER_TMPDIR) as directory:
+            start = time.perf_counter()
+            with resource_phase("python_to_r"), trace_span("python_to_r", transfer="arrow_ipc", \
+                    **r_preparation.counts()):
+                inputs = [encode_input(df, Path(directory) / f"input_{i}.arrow") \
+                        for i, df in enumerate(r_preparation.data_frames)]
+            python_to_r_seconds = time.perf_counter() - start
+
+            output_dir = Path(directory) / "output"
+            output_dir.mkdir()
+            request = {
+                "r_file": str(Path(r_file).resolve()),
+                "r_function": r_function,
+                "inputs": inputs,
+                "r_args": list(r_preparation.r_args),
+                "libraries": libraries or [],
+                "output_dir": str(output_dir),
+            }
+            worker = self._acquire()
+            try:
+                with resource_phase("r_call"), trace_span("r_call", function=r_function, worker=worker.pid):
+                    response = worker.call(request)
+            finally:
+                self._release(worker)
+
+            start = time.perf_counter()
+            with resource_phase("r_to_python"), trace_span("r_to_python"):
+                result = decode(response["result"], compact_dtypes)
+            RCallStats.from_snapshots(r_function, response["stats"]["before"], response["stats"]["after"], \
+                    python_to_r_seconds, time.perf_counter() - start).report(logger)
+            return result
+
+    def close(self) -> None:
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.close()
+
+
+def encode_input(data: pd.DataFrame | RTableRef, path: Path) -> dict:
+    """Describe an input of a call, writing DataFrames to `path` as Arrow IPC."""
+    if isinstance(data, RTableRef):
+        return {"uri": data.uri, "columns": data.columns}
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    with pa.ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table)
+    return {"ipc": str(path)}
+
+
+def decode(value: object, compact_dtypes: bool = False) -> object:
+    """Replace the table references of a worker result with the tables."""
+    if isinstance(value, dict):
+        if set(value) == {TABLE_KEY}:
+            with pa.ipc.open_file(value[TABLE_KEY]) as reader:
+                return reader.read_pandas(types_mapper=arrow_types_mapper() if compact_dtypes else None)
+        return {key: decode(item, compact_dtypes) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode(item, compact_dtypes) for item in value]
+    return value
+
+
+_pool_lock = threading.Lock()
+
+
+@cache
+def _get_pool() -> RWorkerPool:
+    pool = RWorkerPool()
+    atexit.register(pool.close)
+    return pool
+
+
+def get_pool() -> RWorkerPool:
+    """The R worker pool of this process, closed when the process exits."""
+    with _pool_lock:
+        return _get_pool()
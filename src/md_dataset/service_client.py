@@ -0,0 +1,195 @@
+"""HTTP client of the dataset service.
+
+The process shares one pooled requests session. A request the service
+accepts with 202 is followed by polling its Location until the response is
+no longer 202. The wait between polls grows exponentially with jitter up to
+a cap, or is what the Retry-After header asks for, and polling gives up at a
+deadline. `await_accepted_all` polls many accepted requests concurrently
+with httpx.
+"""
+
+from __future__ import annotations
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import time
+from datetime import UTC
+from datetime import datetime
+from functools import cache
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Mapping
+    from logging import Logger
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+ACCEPTED_STATUS_CODE = 202
+
+# Responses to a poll that are retried rather than raised
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Connections kept per host by the shared session and the async client
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+# Seconds of the first wait between polls, of the longest one and until polling gives up
+POLL_INITIAL_DELAY = float(os.getenv("DEPLOY_POLL_INITIAL_DELAY", "2"))
+POLL_MAX_DELAY = float(os.getenv("DEPLOY_POLL_MAX_DELAY", "30"))
+POLL_DEADLINE = float(os.getenv("DEPLOY_POLL_DEADLINE", "1800"))
+
+
+class PollTimeoutError(TimeoutError):
+    """An accepted request was still not done at the polling deadline."""
+
+
+class PollPolicy(NamedTuple):
+    initial_delay: float = POLL_INITIAL_DELAY
+    max_delay: float = POLL_MAX_DELAY
+    deadline: float = POLL_DEADLINE
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait before poll `attempt`, counted from 0: Retry-After when given, else backoff.
+
+        The backoff doubles from `initial_delay` up to `max_delay`, and a random half of it is jitter.
+        """
+        if retry_after is not None:
+            return retry_after
+        backoff = min(self.max_delay, self.initial_delay * 2 ** attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)  # noqa: S311
+
+
+@cache
+def get_session() -> requests.Session:
+    """The requests session of the process, whose connections are reused."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """The seconds of a Retry-After header, given as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+def location_url(base_url: str, location: str) -> str:
+    return location if location.startswith(("http://", "https://")) else f"{base_url}{location}"
+
+
+def _next_wait(policy: PollPolicy, attempt: int, headers: Mapping[str, str], deadline_at: float, \
+        location: str) -> float:
+    remaining = deadline_at - time.monotonic()
+    if remaining <= 0:
+        msg = f"{location} was not done after {policy.deadline:.0f}s"
+        raise PollTimeoutError(msg)
+    return min(policy.delay(attempt, retry_after_seconds(headers.get("Retry-After"))), remaining)
+
+
+def wait_for_accepted(  # noqa: PLR0913
+        base_url: str,
+        location: str,
+        headers: dict | None = None,
+        timeout: float = 50,
+        policy: PollPolicy | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        log: Logger = logger,
+) -> requests.Response:
+    """Poll the Location of an accepted request until it is done.
+
+    Args:
+        base_url: Base URL that a relative `location` is joined to
+        location: The Location header of the accepted response
+        headers: Headers of each poll, e.g. Authorization
+        timeout: Seconds each poll may take
+        policy: The waits between polls and the deadline
+        sleep: Waits between polls
+        log: Logs each poll
+
+    Returns:
+        The first response that is not 202
+
+    Raises:
+        PollTimeoutError: If it is not done at the deadline
+        requests.exceptions.HTTPError: If a poll fails with a status that is not retried
+    """
+    policy = policy or PollPolicy()
+    deadline_at = time.monotonic() + policy.deadline
+    session = get_session()
+    attempt = 0
+    while True:
+        url = location_url(base_url, location)
+        response = session.get(url, timeout=timeout, headers=headers)
+        log.info("url:%s status_code: %s", location, response.status_code)
+        if response.status_code not in RETRY_STATUS_CODES:
+            response.raise_for_status()
+            if response.status_code != ACCEPTED_STATUS_CODE:
+                return response
+            log.info("waiting for deployment...")
+            location = response.headers.get("Location", location)
+        sleep(_next_wait(policy, attempt, response.headers, deadline_at, location))
+        attempt += 1
+
+
+async def await_accepted(  # noqa: PLR0913
+        client: httpx.AsyncClient,
+        base_url: str,
+        location: str,
+        headers: dict | None = None,
+        policy: PollPolicy | None = None,
+        log: Logger = logger,
+) -> httpx.Response:
+    """wait_for_accepted with an httpx client, for awaiting many accepted requests at once."""
+    policy = policy or PollPolicy()
+    deadline_at = time.monotonic() + policy.deadline
+    attempt = 0
+    while True:
+        response = await client.get(location_url(base_url, location), headers=headers)
+        log.info("url:%s status_code: %s", location, response.status_code)
+        if response.status_code not in RETRY_STATUS_CODES:
+            response.raise_for_status()
+            if response.status_code != ACCEPTED_STATUS_CODE:
+                return response
+            location = response.headers.get("Location", location)
+        await asyncio.sleep(_next_wait(policy, attempt, response.headers, deadline_at, location))
+        attempt += 1
+
+
+async def await_accepted_all(  # noqa: PLR0913
+        base_url: str,
+        locations: list[str],
+        headers: dict | None = None,
+        request_timeout: float = 50,
+        policy: PollPolicy | None = None,
+        log: Logger = logger,
+) -> list[httpx.Response | BaseException]:
+    """Poll the Locations of many accepted requests concurrently over a pooled client.
+
+    Takes the arguments of wait_for_accepted, with `request_timeout` the seconds each poll may take.
+
+    Returns:
+        The final response of each location in order, or the exception polling it raised
+    """
+    import httpx
+
+    limits = httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+    async with httpx.AsyncClient(timeout=request_timeout, limits=limits) as client:
+        return await asyncio.gather(*[await_accepted(client, base_url, location, headers, policy, log) \
+                for location in locations], return_exceptions=True)
@@ -1,8 +1,19 @@
 """Storage utilities for md_dataset."""
 
+from md_dataset.storage.checkpoint import Checkpoint
+from md_dataset.storage.factory import get_checkpoint
 from md_dataset.storage.factory import get_file_manager
 from md_dataset.storage.file_manager import FileManager
+from md_dataset.storage.s3 import get_result_storage
 from md_dataset.storage.s3 import get_s3_block
 from md_dataset.storage.s3 import get_s3_client
 
-__all__ = ["FileManager", "get_file_manager", "get_s3_block", "get_s3_client"]
+__all__ = [
+    "Checkpoint",
+    "FileManager",
+    "get_checkpoint",
+    "get_file_manager",
+    "get_result_storage",
+    "get_s3_block",
+    "get_s3_client",
+]
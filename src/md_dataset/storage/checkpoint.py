@@ -0,0 +1,264 @@
+"""Phase checkpoints for resuming flow runs across Prefect retries.
+
+A Prefect retry re-enters the flow function with the same flow run id, so phase
+results written under that id can be picked up again instead of re-downloading
+every input and re-running the user function.
+"""
+
+from __future__ import annotations
+import io
+import json
+import logging
+import shutil
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING
+import pandas as pd
+import pyarrow as pa
+from botocore.exceptions import BotoCoreError
+from botocore.exceptions import ClientError
+from md_dataset.storage.parquet import parquet_file
+
+if TYPE_CHECKING:
+    from uuid import UUID
+    from md_dataset.models.dataset import InputDataset
+    from md_dataset.storage.file_manager import FileManager
+
+logger = logging.getLogger(__name__)
+
+# Failures of serializing a table or of a store, which lose the checkpoint but not the run
+CHECKPOINT_ERRORS = (pa.ArrowException, OSError, BotoCoreError, ClientError)
+
+
+class CheckpointPhase(Enum):
+    INPUTS = "inputs"
+    RESULTS = "results"
+
+
+def df_to_arrow_ipc(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame, including its index, to Arrow IPC file bytes."""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_ipc_to_df(content: bytes) -> pd.DataFrame:
+    """Deserialize Arrow IPC file bytes written by `df_to_arrow_ipc`."""
+    with pa.ipc.open_file(pa.BufferReader(content)) as reader:
+        return reader.read_all().to_pandas()
+
+
+def result_frames(results: dict | list) -> list[pd.DataFrame]:
+    """The DataFrames of the results of a user function, a dict of them or a list of IntensityData."""
+    if isinstance(results, dict):
+        return [df for df in results.values() if isinstance(df, pd.DataFrame)]
+    return [table.data for datum in results for table in getattr(datum, "tables", [])]
+
+
+class LocalCheckpointStore:
+    """Checkpoint store on the local file system.
+
+    Prefect flow retries run in the same process, so local disk survives them.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def put(self, name: str, body: bytes) -> None:
+        path = self.directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+
+    def get(self, name: str) -> bytes | None:
+        path = self.directory / name
+        return path.read_bytes() if path.exists() else None
+
+    def delete(self, name: str) -> None:
+        """Delete a file, or a directory with everything in it."""
+        path = self.directory / name
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class S3CheckpointStore:
+    """Checkpoint store under a key prefix in the results bucket."""
+
+    def __init__(self, file_manager: FileManager, prefix: str):
+        self.file_manager = file_manager
+        self.prefix = prefix
+
+    def put(self, name: str, body: bytes) -> None:
+        self.file_manager.save_bytes(body, f"{self.prefix}/{name}")
+
+    def get(self, name: str) -> bytes | None:
+        return self.file_manager.load_bytes(f"{self.prefix}/{name}")
+
+    def delete(self, name: str) -> None:
+        """Delete a file, or a directory with everything in it."""
+        self.file_manager.delete_prefix(f"{self.prefix}/{name}")
+
+    def clear(self) -> None:
+        self.file_manager.delete_prefix(f"{self.prefix}/")
+
+
+class Checkpoint:
+    """Saves and restores the phase results of a single flow run.
+
+    Each phase writes its tables first and its manifest last, so a phase only
+    counts as completed once the manifest exists. A phase that fails to save
+    is logged and dropped, as the run goes on without it. A checkpoint without
+    a store is disabled and every operation is a no-op.
+    """
+
+    def __init__(self, run_id: UUID, store: LocalCheckpointStore | S3CheckpointStore | None = None):
+        """Initialize a checkpoint for a flow run.
+
+        Args:
+            run_id: The flow run id, stable across Prefect retries
+            store: Where checkpoint files are kept, None disables checkpointing
+        """
+        self.run_id = run_id
+        self.store = store
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    def save_inputs(self, input_datasets: list[InputDataset]) -> None:
+        """Checkpoint the loaded tables of every input dataset."""
+        if not self.enabled:
+            return
+        try:
+            self._save_inputs(input_datasets)
+        except CHECKPOINT_ERRORS as e:
+            self._drop(CheckpointPhase.INPUTS, e)
+
+    def _save_inputs(self, input_datasets: list[InputDataset]) -> None:
+        manifest = []
+        for i, dataset in enumerate(input_datasets):
+            files = []
+            for j, table in enumerate(dataset.tables):
+                name = f"{CheckpointPhase.INPUTS.value}/{i}/{j}.arrow"
+                self.store.put(name, df_to_arrow_ipc(table.data))
+                files.append({"name": table.name, "file": name})
+            manifest.append({"id": str(dataset.id), "tables": files})
+        self._put_manifest(CheckpointPhase.INPUTS, manifest)
+
+    def restore_inputs(self, input_datasets: list[InputDataset]) -> bool:
+        """Populate input dataset tables from a checkpoint.
+
+        Returns:
+            True if the inputs were restored, False if there was no usable checkpoint
+        """
+        manifest = self._get_manifest(CheckpointPhase.INPUTS)
+        if manifest is None:
+            return False
+        expected = [{"id": str(dataset.id), "names": [table.name for table in dataset.tables]} \
+                for dataset in input_datasets]
+        if [{"id": entry["id"], "names": [table["name"] for table in entry["tables"]]} for entry in manifest] \
+                != expected:
+            logger.warning("Input checkpoint for run %s does not match the input datasets, ignoring", self.run_id)
+            return False
+
+        for dataset, entry in zip(input_datasets, manifest, strict=True):
+            dataset.set_table_data([arrow_ipc_to_df(self.store.get(table["file"])) for table in entry["tables"]])
+        logger.info("Restored inputs for run %s from checkpoint", self.run_id)
+        return True
+
+    def save_results(self, results: dict | list) -> None:
+        """Checkpoint the tables returned by the user function.
+
+        Only dicts of DataFrames and lists of IntensityData are checkpointed,
+        anything else is left for dataset validation to report. Results with
+        stand-ins for parquet files, see parquet_file_frame, are not: the files
+        are in a directory of the run that a retry no longer has.
+        """
+        if not self.enabled:
+            return
+        try:
+            self._save_results(results)
+        except CHECKPOINT_ERRORS as e:
+            self._drop(CheckpointPhase.RESULTS, e)
+
+    def _save_results(self, results: dict | list) -> None:
+        from md_dataset.models.dataset import IntensityData
+
+        if any(parquet_file(df) is not None for df in result_frames(results)):
+            logger.info("Results of run %s stand for parquet files, not checkpointing them", self.run_id)
+            return
+        if isinstance(results, dict) and all(isinstance(df, pd.DataFrame) for df in results.values()):
+            manifest = {"kind": "dict", "tables": []}
+            for i, (key, df) in enumerate(results.items()):
+                name = f"{CheckpointPhase.RESULTS.value}/{i}.arrow"
+                self.store.put(name, df_to_arrow_ipc(df))
+                manifest["tables"].append({"key": key, "file": name})
+        elif isinstance(results, list) and all(isinstance(datum, IntensityData) for datum in results):
+            manifest = {"kind": "intensity", "entities": []}
+            for i, datum in enumerate(results):
+                tables = []
+                for j, table in enumerate(datum.tables):
+                    name = f"{CheckpointPhase.RESULTS.value}/{i}/{j}.arrow"
+                    self.store.put(name, df_to_arrow_ipc(table.data))
+                    tables.append({"type": table.type.value, "file": name})
+                manifest["entities"].append({"entity": datum.entity.value, "tables": tables})
+        else:
+            logger.warning("Results of type %s cannot be checkpointed", type(results).__name__)
+            return
+        self._put_manifest(CheckpointPhase.RESULTS, manifest)
+
+    def load_results(self) -> dict | list | None:
+        """Load checkpointed results, or None if the results phase has not completed."""
+        from md_dataset.models.dataset import IntensityData
+        from md_dataset.models.dataset import IntensityEntity
+        from md_dataset.models.dataset import IntensityTable
+        from md_dataset.models.dataset import IntensityTableType
+
+        manifest = self._get_manifest(CheckpointPhase.RESULTS)
+        if manifest is None:
+            return None
+
+        logger.info("Restored results for run %s from checkpoint", self.run_id)
+        if manifest["kind"] == "dict":
+            return {table["key"]: arrow_ipc_to_df(self.store.get(table["file"])) for table in manifest["tables"]}
+        return [
+                IntensityData(
+                    entity=IntensityEntity(entry["entity"]),
+                    tables=[
+                        IntensityTable(
+                            type=IntensityTableType(table["type"]),
+                            data=arrow_ipc_to_df(self.store.get(table["file"])),
+                        ) for table in entry["tables"]],
+                ) for entry in manifest["entities"]]
+
+    def clear(self) -> None:
+        """Remove all checkpoints for the run, called once the run succeeded."""
+        if not self.enabled:
+            return
+        self.store.clear()
+        logger.debug("Cleared checkpoints for run %s", self.run_id)
+
+    def _drop(self, phase: CheckpointPhase, error: Exception) -> None:
+        logger.warning("Failed to checkpoint %s for run %s, continuing without it: %s", phase.value, self.run_id, error)
+        try:
+            self.store.delete(f"{phase.value}.json")
+            self.store.delete(phase.value)
+        except CHECKPOINT_ERRORS:
+            logger.warning("Failed to remove the partial %s checkpoint of run %s", phase.value, self.run_id)
+
+    def _put_manifest(self, phase: CheckpointPhase, manifest: dict | list) -> None:
+        self.store.put(f"{phase.value}.json", json.dumps(manifest).encode("utf-8"))
+        logger.info("Checkpointed %s for run %s", phase.value, self.run_id)
+
+    def _get_manifest(self, phase: CheckpointPhase) -> dict | list | None:
+        if not self.enabled:
+            return None
+        content = self.store.get(f"{phase.value}.json")
+        return json.load(io.BytesIO(content)) if content is not None else None
+
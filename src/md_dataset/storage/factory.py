@@ -1,10 +1,48 @@
 """Storage factory utilities."""
 
+from __future__ import annotations
 import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+from md_dataset.storage.checkpoint import Checkpoint
+from md_dataset.storage.checkpoint import LocalCheckpointStore
+from md_dataset.storage.checkpoint import S3CheckpointStore
 from md_dataset.storage.file_manager import FileManager
+from md_dataset.storage.local import DirectoryS3Client
 from md_dataset.storage.s3 import get_s3_client
 
+if TYPE_CHECKING:
+    from uuid import UUID
+
+
+# Bucket name used with LOCAL_STORAGE_DIR when RESULTS_BUCKET is not set
+LOCAL_BUCKET = "local"
+
 
 def get_file_manager() -> FileManager:
-    """Get file manager for storage operations."""
+    """Get file manager for storage operations.
+
+    With LOCAL_STORAGE_DIR set, buckets are directories under it instead of S3.
+    """
+    local_storage_dir = os.getenv("LOCAL_STORAGE_DIR")
+    if local_storage_dir:
+        return FileManager(client=DirectoryS3Client(local_storage_dir), \
+                default_bucket=os.getenv("RESULTS_BUCKET", LOCAL_BUCKET))
     return FileManager(client=get_s3_client(), default_bucket=os.getenv("RESULTS_BUCKET"))
+
+
+def get_checkpoint(run_id: UUID, file_manager: FileManager) -> Checkpoint:
+    """Get the phase checkpoint for a flow run.
+
+    CHECKPOINT_STORAGE selects where checkpoints are kept: "local" (under
+    CHECKPOINT_DIR, default the temp directory) or "s3" (the results bucket).
+    Checkpointing is disabled when it is unset.
+    """
+    storage = os.getenv("CHECKPOINT_STORAGE", "").lower()
+    if storage == "local":
+        directory = os.getenv("CHECKPOINT_DIR", f"{tempfile.gettempdir()}/md_dataset/checkpoints")
+        return Checkpoint(run_id, LocalCheckpointStore(Path(directory) / str(run_id)))
+    if storage == "s3":
+        return Checkpoint(run_id, S3CheckpointStore(file_manager, f"checkpoints/{run_id}"))
+    return Checkpoint(run_id)
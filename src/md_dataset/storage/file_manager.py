@@ -3,12 +3,21 @@
 from __future__ import annotations
 import io
 import logging
+import tempfile
 from io import BytesIO
+from pathlib import Path
 from typing import TYPE_CHECKING
 import pandas as pd
+import pyarrow.parquet as pq
+from botocore.exceptions import ClientError
+from md_dataset.storage.local import DirectoryS3Client
+from md_dataset.storage.parquet import parquet_file
+from md_dataset.storage.s3 import get_s3_uri
+from md_dataset.telemetry.tracing import trace_span
 
 if TYPE_CHECKING:
     from types import TracebackType
+    from typing import IO
     from boto3_type_annotations.s3 import Client
 
 logger = logging.getLogger(__name__)
@@ -50,8 +59,11 @@ class FileManager:
 
             bio = BytesIO()
             logger.debug("Download: %s", self.key)
-            self.client.download_fileobj(self.bucket, self.key, bio)
-            return bio.getvalue()
+            with trace_span("download", bucket=self.bucket, key=self.key) as span:
+                self.client.download_fileobj(self.bucket, self.key, bio)
+                content = bio.getvalue()
+                span.set_attribute("bytes", len(content))
+            return content
 
         def __exit__(
             self,
@@ -84,19 +96,56 @@ class FileManager:
         Returns:
             Loaded pandas DataFrame
         """
+        with self._file_download(bucket, key) as content, trace_span("parquet_decode", key=key) as span:
+            data = pd.read_parquet(io.BytesIO(content), engine="pyarrow")
+            span.set_attributes(bytes=len(content), rows=len(data), columns=len(data.columns))
+            return data
+
+    def download_file(self, bucket: str, key: str, path: str | Path) -> None:
+        """Download an object to a local file as is.
+
+        Args:
+            bucket: S3 bucket name (uses default if None)
+            key: S3 object key
+            path: Local file written, its directory is created if needed
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
         with self._file_download(bucket, key) as content:
-            return pd.read_parquet(io.BytesIO(content), engine="pyarrow")
+            path.write_bytes(content)
+
+    def uri(self, bucket: str, key: str) -> str:
+        """URI an Arrow reader, in Python or R, opens the object with.
+
+        Args:
+            bucket: S3 bucket name (uses default if None)
+            key: S3 object key
+
+        Returns:
+            The local path for local storage, an s3:// URI otherwise
+        """
+        bucket = bucket or self.default_bucket
+        if isinstance(self.client, DirectoryS3Client):
+            return str(self.client.path(bucket, key))
+        return get_s3_uri(bucket, key)
 
     def save_tables(self, tables: list[tuple[str, pd.DataFrame]]) -> None:
         """Save multiple tables to S3 as parquet and CSV files.
 
+        Stand-ins for parquet files, see `parquet_file_frame`, are saved from their files.
+
         Args:
             tables: List of (path, DataFrame) tuples to save
         """
         for path, data in tables:
-            self.save_df_to_parquet(path=path, df=data)
             # Also save as CSV
             csv_path = path.replace(".parquet", ".csv")
+            source = parquet_file(data)
+            if source is not None:
+                self.save_file(source, path)
+                self.save_parquet_file_to_csv(source, csv_path)
+                continue
+            self.save_df_to_parquet(path=path, df=data)
             self.save_df_to_csv(path=csv_path, df=data)
 
     def save_df_to_parquet(self, df: pd.DataFrame, path: str) -> None:
@@ -106,13 +155,11 @@ class FileManager:
             df: DataFrame to save
             path: S3 object key for the saved file
         """
-        pq_buffer = io.BytesIO()
-        df.to_parquet(pq_buffer, engine="pyarrow", compression="gzip", index=False, row_group_size=16_000)
-        self.client.put_object(
-            Body=(pq_buffer.getvalue()),
-            Bucket=self.default_bucket,
-            Key=path,
-        )
+        with trace_span("parquet_encode", key=path, rows=len(df), columns=len(df.columns)) as span:
+            pq_buffer = io.BytesIO()
+            df.to_parquet(pq_buffer, engine="pyarrow", compression="gzip", index=False, row_group_size=16_000)
+            span.set_attribute("bytes", pq_buffer.tell())
+        self._upload(pq_buffer.getvalue(), path)
 
     def save_df_to_csv(self, df: pd.DataFrame, path: str) -> None:
         """Save a pandas DataFrame to S3 as a CSV file.
@@ -121,11 +168,88 @@ class FileManager:
             df: DataFrame to save
             path: S3 object key for the saved file
         """
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_bytes = csv_buffer.getvalue().encode("utf-8")
-        self.client.put_object(
-            Body=csv_bytes,
-            Bucket=self.default_bucket,
-            Key=path,
-        )
+        with trace_span("csv_encode", key=path, rows=len(df), columns=len(df.columns)) as span:
+            csv_buffer = io.StringIO()
+            df.to_csv(csv_buffer, index=False)
+            csv_bytes = csv_buffer.getvalue().encode("utf-8")
+            span.set_attribute("bytes", len(csv_bytes))
+        self._upload(csv_bytes, path)
+
+    def save_file(self, source: str | Path, path: str) -> None:
+        """Upload a local file as is, streaming it from disk.
+
+        Args:
+            source: The local file
+            path: S3 object key for the saved file
+        """
+        with Path(source).open("rb") as body:
+            self._upload_fileobj(body, path, Path(source).stat().st_size)
+
+    def save_parquet_file_to_csv(self, source: str | Path, path: str, batch_size: int = 64_000) -> None:
+        """Save a local parquet file to S3 as a CSV file, converting it batch by batch.
+
+        Args:
+            source: The local parquet file
+            path: S3 object key for the saved file
+            batch_size: Rows held in memory at once
+        """
+        parquet = pq.ParquetFile(source)
+        with tempfile.TemporaryFile() as csv_file, trace_span("csv_encode", key=path, \
+                rows=parquet.metadata.num_rows, columns=parquet.metadata.num_columns) as span:
+            parquet.schema_arrow.empty_table().to_pandas().to_csv(csv_file, index=False)
+            for batch in parquet.iter_batches(batch_size=batch_size):
+                batch.to_pandas().to_csv(csv_file, index=False, header=False)
+            size = csv_file.tell()
+            span.set_attribute("bytes", size)
+            csv_file.seek(0)
+            self._upload_fileobj(csv_file, path, size)
+
+    def save_bytes(self, body: bytes, path: str) -> None:
+        """Save raw bytes to S3.
+
+        Args:
+            body: Content to save
+            path: S3 object key for the saved file
+        """
+        self._upload(body, path)
+
+    def _upload(self, body: bytes, path: str) -> None:
+        with trace_span("upload", bucket=self.default_bucket, key=path, bytes=len(body)):
+            self.client.put_object(
+                Body=body,
+                Bucket=self.default_bucket,
+                Key=path,
+            )
+
+    def _upload_fileobj(self, body: IO[bytes], path: str, size: int) -> None:
+        with trace_span("upload", bucket=self.default_bucket, key=path, bytes=size):
+            self.client.upload_fileobj(body, self.default_bucket, path)
+
+    def load_bytes(self, path: str) -> bytes | None:
+        """Load raw bytes from the default bucket.
+
+        Args:
+            path: S3 object key
+
+        Returns:
+            The object content, or None if the object does not exist
+        """
+        try:
+            with self._file_download(None, path) as content:
+                return content
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Delete every object in the default bucket under a key prefix.
+
+        Args:
+            prefix: S3 key prefix to delete
+        """
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.default_bucket, Prefix=prefix):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                self.client.delete_objects(Bucket=self.default_bucket, Delete={"Objects": objects})
@@ -0,0 +1,117 @@
+"""Local stand-ins for the subset of the S3 client API used by FileManager.
+
+They let benchmarks and local flow runs exercise the real FileManager code
+without AWS, see LOCAL_STORAGE_DIR in `get_file_manager`. For an S3
+compatible server (localstack, MinIO) use `get_s3_client` with USE_LOCALSTACK
+and AWS_ENDPOINT_URL instead.
+"""
+
+from __future__ import annotations
+import shutil
+import threading
+from pathlib import Path
+from typing import IO
+from typing import TYPE_CHECKING
+from botocore.exceptions import ClientError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Iterator
+
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _not_found(key: str) -> ClientError:
+    return ClientError({"Error": {"Code": "404", "Message": f"Not Found: {key}"}}, "HeadObject")
+
+
+class _Paginator:
+    def __init__(self, list_keys: Callable[[str, str], list[str]]):
+        self.list_keys = list_keys
+
+    def paginate(self, Bucket: str, Prefix: str = "") -> Iterator[dict]:  # noqa: N803
+        keys = self.list_keys(Bucket, Prefix)
+        yield {"Contents": [{"Key": key} for key in keys]} if keys else {}
+
+
+class MemoryS3Client:
+    """Keeps objects in a dict, measuring FileManager without any storage I/O."""
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], bytes] = {}
+        self._lock = threading.Lock()
+
+    def put_object(self, Body: bytes, Bucket: str, Key: str) -> dict:  # noqa: N803
+        with self._lock:
+            self.objects[Bucket, Key] = bytes(Body)
+        return {}
+
+    def download_fileobj(self, Bucket: str, Key: str, Fileobj: IO[bytes]) -> None:  # noqa: N803
+        with self._lock:
+            body = self.objects.get((Bucket, Key))
+        if body is None:
+            raise _not_found(Key)
+        Fileobj.write(body)
+
+    def upload_fileobj(self, Fileobj: IO[bytes], Bucket: str, Key: str) -> None:  # noqa: N803
+        self.put_object(Body=Fileobj.read(), Bucket=Bucket, Key=Key)
+
+    def get_paginator(self, _operation: str) -> _Paginator:
+        return _Paginator(self._list_keys)
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> dict:  # noqa: N803
+        with self._lock:
+            for item in Delete["Objects"]:
+                self.objects.pop((Bucket, item["Key"]), None)
+        return {}
+
+    def _list_keys(self, bucket: str, prefix: str) -> list[str]:
+        with self._lock:
+            return sorted(key for object_bucket, key in self.objects if object_bucket == bucket \
+                    and key.startswith(prefix))
+
+
+class DirectoryS3Client:
+    """Keeps objects as files under `root/bucket/key`, adding real disk I/O."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path(self, bucket: str, key: str) -> Path:
+        """The file an object is kept in."""
+        return self.root / bucket / key
+
+    def put_object(self, Body: bytes, Bucket: str, Key: str) -> dict:  # noqa: N803
+        path = self.path(Bucket, Key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(Body)
+        return {}
+
+    def download_fileobj(self, Bucket: str, Key: str, Fileobj: IO[bytes]) -> None:  # noqa: N803
+        path = self.path(Bucket, Key)
+        if not path.is_file():
+            raise _not_found(Key)
+        with path.open("rb") as source:
+            shutil.copyfileobj(source, Fileobj, CHUNK_SIZE)
+
+    def upload_fileobj(self, Fileobj: IO[bytes], Bucket: str, Key: str) -> None:  # noqa: N803
+        path = self.path(Bucket, Key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as target:
+            shutil.copyfileobj(Fileobj, target, CHUNK_SIZE)
+
+    def get_paginator(self, _operation: str) -> _Paginator:
+        return _Paginator(self._list_keys)
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> dict:  # noqa: N803
+        for item in Delete["Objects"]:
+            self.path(Bucket, item["Key"]).unlink(missing_ok=True)
+        return {}
+
+    def _list_keys(self, bucket: str, prefix: str) -> list[str]:
+        base = self.root / bucket
+        if not base.is_dir():
+            return []
+        keys = (path.relative_to(base).as_posix() for path in base.rglob("*") if path.is_file())
+        return sorted(key for key in keys if key.startswith(prefix))
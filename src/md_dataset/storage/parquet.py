@@ -0,0 +1,51 @@
+"""DataFrames standing in for parquet files written outside of pandas.
+
+A stand-in is an empty DataFrame with the schema of the file, so datasets
+validate it like any table, while FileManager.save_tables uploads the file it
+stands for as is instead of encoding the DataFrame.
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    import pandas as pd
+
+PARQUET_FILE_ATTR = "md_dataset_parquet_file"
+
+
+def parquet_file_frame(path: str | Path) -> pd.DataFrame:
+    """The stand-in of a parquet file, checked from its footer without reading the data.
+
+    Args:
+        path: The parquet file
+
+    Returns:
+        An empty DataFrame with the columns and types of the file
+
+    Raises:
+        ValueError: If the file is not parquet, or its columns are missing or not unique
+    """
+    try:
+        schema = pq.read_schema(path)
+    except (pa.ArrowInvalid, OSError) as e:
+        msg = f"{path} is not a readable parquet file"
+        raise ValueError(msg) from e
+    if not schema.names:
+        msg = f"{path} has no columns"
+        raise ValueError(msg)
+    if len(set(schema.names)) != len(schema.names):
+        msg = f"{path} has duplicate column names {schema.names}"
+        raise ValueError(msg)
+
+    frame = schema.empty_table().to_pandas()
+    frame.attrs[PARQUET_FILE_ATTR] = str(path)
+    return frame
+
+
+def parquet_file(df: pd.DataFrame) -> str | None:
+    """The parquet file `df` stands for, None for a DataFrame with data."""
+    return df.attrs.get(PARQUET_FILE_ATTR)
@@ -1,14 +1,28 @@
 """S3 storage utilities."""
 
+from __future__ import annotations
 import os
-import boto3
-import boto3.session
-from prefect_aws.s3 import S3Bucket
+from functools import cache
+from typing import TYPE_CHECKING
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
 
+if TYPE_CHECKING:
+    import boto3.session
+    from prefect_aws.s3 import S3Bucket
 
-def get_s3_block() -> S3Bucket:
-    """Get S3 block for result storage."""
-    results_bucket = os.getenv("RESULTS_BUCKET")
+# Name of the S3Bucket block flow results are kept in
+RESULT_STORAGE_BLOCK = "mdprocess"
+
+
+@cache
+def get_s3_block(results_bucket: str | None = None) -> S3Bucket:
+    """Get S3 block for result storage, saved to Prefect once per process.
+
+    Args:
+        results_bucket: The bucket, RESULTS_BUCKET when not given
+    """
+    results_bucket = results_bucket or os.getenv("RESULTS_BUCKET")
     if not results_bucket:
         msg = "RESULTS_BUCKET environment variable not set"
         raise ValueError(msg)
@@ -16,18 +30,43 @@ def get_s3_block() -> S3Bucket:
     # local dev using AWS
     profile = os.getenv("BOTO3_PROFILE")
     if profile is None:
+        from prefect_aws.s3 import S3Bucket
+
         s3_block = S3Bucket(bucket_name=results_bucket, bucket_folder="prefect_result_storage")
-        s3_block.save("mdprocess", overwrite=True)
+        s3_block.save(RESULT_STORAGE_BLOCK, overwrite=True)
         return s3_block
     return None
 
 
+def get_result_storage() -> S3Bucket | None:
+    """Get the result storage of flows, None without RESULTS_BUCKET.
+
+    Flows ask for it when they first run rather than when they are defined,
+    so the block is saved by the first run of each process, see get_s3_block.
+    """
+    if os.getenv("RESULTS_BUCKET") is None:
+        return None
+    return get_s3_block()
+
+
 def get_s3_client() -> boto3.session.Session:
     """Get S3 client for file operations."""
+    import boto3.session
+
     if os.environ.get("USE_LOCALSTACK", "false").lower() == "true":
         session = boto3.session.Session()
         return session.client(service_name="s3", endpoint_url=os.environ.get("AWS_ENDPOINT_URL"))
     # local dev using AWS
     profile = os.getenv("BOTO3_PROFILE")
-    session = boto3.Session(profile_name=profile)
+    session = boto3.session.Session(profile_name=profile)
     return session.client("s3")
+
+
+def get_s3_uri(bucket: str, key: str) -> str:
+    """Get the URI Arrow readers open an S3 object with, pointing at localstack when it is used."""
+    uri = f"s3://{bucket}/{key}"
+    endpoint = os.environ.get("AWS_ENDPOINT_URL")
+    if os.environ.get("USE_LOCALSTACK", "false").lower() == "true" and endpoint:
+        parts = urlsplit(endpoint)
+        uri += "?" + urlencode({"endpoint_override": parts.netloc, "scheme": parts.scheme or "http"})
+    return uri
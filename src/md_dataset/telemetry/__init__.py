@@ -0,0 +1,31 @@
+"""Resource and timing telemetry for md_dataset flow runs."""
+
+from md_dataset.telemetry.profiling import Profiler
+from md_dataset.telemetry.profiling import current_profiler
+from md_dataset.telemetry.profiling import profile_section
+from md_dataset.telemetry.profiling import profiler_from_env
+from md_dataset.telemetry.resources import ResourceSampler
+from md_dataset.telemetry.resources import record_usage
+from md_dataset.telemetry.resources import resource_phase
+from md_dataset.telemetry.tracing import InMemoryCollector
+from md_dataset.telemetry.tracing import JsonFileExporter
+from md_dataset.telemetry.tracing import LogExporter
+from md_dataset.telemetry.tracing import Tracer
+from md_dataset.telemetry.tracing import exporters_from_env
+from md_dataset.telemetry.tracing import trace_span
+
+__all__ = [
+    "InMemoryCollector",
+    "JsonFileExporter",
+    "LogExporter",
+    "Profiler",
+    "ResourceSampler",
+    "Tracer",
+    "current_profiler",
+    "exporters_from_env",
+    "profile_section",
+    "profiler_from_env",
+    "record_usage",
+    "resource_phase",
+    "trace_span",
+]
@@ -0,0 +1,159 @@
+"""Opt-in profiling of user functions in flow runs."""
+
+from __future__ import annotations
+import cProfile
+import logging
+import marshal
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import TYPE_CHECKING
+from typing import Self
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from types import FrameType
+    from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+# Seconds between stack samples of the sampling profiler, also used as the Rprof interval
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", "0.005"))
+
+_current_profiler: ContextVar[Profiler | None] = ContextVar("md_dataset_profiler", default=None)
+
+
+class ProfilerMode(Enum):
+    CPROFILE = "cprofile"
+    SAMPLING = "sampling"
+
+
+class Profiler:
+    """Profiles named sections of a flow run and keeps the results as artifacts.
+
+    cprofile artifacts are pstats files (`python -m pstats`, snakeviz), sampling
+    artifacts are collapsed stacks (flamegraph.pl, speedscope).
+    """
+
+    def __init__(self, mode: ProfilerMode, interval: float = PROFILER_INTERVAL):
+        """Initialize the profiler.
+
+        Args:
+            mode: How Python code is profiled
+            interval: Seconds between stack samples
+        """
+        self.mode = mode
+        self.interval = interval
+        self.artifacts: dict[str, bytes] = {}
+        self._token = None
+
+    def __enter__(self) -> Self:
+        self._token = _current_profiler.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ):
+        _current_profiler.reset(self._token)
+
+    def add(self, name: str, content: bytes) -> None:
+        self.artifacts[name] = content
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Profile the calling thread while the context is active."""
+        if self.mode == ProfilerMode.CPROFILE:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.create_stats()
+                # The format of cProfile.Profile.dump_stats, readable by pstats.Stats
+                self.add(f"{name}.prof", marshal.dumps(profiler.stats))
+        else:
+            sampler = _StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                self.add(f"{name}.collapsed", sampler.collapsed().encode("utf-8"))
+
+
+class _StackSampler:
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="md-stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # noqa: SLF001
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+
+def _collapse(frame: FrameType | None) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def current_profiler() -> Profiler | None:
+    return _current_profiler.get()
+
+
+@contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    """Profile a section with the profiler of the current flow run, a no-op outside of one."""
+    profiler = _current_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.profile(name):
+        yield
+
+
+def profiler_from_env(mode: str | None = None) -> Profiler | None:
+    """The profiler selected by PROFILER, None when profiling is disabled.
+
+    PROFILER profiles user functions with cprofile (deterministic) or sampling,
+    empty or unset disables profiling, as does an unknown mode, with a warning.
+    It is read on each call, so it can be set after md_dataset is imported.
+
+    Args:
+        mode: The profiler mode, overriding PROFILER
+    """
+    if mode is None:
+        mode = os.getenv("PROFILER", "")
+    if not mode:
+        return None
+    try:
+        return Profiler(ProfilerMode(mode))
+    except ValueError:
+        logger.warning("Unknown profiler %s, profiling is disabled", mode)
+        return None
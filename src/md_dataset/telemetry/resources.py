@@ -0,0 +1,252 @@
+"""Per-phase resource usage sampling for flow runs."""
+
+from __future__ import annotations
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+from typing import Self
+
+if TYPE_CHECKING:
+    import logging
+    from collections.abc import Iterator
+    from types import TracebackType
+
+# Seconds between RSS samples, 0 disables sampling
+RESOURCE_SAMPLER_INTERVAL = float(os.getenv("RESOURCE_SAMPLER_INTERVAL", "0.2"))
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+_CGROUP_MEMORY_LIMIT_FILES = ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes")
+
+_current_sampler: ContextVar[ResourceSampler | None] = ContextVar("md_dataset_resource_sampler", default=None)
+
+
+class PhaseUsage(NamedTuple):
+    phase: str
+    wall_seconds: float
+    cpu_seconds: float
+    start_rss_bytes: int
+    peak_rss_bytes: int
+    read_bytes: int
+    written_bytes: int
+    net_received_bytes: int
+    net_sent_bytes: int
+
+
+class _Counters(NamedTuple):
+    wall: float
+    cpu: float
+    rss: int
+    maxrss: int
+    read: int
+    written: int
+    net_received: int
+    net_sent: int
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process, falling back to the high-water mark off Linux."""
+    try:
+        with Path("/proc/self/statm").open() as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return max_rss_bytes()
+
+
+def max_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+def memory_limit_bytes() -> int | None:
+    """The cgroup memory limit of the pod, None when unlimited or unknown."""
+    for path in _CGROUP_MEMORY_LIMIT_FILES:
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "unlimited" as a huge page-aligned number
+        return int(value) if value.isdigit() and int(value) < 2**60 else None
+    return None
+
+
+def _io_bytes() -> tuple[int, int]:
+    """Bytes passed through read/write syscalls by this process (file and pipe I/O)."""
+    try:
+        with Path("/proc/self/io").open() as io:
+            fields = dict(line.split(":") for line in io.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def _net_bytes() -> tuple[int, int]:
+    """Bytes received and sent over non-loopback interfaces of the network namespace (the pod)."""
+    received = sent = 0
+    try:
+        with Path("/proc/self/net/dev").open() as dev:
+            for line in dev.read().splitlines()[2:]:
+                interface, data = line.split(":", 1)
+                if interface.strip() == "lo":
+                    continue
+                values = data.split()
+                received += int(values[0])
+                sent += int(values[8])
+    except (OSError, ValueError, IndexError):
+        return 0, 0
+    return received, sent
+
+
+def _counters() -> _Counters:
+    read, written = _io_bytes()
+    net_received, net_sent = _net_bytes()
+    return _Counters(
+        wall=time.perf_counter(),
+        cpu=time.process_time(),
+        rss=current_rss_bytes(),
+        maxrss=max_rss_bytes(),
+        read=read,
+        written=written,
+        net_received=net_received,
+        net_sent=net_sent,
+    )
+
+
+class ResourceSampler:
+    """Records peak RSS, CPU time and I/O bytes for each phase of a flow run.
+
+    A background thread samples RSS while phases are active. When a phase pushes
+    the process high-water mark (ru_maxrss) up, that exact value is used as its
+    peak, so short spikes between samples are not missed. Phases may nest, e.g.
+    R conversion within compute.
+    """
+
+    def __init__(self, interval: float = RESOURCE_SAMPLER_INTERVAL):
+        """Initialize the sampler.
+
+        Args:
+            interval: Seconds between RSS samples, 0 disables background sampling
+        """
+        self.interval = interval
+        self.phases: list[PhaseUsage] = []
+        self.records: dict[str, list[dict]] = {}
+        self._active: dict[int, list] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._token = None
+
+    def __enter__(self) -> Self:
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._sample, name="md-resource-sampler", daemon=True)
+            self._thread.start()
+        self._token = _current_sampler.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ):
+        _current_sampler.reset(self._token)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure a phase of the run."""
+        start = _counters()
+        peak = [start.rss]
+        with self._lock:
+            self._active[id(peak)] = peak
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._active[id(peak)]
+            end = _counters()
+            peak_rss = max(peak[0], end.rss, end.maxrss if end.maxrss > start.maxrss else 0)
+            self.phases.append(PhaseUsage(
+                phase=name,
+                wall_seconds=end.wall - start.wall,
+                cpu_seconds=end.cpu - start.cpu,
+                start_rss_bytes=start.rss,
+                peak_rss_bytes=peak_rss,
+                read_bytes=end.read - start.read,
+                written_bytes=end.written - start.written,
+                net_received_bytes=end.net_received - start.net_received,
+                net_sent_bytes=end.net_sent - start.net_sent,
+            ))
+
+    def record(self, name: str, usage: dict) -> None:
+        """Add the usage of an operation within the run, e.g. an R call, to the records of `name`."""
+        with self._lock:
+            self.records.setdefault(name, []).append(usage)
+
+    def summary(self) -> dict:
+        """The per-phase usage together with the process peak, the pod memory limit and the records."""
+        limit = memory_limit_bytes()
+        peak = max_rss_bytes()
+        return {
+            "phases": [phase._asdict() for phase in self.phases],
+            "peak_rss_bytes": peak,
+            "memory_limit_bytes": limit,
+            "peak_memory_limit_fraction": peak / limit if limit else None,
+            **self.records,
+        }
+
+    def log_summary(self, run_logger: logging.Logger | logging.LoggerAdapter) -> None:
+        for phase in self.phases:
+            run_logger.info(
+                "Resource usage %s: wall %.2fs, cpu %.2fs, peak rss %s, read %s, written %s, "
+                "net received %s, net sent %s",
+                phase.phase, phase.wall_seconds, phase.cpu_seconds, format_bytes(phase.peak_rss_bytes),
+                format_bytes(phase.read_bytes), format_bytes(phase.written_bytes),
+                format_bytes(phase.net_received_bytes), format_bytes(phase.net_sent_bytes),
+            )
+        limit = memory_limit_bytes()
+        run_logger.info("Peak rss %s of memory limit %s", format_bytes(max_rss_bytes()), \
+                format_bytes(limit) if limit else "unlimited")
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                if not self._active:
+                    continue
+                rss = current_rss_bytes()
+                for peak in self._active.values():
+                    peak[0] = max(peak[0], rss)
+
+
+@contextmanager
+def resource_phase(name: str) -> Iterator[None]:
+    """Measure a phase with the sampler of the current flow run, a no-op outside of one."""
+    sampler = _current_sampler.get()
+    if sampler is None:
+        yield
+        return
+    with sampler.phase(name):
+        yield
+
+
+def record_usage(name: str, usage: dict) -> None:
+    """Record usage with the sampler of the current flow run, a no-op outside of one."""
+    sampler = _current_sampler.get()
+    if sampler is not None:
+        sampler.record(name, usage)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024:  # noqa: PLR2004
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TiB"
@@ -0,0 +1,287 @@
+"""Structured tracing spans for flow runs.
+
+Spans nest through a context variable, which Prefect copies into task runner
+threads, so table loads and saves submitted as tasks attach to the phase that
+submitted them. Outside of a tracer every span is a no-op.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Protocol
+from typing import Self
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+_current_tracer: ContextVar[Tracer | None] = ContextVar("md_dataset_tracer", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("md_dataset_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes such as bytes and rows."""
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: str | None, attributes: dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: int | None = None
+        self._start = time.perf_counter_ns()
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_time_ns - self.start_time_ns) / 1e9 if self.end_time_ns is not None else 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:  # noqa: ANN401
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:  # noqa: ANN401
+        self.attributes.update(attributes)
+
+    def end(self) -> None:
+        # Wall clock start plus a monotonic duration, so durations survive clock adjustments
+        self.end_time_ns = self.start_time_ns + time.perf_counter_ns() - self._start
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "duration_seconds": self.duration_seconds,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:  # noqa: ANN401
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:  # noqa: ANN401
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class LogExporter:
+    """Logs every finished span with its duration and attributes."""
+
+    def __init__(self, span_logger: logging.Logger | logging.LoggerAdapter | None = None):
+        self.logger = span_logger or logger
+
+    def export(self, span: Span) -> None:
+        attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+        self.logger.info("Span %s: %.3fs %s%s", span.name, span.duration_seconds, attributes, \
+                "" if span.status == "ok" else f" status={span.status}")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonFileExporter:
+    """Appends every finished span as a JSON line to a local file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a")
+            self._file.write(line + "\n")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class InMemoryCollector:
+    """Collects finished spans in process and renders them as OTLP/JSON.
+
+    The output of `to_otlp` is the request body of the OpenTelemetry collector
+    `/v1/traces` endpoint, so it can be replayed into any OTLP backend later.
+    """
+
+    def __init__(self, service_name: str = "md_dataset"):
+        self.service_name = service_name
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def shutdown(self) -> None:
+        pass
+
+    def to_otlp(self) -> dict:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "md_dataset"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }],
+        }
+
+
+def _otlp_value(value: Any) -> dict:  # noqa: ANN401
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _otlp_span(span: Span) -> dict:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_time_ns),
+        "endTimeUnixNano": str(span.end_time_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 1 if span.status == "ok" else 2},
+    }
+    if span.parent_span_id is not None:
+        otlp["parentSpanId"] = span.parent_span_id
+    return otlp
+
+
+class Tracer:
+    """Creates spans for one trace and hands them to exporters once finished."""
+
+    def __init__(self, exporters: list[SpanExporter], trace_id: str | None = None):
+        """Initialize the tracer.
+
+        Args:
+            exporters: Receive every finished span
+            trace_id: 32 hex character trace id, random if not given
+        """
+        self.exporters = exporters
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self._token = None
+
+    def __enter__(self) -> Self:
+        self._token = _current_tracer.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ):
+        _current_tracer.reset(self._token)
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:  # noqa: ANN401
+        parent = _current_span.get()
+        span = Span(name, self.trace_id, parent.span_id if parent is not None else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("error", type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            for exporter in self.exporters:
+                try:
+                    exporter.export(span)
+                except Exception:
+                    logger.exception("Failed to export span %s", span.name)
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:  # noqa: ANN401
+    """Trace an operation with the tracer of the current flow run, a no-op outside of one."""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+    with tracer.span(name, **attributes) as span:
+        yield span
+
+
+def exporters_from_env(
+    trace_id: str,
+    span_logger: logging.Logger | logging.LoggerAdapter | None = None,
+    names: str | None = None,
+) -> list[SpanExporter]:
+    """Build the exporters named in TRACE_EXPORTERS.
+
+    TRACE_EXPORTERS is a comma separated list of log, json and otel. Tracing
+    is disabled when it is empty, the default, so runs only trace when a
+    deployment or the bench command asks for it. The json exporter appends to
+    TRACE_FILE, default a file per trace in the temp directory.
+
+    Args:
+        trace_id: Names the default json trace file
+        span_logger: Logger of the log exporter
+        names: Comma separated exporter names, overriding TRACE_EXPORTERS
+
+    Returns:
+        The exporters, empty when tracing is disabled
+    """
+    if names is None:
+        names = os.getenv("TRACE_EXPORTERS", "")
+    exporters = []
+    for name in (name.strip() for name in names.split(",")):
+        if name == "log":
+            exporters.append(LogExporter(span_logger))
+        elif name == "json":
+            exporters.append(JsonFileExporter(os.getenv("TRACE_FILE") or \
+                    Path(tempfile.gettempdir()) / "md_dataset" / "traces" / f"{trace_id}.jsonl"))
+        elif name == "otel":
+            exporters.append(InMemoryCollector())
+        elif name:
+            logger.warning("Unknown trace exporter %s", name)
+    return exporters
@@ -1,6 +1,7 @@
 from pathlib import Path
 from uuid import UUID
 import pandas as pd
+from tools.harness import load_by_key
 from tools.harness import md_dataset_test_harness
 from md_dataset.models.dataset import DatasetType
 from md_dataset.models.dataset import InputDatasetTable
@@ -20,8 +21,8 @@ class TestRParams(InputParams):
 
 def input_datasets() -> list[IntensityInputDataset]:
     return [IntensityInputDataset(id=UUID("f3127c62-e0a8-4b48-9bc2-e40eb821aab1"), name="interesting name", tables=[
-        InputDatasetTable(name="Protein_Intensity"),
-        InputDatasetTable(name="Protein_Metadata"),
+        InputDatasetTable(name="Protein_Intensity", key="Protein_Intensity.parquet"),
+        InputDatasetTable(name="Protein_Metadata", key="Protein_Metadata.parquet"),
         ])]
 
 @md_r(r_file="./tests/test_process.r", r_function="process_legacy")
@@ -37,7 +38,10 @@ if __name__ == "__main__":
     metadata_data = pd.read_parquet(TEST_DATA_DIR / "Protein_Metadata.parquet")
 
     with md_dataset_test_harness() as (file_manager, saved_tables):
-        file_manager.load_parquet_to_df.side_effect = [intensity_data, metadata_data]
+        file_manager.load_parquet_to_df.side_effect = load_by_key({
+            "Protein_Intensity.parquet": intensity_data,
+            "Protein_Metadata.parquet": metadata_data,
+        })
         prepare_test_run_r_legacy(input_datasets(), TestRParams(message="hello"), DatasetType.INTENSITY)
 
     print(saved_tables.keys())
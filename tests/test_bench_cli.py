@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+import pytest
+from md_dataset.bench import cli
+from md_dataset.telemetry import InMemoryCollector
+from md_dataset.telemetry import Tracer
+from md_dataset.telemetry import trace_span
+
+
+def test_span_summary_totals_by_name():
+    collector = InMemoryCollector()
+    with Tracer([collector]), trace_span("load"):
+        for size in (10, 20):
+            with trace_span("download", bytes=size):
+                pass
+        with trace_span("parquet_decode", bytes=5, rows=3):
+            pass
+
+    summary = {span["name"]: span for span in cli.span_summary(collector.to_otlp())}
+    assert summary["download"]["count"] == 2  # noqa: PLR2004
+    assert summary["download"]["bytes"] == 30  # noqa: PLR2004
+    assert summary["parquet_decode"]["rows"] == 3  # noqa: PLR2004
+    assert summary["load"]["seconds"] >= summary["download"]["seconds"]
+
+def test_flow_command_reports_phases(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, \
+        capsys: pytest.CaptureFixture):
+    monkeypatch.setenv("TRACE_EXPORTERS", "otel")
+    output = tmp_path / "report.json"
+    cli.main(["flow", "--features", "50", "--samples", "3", "--entities", "Protein", "Peptide", \
+            "--storage-dir", str(tmp_path / "storage"), "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    assert report["tables"] == 4  # noqa: PLR2004
+    phases = [phase["phase"] for phase in report["resource_usage"]["phases"]]
+    assert [phase for phase in phases if phase != "load_table"] == ["load", "compute", "build", "save"]
+    assert phases.count("load_table") == 4  # noqa: PLR2004
+    spans = {span["name"]: span for span in report["spans"]}
+    assert spans["download"]["count"] == 4  # noqa: PLR2004
+    assert spans["user_function"]["rows"] == 2 * 50 * 3 + 2 * 50
+    assert (tmp_path / "storage" / "local" / "job_runs" / report["run_id"] / "Peptide_Intensity.parquet").exists()
+    assert "process peak" in capsys.readouterr().out
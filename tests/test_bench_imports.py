@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+import pytest
+from md_dataset.bench import imports
+
+
+def test_module_import_seconds_reads_cumulative_time():
+    importtime = """import time: self [us] | cumulative | imported package
+import time:       120 |        300 |   md_dataset.process
+import time:       500 |     250000 | bench_flows
+"""
+
+    assert imports.module_import_seconds(importtime, "bench_flows") == 0.25  # noqa: PLR2004
+    with pytest.raises(ValueError, match="missing"):
+        imports.module_import_seconds(importtime, "missing")
+
+def test_flow_module_defines_each_flow():
+    namespace = {}
+    exec(compile(imports.flow_module(4), "bench_flows.py", "exec"), namespace)  # noqa: S102
+
+    assert [namespace[f"flow_{index}"].name for index in range(4)] == ["flow-0", "flow-1", "flow-2", "flow-3"]
+
+def test_imports_without_heavy_packages(tmp_path: Path, capsys: pytest.CaptureFixture):
+    output = tmp_path / "imports.json"
+    imports.main(["--flows", "3", "--repeat", "1", "--output", str(output)])
+
+    [result] = json.loads(output.read_text())["results"]
+    assert result["params"] == {"flows": 3}
+    assert result["module_import_seconds"]["p50"] < result["latency_seconds"]["p50"]
+    assert "boto3" not in result["heavy_packages"]
+    assert "prefect_aws" not in result["heavy_packages"]
+    assert "heavy packages" in capsys.readouterr().out
@@ -0,0 +1,36 @@
+import json
+from pathlib import Path
+import numpy as np
+import pytest
+from md_dataset.bench import memory
+
+ALLOCATION_BYTES = 16 * 1024 * 1024
+
+
+def test_measure_peak_sees_numpy_allocations():
+    peak = memory.measure_peak(lambda: np.ones(ALLOCATION_BYTES // 8).sum())
+    assert peak["python_peak_bytes"] >= ALLOCATION_BYTES
+    assert peak["peak_bytes"] == peak["python_peak_bytes"] + peak["arrow_peak_bytes"]
+
+def test_compare_reports_grown_ratios():
+    baseline = [{"name": "save_df_to_csv", "params": {"size": "s"}, "peak_ratio": 2.0}]
+    results = [{"name": "save_df_to_csv", "params": {"size": "s"}, "peak_ratio": 2.5},
+               {"name": "save_df_to_csv", "params": {"size": "m"}, "peak_ratio": 9.0}]
+
+    assert memory.compare(results, baseline, tolerance=0.1) == ["save_df_to_csv s: peak ratio 2.00 -> 2.50"]
+    assert memory.compare(results, baseline, tolerance=0.5) == []
+
+def test_memory_suite_fails_on_regression(tmp_path: Path):
+    output = tmp_path / "memory.json"
+    memory.main(["--cases", *memory.DEFAULT_CASES, "--sizes", "xs", "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    assert report["suite"] == "memory"
+    assert [result["name"] for result in report["results"]] == list(memory.DEFAULT_CASES)
+    assert all(result["peak_ratio"] > 0 for result in report["results"])
+
+    for result in report["results"]:
+        result["peak_ratio"] /= 10
+    output.write_text(json.dumps(report))
+    with pytest.raises(SystemExit):
+        memory.main(["--cases", "load_parquet_to_df", "--sizes", "xs", "--baseline", str(output)])
@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+import pytest
+
+pytest.importorskip("md_form")
+
+from md_dataset.bench import models
+from md_dataset.bench.data import SIZES
+from md_dataset.bench.data import intensity_frame
+from md_dataset.bench.data import metadata_frame
+from md_dataset.models.dataset import DatasetType
+from md_dataset.models.factory import create_dataset_from_run
+
+ENTITIES = 3
+
+
+def test_intensity_tables_are_not_copied():
+    intensity = intensity_frame(SIZES["xs"])
+    metadata = metadata_frame(SIZES["xs"])
+    dataset = create_dataset_from_run(run_id="11111111-1111-1111-1111-111111111111", \
+            dataset_type=DatasetType.INTENSITY, tables=models.intensity_tables(ENTITIES, intensity, metadata))
+
+    assert len(dataset.tables()) == 2 * ENTITIES
+    assert models.copies(dataset.tables(), [intensity, metadata]) == 0
+
+def test_models_suite_covers_every_dataset_type(tmp_path: Path):
+    output = tmp_path / "models.json"
+    models.main(["--sizes", "xs", "--entities", "1", str(ENTITIES), "--repeat", "1", "--output", str(output)])
+
+    results = json.loads(output.read_text())["results"]
+    built = {(result["params"].get("dataset_type"), result["params"].get("format")) \
+            for result in results if result["name"] == "build"}
+    assert built == {(DatasetType.INTENSITY.value, "list")} | \
+            {(dataset_type.value, "dict") for dataset_type in models.DATASET_FIELDS}
+    assert {result["params"].get("entities") for result in results if result["params"].get("format") == "list"} \
+            == {1, ENTITIES}
+    assert all(result["params"]["copies"] == 0 for result in results if "copies" in result["params"])
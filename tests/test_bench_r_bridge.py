@@ -0,0 +1,26 @@
+import json
+from pathlib import Path
+import pytest
+
+pytest.importorskip("md_form")
+
+from md_dataset.bench import r_bridge
+from md_dataset.bench.data import SIZES
+
+
+@pytest.mark.parametrize("kind", list(r_bridge.FRAMES))
+def test_frames_have_rows(kind: str):
+    frame = r_bridge.FRAMES[kind](SIZES["xs"])
+
+    assert len(frame) > 0
+    assert not frame.columns.duplicated().any()
+
+def test_r_bridge_suite_times_each_step(tmp_path: Path):
+    pytest.importorskip("rpy2.robjects")
+    output = tmp_path / "r_bridge.json"
+    r_bridge.main(["--kinds", "long", "strings", "--sizes", "xs", "--repeat", "2", "--output", str(output)])
+
+    results = json.loads(output.read_text())["results"]
+    assert [(result["params"]["kind"], result["name"]) for result in results] == \
+            [(kind, step) for kind in ("long", "strings") for step in r_bridge.STEPS]
+    assert all(result["latency_seconds"]["min"] > 0 for result in results)
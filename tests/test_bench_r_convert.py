@@ -0,0 +1,26 @@
+import json
+from pathlib import Path
+import pytest
+
+pytest.importorskip("rpy2")
+
+from md_dataset.bench import r_convert
+
+
+def test_r_convert_suite_times_each_converter(tmp_path: Path):
+    output = tmp_path / "r_convert.json"
+    r_convert.main(["--kinds", "intensity", "--entities", "1", "3", "--sizes", "xs", "--repeat", "2", \
+            "--output", str(output)])
+
+    results = json.loads(output.read_text())["results"]
+    assert [(result["params"]["entities"], result["name"]) for result in results] == \
+            [(entities, name) for entities in (1, 3) for name in r_convert.CONVERTERS]
+    assert all(result["latency_seconds"]["min"] > 0 for result in results)
+
+
+def test_r_convert_suite_compares_table_memory(tmp_path: Path):
+    output = tmp_path / "r_convert.json"
+    r_convert.main(["--kinds", "pairwise", "--sizes", "xs", "--repeat", "1", "--output", str(output)])
+
+    results = {result["name"]: result for result in json.loads(output.read_text())["results"]}
+    assert results["single_pass_compact"]["result_bytes"] < results["single_pass"]["result_bytes"]
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+import pandas as pd
+import pytest
+from md_dataset.bench import storage
+from md_dataset.bench.common import latency_summary
+from md_dataset.bench.data import SIZES
+from md_dataset.bench.data import intensity_frame
+from md_dataset.bench.data import metadata_frame
+from md_dataset.storage import FileManager
+from md_dataset.storage.local import DirectoryS3Client
+from md_dataset.storage.local import MemoryS3Client
+
+
+@pytest.fixture(params=["memory", "directory"])
+def file_manager(request: pytest.FixtureRequest, tmp_path: Path) -> FileManager:
+    client = MemoryS3Client() if request.param == "memory" else DirectoryS3Client(tmp_path)
+    return FileManager(client, default_bucket="bench")
+
+def test_stand_in_clients_round_trip(file_manager: FileManager):
+    data = intensity_frame(SIZES["xs"])
+    file_manager.save_tables([("job_runs/1/Protein_Intensity.parquet", data)])
+
+    loaded = file_manager.load_parquet_to_df(bucket=None, key="job_runs/1/Protein_Intensity.parquet")
+    pd.testing.assert_frame_equal(loaded, data)
+    assert file_manager.load_bytes("job_runs/1/Protein_Intensity.csv").startswith(b"GroupId,")
+    assert file_manager.load_bytes("missing") is None
+
+    file_manager.delete_prefix("job_runs/1/")
+    assert file_manager.load_bytes("job_runs/1/Protein_Intensity.parquet") is None
+
+def test_frames_have_proteomics_shape():
+    shape = SIZES["xs"]
+    intensity = intensity_frame(shape)
+    metadata = metadata_frame(shape)
+
+    assert len(intensity) == shape.rows
+    assert intensity["GroupId"].nunique() == shape.features
+    assert set(intensity["GroupId"]) == set(metadata["GroupId"])
+    assert metadata["ProteinIds"].is_unique
+
+def test_latency_summary():
+    summary = latency_summary([1.0, 2.0, 3.0, 4.0])
+    assert summary["min"] == 1.0
+    assert summary["max"] == 4.0  # noqa: PLR2004
+    assert summary["p50"] == 2.5  # noqa: PLR2004
+
+def test_storage_suite_writes_results(tmp_path: Path):
+    output = tmp_path / "storage.json"
+    storage.main(["--storage", "memory", "--sizes", "xs", "--repeat", "2", "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    assert report["suite"] == "storage"
+    assert "pandas" in report["environment"]["packages"]
+    assert [result["name"] for result in report["results"]] == \
+            ["load_parquet_to_df", "save_df_to_parquet", "save_df_to_csv", "save_tables"]
+    result = report["results"][0]
+    assert result["params"]["rows"] == SIZES["xs"].rows
+    assert result["params"]["parquet_bytes"] > 0
+    assert result["throughput_mb_per_second"] > 0
+    assert set(result["latency_seconds"]) == {"min", "mean", "max", "p50", "p90", "p99"}
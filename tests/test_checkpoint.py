@@ -0,0 +1,220 @@
+import shutil
+from pathlib import Path
+from uuid import UUID
+import pandas as pd
+import pytest
+from pytest_mock import MockerFixture
+from tools.harness import load_by_key
+from tools.harness import saved_tables
+from md_dataset.models.dataset import DatasetType
+from md_dataset.models.dataset import InputDatasetTable
+from md_dataset.models.dataset import InputParams
+from md_dataset.models.dataset import IntensityData
+from md_dataset.models.dataset import IntensityEntity
+from md_dataset.models.dataset import IntensityInputDataset
+from md_dataset.models.dataset import IntensityTable
+from md_dataset.models.dataset import IntensityTableType
+from md_dataset.process import md_py
+from md_dataset.storage import Checkpoint
+from md_dataset.storage import FileManager
+from md_dataset.storage import get_checkpoint
+from md_dataset.storage.checkpoint import LocalCheckpointStore
+from md_dataset.storage.parquet import parquet_file
+from md_dataset.storage.parquet import parquet_file_frame
+
+RUN_ID = UUID("22222222-2222-2222-2222-222222222222")
+
+
+@pytest.fixture
+def checkpoint(tmp_path: Path) -> Checkpoint:
+    return Checkpoint(RUN_ID, LocalCheckpointStore(tmp_path / str(RUN_ID)))
+
+
+@pytest.fixture
+def input_datasets() -> list[IntensityInputDataset]:
+    return [IntensityInputDataset(id=UUID("11111111-1111-1111-1111-111111111111"), name="one", tables=[
+            InputDatasetTable(name="Protein_Intensity", data=pd.DataFrame({"col1": [1, 2, 3]})),
+            InputDatasetTable(name="Protein_Metadata", data=pd.DataFrame({"col2": ["a", "b", "c"]})),
+        ])]
+
+
+def test_disabled_checkpoint_is_a_noop(input_datasets: list[IntensityInputDataset]):
+    checkpoint = Checkpoint(RUN_ID)
+    checkpoint.save_inputs(input_datasets)
+    checkpoint.save_results({"intensity": pd.DataFrame({"col1": [1]})})
+
+    assert not checkpoint.restore_inputs(input_datasets)
+    assert checkpoint.load_results() is None
+
+
+def test_get_checkpoint_local(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, mocker: MockerFixture):
+    monkeypatch.setenv("CHECKPOINT_STORAGE", "local")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+
+    checkpoint = get_checkpoint(RUN_ID, mocker.Mock(spec=FileManager))
+
+    assert checkpoint.enabled
+    assert checkpoint.store.directory == tmp_path / str(RUN_ID)
+
+
+def test_get_checkpoint_disabled_by_default(monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture):
+    monkeypatch.delenv("CHECKPOINT_STORAGE", raising=False)
+
+    assert not get_checkpoint(RUN_ID, mocker.Mock(spec=FileManager)).enabled
+
+
+def test_restore_inputs(checkpoint: Checkpoint, input_datasets: list[IntensityInputDataset]):
+    checkpoint.save_inputs(input_datasets)
+
+    retried = [IntensityInputDataset(id=UUID("11111111-1111-1111-1111-111111111111"), name="one", tables=[
+            InputDatasetTable(name="Protein_Intensity", bucket="bucket", key="baz/qux"),
+            InputDatasetTable(name="Protein_Metadata", bucket="bucket", key="qux/quux"),
+        ])]
+
+    assert checkpoint.restore_inputs(retried)
+    pd.testing.assert_frame_equal(retried[0].table(IntensityTableType.INTENSITY).data, \
+            pd.DataFrame({"col1": [1, 2, 3]}))
+    pd.testing.assert_frame_equal(retried[0].table(IntensityTableType.METADATA).data, \
+            pd.DataFrame({"col2": ["a", "b", "c"]}))
+
+
+def test_restore_inputs_ignores_other_datasets(checkpoint: Checkpoint, input_datasets: list[IntensityInputDataset]):
+    checkpoint.save_inputs(input_datasets)
+
+    other = [IntensityInputDataset(id=UUID("33333333-3333-3333-3333-333333333333"), name="other", tables=[])]
+
+    assert not checkpoint.restore_inputs(other)
+
+
+def test_dict_results_round_trip(checkpoint: Checkpoint):
+    results = {"intensity": pd.DataFrame({"col1": [1, 2, 3]}, index=[2, 1, 0]), "metadata": pd.DataFrame({"a": ["x"]})}
+    checkpoint.save_results(results)
+
+    loaded = checkpoint.load_results()
+
+    assert list(loaded.keys()) == ["intensity", "metadata"]
+    pd.testing.assert_frame_equal(loaded["intensity"], results["intensity"])
+    pd.testing.assert_frame_equal(loaded["metadata"], results["metadata"])
+
+
+def test_intensity_results_round_trip(checkpoint: Checkpoint):
+    results = [IntensityData(entity=IntensityEntity.PEPTIDE, tables=[
+        IntensityTable(type=IntensityTableType.INTENSITY, data=pd.DataFrame({"col1": [1.0, 2.0]})),
+        IntensityTable(type=IntensityTableType.METADATA, data=pd.DataFrame({"col2": ["a", "b"]})),
+    ])]
+    checkpoint.save_results(results)
+
+    loaded = checkpoint.load_results()
+
+    assert loaded[0].entity == IntensityEntity.PEPTIDE
+    assert [table.type for table in loaded[0].tables] == [IntensityTableType.INTENSITY, IntensityTableType.METADATA]
+    pd.testing.assert_frame_equal(loaded[0].tables[0].data, results[0].tables[0].data)
+
+
+def test_failed_results_checkpoint_is_dropped(checkpoint: Checkpoint, tmp_path: Path):
+    # Arrow cannot convert a column mixing numbers and strings
+    results = {"intensity": pd.DataFrame({"col1": [1]}), "mixed": pd.DataFrame({"col1": [1, "a"]}, dtype=object)}
+    checkpoint.save_results(results)
+
+    assert checkpoint.load_results() is None
+    assert not (tmp_path / str(RUN_ID) / "results").exists()
+
+
+def test_failed_inputs_checkpoint_is_dropped(checkpoint: Checkpoint, input_datasets: list[IntensityInputDataset], \
+        mocker: MockerFixture):
+    mocker.patch.object(checkpoint.store, "put", side_effect=[None, OSError("disk full")])
+    checkpoint.save_inputs(input_datasets)
+
+    assert not checkpoint.restore_inputs(input_datasets)
+
+
+def test_clear_removes_checkpoints(checkpoint: Checkpoint):
+    checkpoint.save_results({"intensity": pd.DataFrame({"col1": [1]})})
+    checkpoint.clear()
+
+    assert checkpoint.load_results() is None
+
+
+@md_py
+def run_process_counting(input_datasets: list[IntensityInputDataset], params: InputParams, \
+        output_dataset_type: DatasetType) -> dict: # noqa: ARG001
+    return {IntensityTableType.INTENSITY.value: input_datasets[0].table(IntensityTableType.INTENSITY).data, \
+            IntensityTableType.METADATA.value: input_datasets[0].table(IntensityTableType.METADATA).data}
+
+
+def test_run_process_resumes_after_failed_save(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, \
+        mocker: MockerFixture):
+    monkeypatch.setenv("CHECKPOINT_STORAGE", "local")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path))
+    mocker.patch("md_dataset.process.runtime.flow_run.id", RUN_ID)
+
+    file_manager = mocker.Mock(spec=FileManager)
+    mocker.patch("md_dataset.process.get_file_manager", return_value=file_manager)
+    file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": pd.DataFrame({"col1": [1, 2, 3]}), \
+            "qux/quux": pd.DataFrame({"col2": ["a"]})})
+    failed_uploads = []
+
+    def fail_first_upload(tables: list[tuple[str, pd.DataFrame]]) -> None:
+        if not failed_uploads:
+            failed_uploads.append(tables)
+            msg = "upload failed"
+            raise OSError(msg)
+
+    file_manager.save_tables.side_effect = fail_first_upload
+
+    def datasets() -> list[IntensityInputDataset]:
+        return [IntensityInputDataset(id=UUID("11111111-1111-1111-1111-111111111111"), name="one", tables=[
+                InputDatasetTable(name="Protein_Intensity", bucket="bucket", key="baz/qux"),
+                InputDatasetTable(name="Protein_Metadata", bucket="bucket", key="qux/quux"),
+            ])]
+
+    with pytest.raises(OSError, match="upload failed"):
+        run_process_counting(datasets(), InputParams(), DatasetType.INTENSITY)
+
+    result = run_process_counting(datasets(), InputParams(), DatasetType.INTENSITY)
+
+    assert result["tables"][0]["name"] == "Protein_Intensity"
+    assert file_manager.load_parquet_to_df.call_count == 2  # noqa: PLR2004
+    pd.testing.assert_frame_equal(saved_tables(file_manager)[result["tables"][0]["path"]], \
+            pd.DataFrame({"col1": [1, 2, 3]}))
+    assert not (tmp_path / str(RUN_ID)).exists()
+
+
+def test_run_process_reruns_parquet_outputs_after_failed_save(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, \
+        mocker: MockerFixture):
+    monkeypatch.setenv("CHECKPOINT_STORAGE", "local")
+    monkeypatch.setenv("CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    mocker.patch("md_dataset.process.runtime.flow_run.id", RUN_ID)
+    file_manager = mocker.Mock(spec=FileManager)
+    mocker.patch("md_dataset.process.get_file_manager", return_value=file_manager)
+    output_dirs = []
+
+    @md_py
+    def run_process_parquet(input_datasets: list[IntensityInputDataset], params: InputParams, \
+            output_dataset_type: DatasetType) -> dict: # noqa: ARG001
+        # Stands for the output directory of an md_r run, which is gone when the run is retried
+        output_dir = tmp_path / f"outputs-{len(output_dirs)}"
+        output_dir.mkdir()
+        output_dirs.append(output_dir)
+        pd.DataFrame({"col1": [1, 2, 3]}).to_parquet(output_dir / "intensity.parquet")
+        pd.DataFrame({"col2": ["a"]}).to_parquet(output_dir / "metadata.parquet")
+        return {IntensityTableType.INTENSITY.value: parquet_file_frame(output_dir / "intensity.parquet"), \
+                IntensityTableType.METADATA.value: parquet_file_frame(output_dir / "metadata.parquet")}
+
+    def upload(tables: list[tuple[str, pd.DataFrame]]) -> None:
+        # Saving a stand-in reads its file, as FileManager.save_file does
+        for _, data in tables:
+            Path(parquet_file(data)).read_bytes()
+        if len(output_dirs) == 1:
+            shutil.rmtree(output_dirs[0])
+            msg = "upload failed"
+            raise OSError(msg)
+
+    file_manager.save_tables.side_effect = upload
+
+    with pytest.raises(OSError, match="upload failed"):
+        run_process_parquet([], InputParams(), DatasetType.INTENSITY)
+
+    run_process_parquet([], InputParams(), DatasetType.INTENSITY)
+
+    assert len(output_dirs) == 2  # noqa: PLR2004
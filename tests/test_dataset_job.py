@@ -34,7 +34,7 @@ class DatasetJobParamsTest(unittest.TestCase):
 
 
 class CreateOrUpdateDatasetJobTest(unittest.TestCase):
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_success(self, mock_post: MagicMock):
         response = requests.Response()
         response.status_code = 200
@@ -68,7 +68,7 @@ class CreateOrUpdateDatasetJobTest(unittest.TestCase):
         actual_payload.pop("params_new")
         assert actual_payload == expected_payload
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_success_with_create_or_update_dataset_job_and_deployment(self, mock_post: MagicMock):
         response = requests.Response()
         response.status_code = 200
@@ -113,7 +113,7 @@ class FlowNameToSlugTest(unittest.TestCase):
         assert name_to_slug("") == ""
 
 class CreateOrUpdateDatasetJobSendHttpRequestTest(unittest.TestCase):
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_successful_request(self, mock_post: MagicMock):
         response = requests.Response()
         response.status_code = 200
@@ -148,7 +148,7 @@ class CreateOrUpdateDatasetJobSendHttpRequestTest(unittest.TestCase):
             "http://example.com/jobs/create_or_update", json=expected_payload, timeout=10,
         )
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_failed_request(self, mock_post: MagicMock):
         response = requests.Response()
         response.status_code = 400
@@ -168,8 +168,8 @@ class CreateOrUpdateDatasetJobSendHttpRequestTest(unittest.TestCase):
             )
 
 class CreateOrUpdateDatasetJobAndDeploymentSendHttpRequestTest(unittest.TestCase):
-    @patch("requests.get")
-    @patch("requests.post")
+    @patch("requests.Session.get")
+    @patch("requests.Session.post")
     def test_accepted_request(self, mock_post: MagicMock, mock_get: MagicMock):
         response = requests.Response()
         response.status_code = 202
@@ -10,7 +10,7 @@ from src.md_dataset.dataset_job_api import create_or_update_dataset_job_and_depl
 
 class CreateOrUpdateDatasetJobTest(unittest.TestCase):
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_success_with_create_or_update_dataset_job_and_deployment(self, mock_post: MagicMock):
         response = requests.Response()
         response.status_code = 200
@@ -51,8 +51,8 @@ class CreateOrUpdateDatasetJobTest(unittest.TestCase):
 
 
 class CreateOrUpdateDatasetJobAndDeploymentSendHttpRequestTest(unittest.TestCase):
-    @patch("requests.get")
-    @patch("requests.post")
+    @patch("requests.Session.get")
+    @patch("requests.Session.post")
     def test_accepted_request(self, mock_post: MagicMock, mock_get: MagicMock):
         response = requests.Response()
         response.status_code = 202
@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from pathlib import Path
+from uuid import uuid4
+import pytest
+from pytest_mock import MockerFixture
+from md_dataset import deploy_manifest
+from md_dataset.deploy_manifest import DeployConfig
+from md_dataset.deploy_manifest import ManifestJob
+from md_dataset.models.dataset import DatasetType
+
+CONFIG = DeployConfig(image="image:1", service_account_name="account", results_bucket="results", \
+        dataset_service_url="http://dataset-service")
+
+
+def manifest_job(name: str, flow: str = "test_func", flow_package: str = "tests.func") -> ManifestJob:
+    return ManifestJob(name=name, flow=flow, flow_package=flow_package, deployment_name=f"{name}-deployment", \
+            run_type="INTENSITY")
+
+
+@pytest.fixture
+def flow_deploy(mocker: MockerFixture):
+    return mocker.patch("prefect.flows.Flow.deploy", autospec=True, side_effect=lambda *_, **__: uuid4())
+
+
+@pytest.fixture
+def create_job(mocker: MockerFixture):
+    return mocker.patch("md_dataset.deploy_manifest.create_or_update_dataset_job", \
+            side_effect=lambda **kwargs: {"id": kwargs["job_params"].name})
+
+
+def test_read_manifest(tmp_path: Path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps([{"name": "one", "flow": "test_func", "flow_package": "tests.func", \
+            "deployment_name": "one", "run_type": "PAIRWISE", "published": False}]))
+
+    [job] = deploy_manifest.read_manifest(path)
+
+    assert job.run_type == "PAIRWISE"
+    assert job.published is False
+    assert job.image is None
+
+def test_deploys_each_job(flow_deploy, create_job):  # noqa: ANN001
+    reports = deploy_manifest.deploy_jobs([manifest_job("one"), manifest_job("two", "test_func_properties")], \
+            CONFIG)
+
+    assert [(report.name, report.ok, report.job) for report in reports] == \
+            [("one", True, {"id": "one"}), ("two", True, {"id": "two"})]
+    assert flow_deploy.call_count == 2  # noqa: PLR2004
+    _, kwargs = flow_deploy.call_args_list[0]
+    assert kwargs["name"] == "one-deployment"
+    assert kwargs["image"] == "image:1"
+    assert kwargs["job_variables"]["env"]["RESULTS_BUCKET"] == "results"
+    assert kwargs["job_variables"]["service_account_name"] == "account"
+    _, kwargs = create_job.call_args_list[0]
+    assert kwargs["base_url"] == "http://dataset-service"
+    assert kwargs["run_type"] == DatasetType.INTENSITY.value
+
+def test_failed_jobs_do_not_stop_others(flow_deploy, create_job):  # noqa: ANN001, ARG001
+    jobs = [manifest_job("missing package", flow_package="tests.missing"), manifest_job("missing flow", "nope"), \
+            manifest_job("bad run type").model_copy(update={"run_type": "NOPE"}), manifest_job("ok")]
+
+    reports = deploy_manifest.deploy_jobs(jobs, CONFIG)
+
+    assert [report.ok for report in reports] == [False, False, False, True]
+    assert reports[0].error.startswith("ModuleNotFoundError")
+    assert "has no flow nope" in reports[1].error
+    assert flow_deploy.call_count == 1
+    assert "1 of 4 jobs deployed" in deploy_manifest.format_report(reports)
+
+def test_bounds_concurrent_deploys(mocker: MockerFixture, create_job):  # noqa: ANN001, ARG001
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def deploy(*_: object, **__: object) -> None:
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    mocker.patch("prefect.flows.Flow.deploy", autospec=True, side_effect=deploy)
+    import_module = mocker.spy(deploy_manifest.importlib, "import_module")
+
+    reports = deploy_manifest.deploy_jobs([manifest_job(f"job {i}") for i in range(6)], CONFIG, max_workers=2)
+
+    assert all(report.ok for report in reports)
+    assert peak[0] == 2  # noqa: PLR2004
+    import_module.assert_called_once_with("tests.func")
+
+def test_main_exits_with_failures(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture, \
+        flow_deploy, create_job):  # noqa: ANN001
+    monkeypatch.setenv("K8_SERVICE_ACCOUNT_NAME", "account")
+    monkeypatch.setenv("PREFECT_RESULTS_BUCKET", "results")
+    monkeypatch.setenv("DOCKER_IMAGE", "image:1")
+    get_s3_block = mocker.patch("md_dataset.deploy_manifest.get_s3_block")
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps([manifest_job("ok").model_dump(), manifest_job("bad", "nope").model_dump()]))
+
+    with pytest.raises(SystemExit) as exit_info:
+        deploy_manifest.main([str(path), "--skip-dataset-service"])
+
+    assert exit_info.value.code == 1
+    get_s3_block.assert_called_once_with("results")
+    flow_deploy.assert_called_once()
+    create_job.assert_not_called()
@@ -0,0 +1,12 @@
+from md_dataset import deploy_settings
+
+
+def test_job_variables():
+    variables = deploy_settings.job_variables("image:1", "account", "results")
+
+    assert variables["image"] == "image:1"
+    assert variables["service_account_name"] == "account"
+    assert variables["env"]["IMAGE"] == "image:1"
+    assert variables["env"]["RESULTS_BUCKET"] == "results"
+    assert variables["env"]["PREFECT_API_URL"] == deploy_settings.PREFECT_API_URL
+    assert variables["pod_labels"]["env"] == deploy_settings.STAGE
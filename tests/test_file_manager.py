@@ -1,10 +1,14 @@
 from io import BytesIO
+from pathlib import Path
 import botocore
 import pandas as pd
 import pytest
 from boto3_type_annotations.s3 import Client
 from pytest_mock import MockerFixture
 from md_dataset.storage import FileManager
+from md_dataset.storage.local import DirectoryS3Client
+from md_dataset.storage.local import MemoryS3Client
+from md_dataset.storage.parquet import parquet_file_frame
 
 
 @pytest.fixture
@@ -58,3 +62,60 @@ def test_download_other_client_error_raises(s3_client_mock: Client, file_manager
     with pytest.raises(botocore.exceptions.ClientError, match="Internal Server Error"), \
         file_manager.load_parquet_to_df(bucket="test-bucket", key="error-key"):
             pass
+
+def test_load_bytes_returns_none_for_missing_key(s3_client_mock: Client, file_manager: FileManager):
+    error_response = {"Error": {"Code": "404", "Message": "Not Found"}}
+    s3_client_mock.download_fileobj.side_effect = botocore.exceptions.ClientError(error_response, "Download")
+
+    assert file_manager.load_bytes("missing-key") is None
+
+def test_delete_prefix_deletes_listed_objects(s3_client_mock: Client, file_manager: FileManager):
+    s3_client_mock.get_paginator.return_value.paginate.return_value = [
+        {"Contents": [{"Key": "checkpoints/abc/inputs.json"}, {"Key": "checkpoints/abc/inputs/0/0.arrow"}]},
+        {},
+    ]
+
+    file_manager.delete_prefix("checkpoints/abc/")
+
+    s3_client_mock.delete_objects.assert_called_once_with(Bucket="default-bucket", Delete={"Objects": [
+        {"Key": "checkpoints/abc/inputs.json"}, {"Key": "checkpoints/abc/inputs/0/0.arrow"}]})
+
+def test_uri_of_s3_object(file_manager: FileManager):
+    assert file_manager.uri(None, "data/table.parquet") == "s3://default-bucket/data/table.parquet"
+
+def test_uri_of_localstack_object(monkeypatch: pytest.MonkeyPatch, file_manager: FileManager):
+    monkeypatch.setenv("USE_LOCALSTACK", "true")
+    monkeypatch.setenv("AWS_ENDPOINT_URL", "http://localhost:4566")
+
+    assert file_manager.uri("bucket", "table.parquet") == \
+            "s3://bucket/table.parquet?endpoint_override=localhost%3A4566&scheme=http"
+
+def test_uri_of_local_object_is_its_path(tmp_path: Path):
+    file_manager = FileManager(DirectoryS3Client(tmp_path), default_bucket="local")
+    file_manager.save_bytes(b"content", "data/table.parquet")
+
+    assert Path(file_manager.uri(None, "data/table.parquet")).read_bytes() == b"content"
+
+def test_download_file_writes_object(tmp_path: Path):
+    file_manager = FileManager(MemoryS3Client(), default_bucket="bucket")
+    file_manager.save_bytes(b"content", "table.parquet")
+
+    file_manager.download_file("bucket", "table.parquet", tmp_path / "cache" / "table.parquet")
+
+    assert (tmp_path / "cache" / "table.parquet").read_bytes() == b"content"
+
+def test_save_tables_uploads_parquet_file_stand_ins(tmp_path: Path):
+    file_manager = FileManager(MemoryS3Client(), default_bucket="bucket")
+    test_df = pd.DataFrame({"col1": [1.5, None], "col2": ["a", "b,c"]})
+    test_df.to_parquet(tmp_path / "table.parquet", index=False)
+
+    file_manager.save_tables([("run/table.parquet", parquet_file_frame(tmp_path / "table.parquet"))])
+
+    assert file_manager.load_bytes("run/table.parquet") == (tmp_path / "table.parquet").read_bytes()
+    assert file_manager.load_bytes("run/table.csv").decode() == test_df.to_csv(index=False)
+
+def test_parquet_file_frame_rejects_other_files(tmp_path: Path):
+    (tmp_path / "table.parquet").write_text("col1,col2\n")
+
+    with pytest.raises(ValueError, match="not a readable parquet file"):
+        parquet_file_frame(tmp_path / "table.parquet")
@@ -0,0 +1,96 @@
+import json
+import sys
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+from md_dataset import job_params
+from md_dataset.dataset_job import dataset_job_params
+
+MODULE = "job_params_flows"
+PACKAGE = "job_params_package"
+
+
+@pytest.fixture
+def flow_module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source = tmp_path / f"{MODULE}.py"
+    source.write_text((Path(__file__).parent / "func.py").read_text())
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield source
+    sys.modules.pop(MODULE, None)
+
+
+@pytest.fixture
+def package_module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    package = tmp_path / PACKAGE
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "helpers.py").write_text("SCALE = 1\n")
+    (package / "flows.py").write_text((Path(__file__).parent / "func.py").read_text())
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    for module in [name for name in sys.modules if name.startswith(PACKAGE)]:
+        sys.modules.pop(module)
+
+
+def test_build_renders_every_flow(flow_module: Path, capsys: pytest.CaptureFixture):
+    job_params.main([MODULE])
+
+    artifact = json.loads(flow_module.with_suffix(".params.json").read_text())
+    assert artifact["source_hash"] == job_params.source_hash(flow_module, MODULE)
+    assert list(artifact["jobs"]) == ["test_func"]
+    assert artifact["jobs"]["test_func"]["description"] == "A nice description."
+    assert "params.json" in capsys.readouterr().out
+
+def test_reads_artifact_without_importing(flow_module: Path, mocker: MockerFixture):  # noqa: ARG001
+    job_params.write_job_params(MODULE)
+    imported = job_params.import_job_params("test_func", MODULE)
+    sys.modules.pop(MODULE)
+    import_job_params = mocker.patch("md_dataset.dataset_job.import_job_params")
+
+    params, description, params_new = dataset_job_params(name="test_func", module=MODULE)
+
+    import_job_params.assert_not_called()
+    assert MODULE not in sys.modules
+    assert [params, description, params_new] == json.loads(json.dumps(imported))
+    assert params["required"] == ["input_datasets", "params", "output_dataset_type"]
+
+def test_imports_when_source_changed(flow_module: Path, mocker: MockerFixture):
+    job_params.write_job_params(MODULE)
+    flow_module.write_text(flow_module.read_text().replace("A nice description.", "A new description."))
+    sys.modules.pop(MODULE)
+    import_job_params = mocker.patch("md_dataset.dataset_job.import_job_params", wraps=job_params.import_job_params)
+
+    _, description, _ = dataset_job_params(name="test_func", module=MODULE)
+
+    import_job_params.assert_called_once_with("test_func", MODULE)
+    assert description == "A new description."
+
+def test_no_artifact(flow_module: Path):  # noqa: ARG001
+    assert job_params.read_job_params("test_func", MODULE) is None
+    assert job_params.read_job_params("test_func", "missing.module") is None
+
+@pytest.mark.parametrize("module", ["missing.module", "sys"])
+def test_write_needs_module_source(module: str):
+    with pytest.raises(ValueError, match=f"Module {module} has no source file"):
+        job_params.write_job_params(module)
+
+def test_artifact_out_of_date_when_package_changes(package_module: Path):
+    module = f"{PACKAGE}.flows"
+    job_params.write_job_params(module)
+    assert job_params.read_job_params("test_func", module) is not None
+
+    (package_module / "helpers.py").write_text("SCALE = 2\n")
+
+    assert job_params.read_job_params("test_func", module) is None
+
+def test_artifact_out_of_date_when_md_dataset_changes(flow_module: Path, mocker: MockerFixture):  # noqa: ARG001
+    job_params.write_job_params(MODULE)
+    mocker.patch("md_dataset.job_params.md_dataset_version", return_value="0.0.0-other")
+
+    assert job_params.read_job_params("test_func", MODULE) is None
+
+@pytest.mark.parametrize("content", ["{", '{"module": "job_params_flows"}'])
+def test_corrupt_artifact(flow_module: Path, content: str):
+    flow_module.with_suffix(".params.json").write_text(content)
+
+    assert job_params.read_job_params("test_func", MODULE) is None
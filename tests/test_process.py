@@ -1,8 +1,12 @@
+import json
+import marshal
 from uuid import UUID
 import pandas as pd
 import pytest
 from pydantic import ValidationError
 from pytest_mock import MockerFixture
+from tools.harness import load_by_key
+from tools.harness import saved_tables
 from md_dataset.models.dataset import DatasetType
 from md_dataset.models.dataset import EntityInputParams
 from md_dataset.models.dataset import InputDatasetTable
@@ -15,6 +19,8 @@ from md_dataset.models.dataset import IntensityTableType
 from md_dataset.process import md_py
 from md_dataset.process import md_upload
 from md_dataset.storage import FileManager
+from md_dataset.telemetry import Profiler
+from md_dataset.telemetry.profiling import ProfilerMode
 
 # Test constants
 THREE_EXPECTED_TABLES_COUNT = 3
@@ -79,7 +85,7 @@ def test_run_process_save_and_returns_data(input_datasets: list[IntensityInputDa
 
     test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
     test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]})
-    fake_file_manager.load_parquet_to_df.side_effect = [test_data, test_metadata]
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
 
     result = run_process_data(input_datasets, test_params, DatasetType.INTENSITY)
 
@@ -91,17 +97,101 @@ def test_run_process_save_and_returns_data(input_datasets: list[IntensityInputDa
     assert result["tables"][1]["name"] == "Protein_Metadata"
     assert result["tables"][1]["path"] == f"job_runs/{result['run_id']}/Protein_Metadata.parquet"
 
-    fake_file_manager.save_tables.assert_called_once()
-    args, _ = fake_file_manager.save_tables.call_args
+    saved = saved_tables(fake_file_manager)
+
+    assert set(saved) == {
+        f"job_runs/{result['run_id']}/Protein_Intensity.parquet",
+        f"job_runs/{result['run_id']}/Protein_Metadata.parquet",
+    }
+    pd.testing.assert_frame_equal(saved[f"job_runs/{result['run_id']}/Protein_Intensity.parquet"], \
+            test_data.iloc[::-1])
+    pd.testing.assert_frame_equal(saved[f"job_runs/{result['run_id']}/Protein_Metadata.parquet"], test_metadata)
+
+@pytest.fixture
+def protein_and_peptide_datasets() -> list[IntensityInputDataset]:
+    return [IntensityInputDataset(id=UUID("11111111-1111-1111-1111-111111111111"), name="one", tables=[
+            InputDatasetTable(name="Protein_Intensity", bucket="bucket", key="baz/qux"),
+            InputDatasetTable(name="Protein_Metadata", bucket="bucket", key="qux/quux"),
+            InputDatasetTable(name="Peptide_Intensity", bucket="bucket", key="peptide/intensity"),
+        ])]
+
+def loaded_keys(file_manager: FileManager) -> list[str]:
+    return sorted(call.kwargs["key"] for call in file_manager.load_parquet_to_df.call_args_list)
+
+def test_run_process_loads_only_accessed_tables(protein_and_peptide_datasets: list[IntensityInputDataset], \
+        test_params: TestBlahParams, fake_file_manager: FileManager):
+    test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+    test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]})
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
+
+    run_process_data(protein_and_peptide_datasets, test_params, DatasetType.INTENSITY)
+
+    assert loaded_keys(fake_file_manager) == ["baz/qux", "qux/quux"]
+
+@md_py(prefetch=["Peptide_Intensity"])
+def run_process_data_prefetch(input_datasets: list[IntensityInputDataset], params: InputParams, \
+        output_dataset_type: DatasetType) -> dict: # noqa: ARG001
+    intensity_table = input_datasets[0].table(IntensityTableType.INTENSITY, IntensityEntity.PROTEIN)
+    metadata_table = input_datasets[0].table(IntensityTableType.METADATA, IntensityEntity.PROTEIN)
+
+    return [
+            IntensityData(
+                entity=IntensityEntity.PROTEIN,
+                tables = [
+                    IntensityTable(type=IntensityTableType.INTENSITY, data=intensity_table.data),
+                    IntensityTable(type=IntensityTableType.METADATA, data=metadata_table.data),
+                    ],
+                ),
+            ]
+
+def test_run_process_prefetches_tables(protein_and_peptide_datasets: list[IntensityInputDataset], \
+        test_params: TestBlahParams, fake_file_manager: FileManager):
+    test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+    test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]})
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata, \
+            "peptide/intensity": test_data})
 
-    assert isinstance(args[0], list)
-    assert len(args[0]) == 2 # noqa: PLR2004
+    result = run_process_data_prefetch(protein_and_peptide_datasets, test_params, DatasetType.INTENSITY)
 
-    assert args[0][0][0] == f"job_runs/{result['run_id']}/Protein_Intensity.parquet"
-    pd.testing.assert_frame_equal(args[0][0][1], test_data.iloc[::-1])
+    assert [table["name"] for table in result["tables"]] == ["Protein_Intensity", "Protein_Metadata"]
+    assert loaded_keys(fake_file_manager) == ["baz/qux", "peptide/intensity", "qux/quux"]
 
-    assert args[0][1][0] == f"job_runs/{result['run_id']}/Protein_Metadata.parquet"
-    pd.testing.assert_frame_equal(args[0][1][1], test_metadata)
+def test_input_table_loads_on_first_access():
+    table = InputDatasetTable(name="Protein_Intensity", bucket="bucket", key="baz/qux")
+    data = pd.DataFrame({"col1": [1, 2, 3]})
+    loads = []
+    table.bind(lambda: loads.append(1) or data)
+
+    assert not table.loaded
+    assert table.data is data
+    assert table.data is data
+    assert table.loaded
+    assert loads == [1]
+
+def test_input_table_dumps_data():
+    data = pd.DataFrame({"col1": [1]})
+    table = InputDatasetTable(name="Protein_Intensity", bucket="bucket", key="key", data=data)
+
+    dumped = table.model_dump()
+
+    assert list(dumped) == ["name", "bucket", "key", "data"]
+    assert "data" in InputDatasetTable.model_fields
+    assert dumped["data"] is data
+    assert list(table.dict()) == list(dumped)
+    assert InputDatasetTable(**dumped).data is data
+
+def test_input_dataset_table_lookup(protein_and_peptide_datasets: list[IntensityInputDataset]):
+    dataset = protein_and_peptide_datasets[0]
+
+    assert dataset.table(IntensityTableType.INTENSITY, IntensityEntity.PEPTIDE).key == "peptide/intensity"
+    assert dataset.table(IntensityTableType.METADATA).key == "qux/quux"
+    assert dataset.table(IntensityTableType.METADATA, IntensityEntity.PEPTIDE) is None
+
+    dataset.set_table_data([pd.DataFrame({"col1": [i]}) for i in range(3)])
+    assert dataset.table(IntensityTableType.INTENSITY, IntensityEntity.PEPTIDE).data["col1"].tolist() == [2]
+
+    dataset.tables[2] = InputDatasetTable(name="Peptide_Intensity", data=pd.DataFrame({"col1": [3]}))
+    assert dataset.table(IntensityTableType.INTENSITY, IntensityEntity.PEPTIDE).data["col1"].tolist() == [3]
 
 @md_py
 def run_process_missing_metadata(input_datasets: list[IntensityInputDataset], params: InputParams, \
@@ -159,7 +249,7 @@ def test_run_process_returns_table_data(input_datasets: list[IntensityInputDatas
 
     test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
     test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]})
-    fake_file_manager.load_parquet_to_df.side_effect = [test_data, test_metadata]
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
 
     result = run_process_data(input_datasets, test_params, DatasetType.INTENSITY )
 
@@ -187,7 +277,7 @@ def test_run_process_returns_table_runtime_metadata(input_datasets: list[Intensi
 
     test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
     test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]})
-    fake_file_manager.load_parquet_to_df.side_effect = [test_data, test_metadata]
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
 
     result = run_process_data_with_runtime_metadata(input_datasets, test_params, DatasetType.INTENSITY)
 
@@ -195,15 +285,13 @@ def test_run_process_returns_table_runtime_metadata(input_datasets: list[Intensi
     assert result["tables"][2]["name"] == "Protein_RuntimeMetadata"
     assert result["tables"][2]["path"] == f"job_runs/{result['run_id']}/runtime_metadata.parquet"
 
-    fake_file_manager.save_tables.assert_called_once()
-    args, _ = fake_file_manager.save_tables.call_args
+    saved = saved_tables(fake_file_manager)
 
-    assert isinstance(args[0], list)
-    assert len(args[0]) == 3 # noqa: PLR2004
+    assert len(saved) == 3 # noqa: PLR2004
 
-    assert args[0][2][0] == f"job_runs/{result['run_id']}/runtime_metadata.parquet"
-    pd.testing.assert_frame_equal(args[0][1][1], pd.DataFrame({"col1": [4, 5, 6], \
-            "col2": ["x", "y", "z"]}))
+    assert f"job_runs/{result['run_id']}/runtime_metadata.parquet" in saved
+    pd.testing.assert_frame_equal(saved[f"job_runs/{result['run_id']}/metadata.parquet"], \
+            pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]}))
 
 
 
@@ -429,7 +517,7 @@ def test_run_process_duplicate_table_types(input_datasets: list[IntensityInputDa
         test_params: TestBlahParams, fake_file_manager: FileManager):
     test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
     test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]})
-    fake_file_manager.load_parquet_to_df.side_effect = [test_data, test_metadata]
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
 
     result = run_process_duplicate_table_types(input_datasets, test_params, DatasetType.INTENSITY)
 
@@ -494,7 +582,7 @@ def test_run_process_different_entity_types(input_datasets: list[IntensityInputD
         test_params: TestBlahParams, fake_file_manager: FileManager):
     test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
     test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]})
-    fake_file_manager.load_parquet_to_df.side_effect = [test_data, test_metadata]
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
 
     result = run_process_different_entity_types(input_datasets, test_params, DatasetType.INTENSITY)
 
@@ -532,7 +620,7 @@ def test_run_process_with_runtime_metadata(input_datasets: list[IntensityInputDa
         test_params: TestBlahParams, fake_file_manager: FileManager):
     test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
     test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": ["x", "y", "z"]})
-    fake_file_manager.load_parquet_to_df.side_effect = [test_data, test_metadata]
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
 
     result = run_process_with_runtime_metadata(input_datasets, test_params, DatasetType.INTENSITY)
 
@@ -668,3 +756,40 @@ def test_intensity_dataset_dump_path_generation():
 
     actual_paths = [table["path"] for table in result["tables"]]
     assert actual_paths == expected_paths
+
+
+def test_run_process_saves_resource_usage(input_datasets: list[IntensityInputDataset], test_params: TestBlahParams, \
+        fake_file_manager: FileManager):
+    test_data = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+    fake_file_manager.load_parquet_to_df.return_value = test_data
+
+    result = run_process_legacy(input_datasets, test_params, DatasetType.INTENSITY)
+
+    body, path = fake_file_manager.save_bytes.call_args.args
+    assert path == f"job_runs/{result['run_id']}/resource_usage.json"
+    phases = [phase["phase"] for phase in json.loads(body)["phases"]]
+    # Tables load on demand within compute, each measured as a load_table phase
+    assert phases == ["load", "load_table", "load_table", "compute", "build", "save"]
+
+def test_run_process_saves_profile(mocker: MockerFixture, input_datasets: list[IntensityInputDataset], \
+        test_params: TestBlahParams, fake_file_manager: FileManager):
+    mocker.patch("md_dataset.process.profiler_from_env", return_value=Profiler(ProfilerMode.CPROFILE))
+    fake_file_manager.load_parquet_to_df.return_value = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+
+    result = run_process_legacy(input_datasets, test_params, DatasetType.INTENSITY)
+
+    saved = {call.args[1]: call.args[0] for call in fake_file_manager.save_bytes.call_args_list}
+    stats = marshal.loads(saved[f"job_runs/{result['run_id']}/profiles/user_function.prof"])  # noqa: S302
+    assert any(function == "run_process_legacy" for _, _, function in stats)
+
+def test_flow_resolves_result_storage_when_it_runs(mocker: MockerFixture):
+    get_result_storage = mocker.patch("md_dataset.process.get_result_storage", return_value="storage")
+
+    @md_py
+    def run_nothing(input_datasets: list[IntensityInputDataset], params: InputParams, \
+            output_dataset_type: DatasetType) -> dict:  # noqa: ARG001
+        return {}
+
+    get_result_storage.assert_not_called()
+    assert run_nothing.result_storage == "storage"
+    assert run_nothing.with_options(result_storage="other").result_storage == "other"
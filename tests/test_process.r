@@ -34,3 +34,62 @@ process <- function(intensity_dataframe, metadata_dataframe, message) {
     )
   ))
 }
+
+# Table references - reads the selected columns of the intensity table itself
+process_refs <- function(intensity_ref, message) {
+  intensity <- as.data.frame(arrow::read_parquet(intensity_ref$uri, col_select = intensity_ref$columns))
+
+  return(list(
+    list(
+      entity = "Protein",
+      tables = list(
+        list(type = "intensity", data = intensity),
+        list(type = "metadata", data = data.frame(Test = c("First"), Message = c(message)))
+      )
+    )
+  ))
+}
+
+# Parquet outputs - writes the output tables to output_dir and returns their file names
+process_parquet <- function(intensity_dataframe, metadata_dataframe, message, output_dir) {
+  arrow::write_parquet(rev(intensity_dataframe), file.path(output_dir, "intensity.parquet"))
+  arrow::write_parquet(data.frame(Test = c("First"), Message = c(message)), file.path(output_dir, "metadata.parquet"))
+
+  return(list(
+    list(
+      entity = "Protein",
+      tables = list(
+        list(type = "intensity", data = "intensity.parquet"),
+        list(type = "metadata", data = "metadata.parquet")
+      )
+    )
+  ))
+}
+
+# Per entity calls - returns the IntensityData of one entity
+process_entity <- function(intensity_dataframe, entity) {
+  return(list(
+    list(
+      entity = entity,
+      tables = list(
+        list(type = "intensity", data = intensity_dataframe),
+        list(type = "metadata", data = data.frame(Test = c("First"), Entity = c(entity)))
+      )
+    )
+  ))
+}
+
+# Per entity parquet outputs - every call writes the same file names to its own output_dir
+process_entity_parquet <- function(intensity_dataframe, entity, output_dir) {
+  arrow::write_parquet(intensity_dataframe, file.path(output_dir, "intensity.parquet"))
+
+  return(list(
+    list(
+      entity = entity,
+      tables = list(
+        list(type = "intensity", data = "intensity.parquet"),
+        list(type = "metadata", data = data.frame(Test = c("First"), Entity = c(entity)))
+      )
+    )
+  ))
+}
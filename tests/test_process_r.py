@@ -1,18 +1,26 @@
+from pathlib import Path
 from uuid import UUID
 import pandas as pd
 import pytest
 from pytest_mock import MockerFixture
 from rpy2.robjects import conversion
 from rpy2.robjects import default_converter
+from tools.harness import load_by_key
+from tools.harness import saved_tables
 from md_dataset.models.dataset import DatasetType
 from md_dataset.models.dataset import InputDatasetTable
 from md_dataset.models.dataset import InputParams
 from md_dataset.models.dataset import IntensityEntity
 from md_dataset.models.dataset import IntensityInputDataset
 from md_dataset.models.dataset import IntensityTableType
+from md_dataset.models.r import RExecution
 from md_dataset.models.r import RFuncArgs
+from md_dataset.models.r import RTableRef
+from md_dataset.models.r import RTransfer
 from md_dataset.process import md_r
+from md_dataset.process import recursive_conversion
 from md_dataset.storage import FileManager
+from md_dataset.storage import get_file_manager
 
 
 class TestRParams(InputParams):
@@ -38,6 +46,55 @@ def prepare_test_run_r(input_datasets: list[IntensityInputDataset], params: Test
             r_args=[params.message])
 
 
+@md_r(r_file="./tests/test_process.r", r_function="process", transfer=RTransfer.ARROW)
+def prepare_test_run_r_arrow(input_datasets: list[IntensityInputDataset], params: TestRParams, \
+        output_dataset_type: DatasetType) -> RFuncArgs: # noqa: ARG001
+    return RFuncArgs(data_frames = [ \
+            input_datasets[0].table(IntensityTableType.INTENSITY, IntensityEntity.PROTEIN).data, \
+            input_datasets[0].table(IntensityTableType.METADATA, IntensityEntity.PROTEIN).data], \
+            r_args=[params.message])
+
+
+@md_r(r_file="./tests/test_process.r", r_function="process", execution=RExecution.WORKER)
+def prepare_test_run_r_worker(input_datasets: list[IntensityInputDataset], params: TestRParams, \
+        output_dataset_type: DatasetType) -> RFuncArgs: # noqa: ARG001
+    return RFuncArgs(data_frames = [ \
+            input_datasets[0].table(IntensityTableType.INTENSITY, IntensityEntity.PROTEIN).data, \
+            input_datasets[0].table(IntensityTableType.METADATA, IntensityEntity.PROTEIN).data], \
+            r_args=[params.message])
+
+
+@md_r(r_file="./tests/test_process.r", r_function="process_refs", load_inputs=False)
+def prepare_test_run_r_refs(input_datasets: list[IntensityInputDataset], params: TestRParams, \
+        output_dataset_type: DatasetType) -> RFuncArgs: # noqa: ARG001
+    intensity = input_datasets[0].table(IntensityTableType.INTENSITY, IntensityEntity.PROTEIN)
+    return RFuncArgs(data_frames = [RTableRef.from_table(intensity, get_file_manager(), columns=["col2"])], \
+            r_args=[params.message])
+
+
+@md_r(r_file="./tests/test_process.r", r_function="process_parquet", parquet_outputs=True)
+def prepare_test_run_r_parquet(input_datasets: list[IntensityInputDataset], params: TestRParams, \
+        output_dataset_type: DatasetType) -> RFuncArgs: # noqa: ARG001
+    return RFuncArgs(data_frames = [ \
+            input_datasets[0].table(IntensityTableType.INTENSITY, IntensityEntity.PROTEIN).data, \
+            input_datasets[0].table(IntensityTableType.METADATA, IntensityEntity.PROTEIN).data], \
+            r_args=[params.message])
+
+
+@md_r(r_file="./tests/test_process.r", r_function="process_entity", execution=RExecution.WORKER)
+def prepare_test_run_r_entities(input_datasets: list[IntensityInputDataset], params: TestRParams, \
+        output_dataset_type: DatasetType) -> list[RFuncArgs]: # noqa: ARG001
+    return [RFuncArgs(data_frames = [input_datasets[0].table(IntensityTableType.INTENSITY, entity).data], \
+            r_args=[entity.value]) for entity in (IntensityEntity.PROTEIN, IntensityEntity.PEPTIDE)]
+
+
+@md_r(r_file="./tests/test_process.r", r_function="process_entity_parquet", parquet_outputs=True)
+def prepare_test_run_r_entities_parquet(input_datasets: list[IntensityInputDataset], params: TestRParams, \
+        output_dataset_type: DatasetType) -> list[RFuncArgs]: # noqa: ARG001
+    return [RFuncArgs(data_frames = [input_datasets[0].table(IntensityTableType.INTENSITY, entity).data], \
+            r_args=[entity.value]) for entity in (IntensityEntity.PROTEIN, IntensityEntity.PEPTIDE)]
+
+
 @pytest.fixture
 def fake_file_manager(mocker: MockerFixture):
     file_manager = mocker.Mock(spec=FileManager)
@@ -71,7 +128,7 @@ def test_run_process_r_legacy_input_dataset(input_datasets: list[IntensityInputD
 def test_run_process_r_legacy_results(input_datasets: list[IntensityInputDataset], fake_file_manager: FileManager):
     test_data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": ["a", "b", "c"]})
     test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": [1, 2, 3]})
-    fake_file_manager.load_parquet_to_df.side_effect = [test_data, test_metadata]
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
 
     with conversion.localconverter(default_converter):
         result = prepare_test_run_r_legacy(input_datasets, TestRParams(dataset_name="name", \
@@ -85,18 +142,14 @@ def test_run_process_r_legacy_results(input_datasets: list[IntensityInputDataset
     assert result["tables"][1]["name"] == "Protein_Metadata"
     assert result["tables"][1]["path"] == f"job_runs/{result['run_id']}/metadata.parquet"
 
-    fake_file_manager.save_tables.assert_called_once()
-    args, _ = fake_file_manager.save_tables.call_args
+    saved = saved_tables(fake_file_manager)
 
-    assert isinstance(args[0], list)
-    assert len(args[0]) == 2 # noqa: PLR2004
+    assert len(saved) == 2 # noqa: PLR2004
 
-    assert args[0][0][0] == f"job_runs/{result['run_id']}/intensity.parquet"
-    pd.testing.assert_frame_equal(args[0][0][1].reset_index(drop=True), \
+    pd.testing.assert_frame_equal(saved[f"job_runs/{result['run_id']}/intensity.parquet"].reset_index(drop=True), \
             test_data[test_data.columns[::-1]])
 
-    assert args[0][1][0] == f"job_runs/{result['run_id']}/metadata.parquet"
-    pd.testing.assert_frame_equal(args[0][1][1].reset_index(drop=True), \
+    pd.testing.assert_frame_equal(saved[f"job_runs/{result['run_id']}/metadata.parquet"].reset_index(drop=True), \
             pd.DataFrame({"Test": ["First"], "Message": ["hello"]}))
 
 
@@ -117,7 +170,7 @@ def test_run_process_r_input_dataset(input_datasets: list[IntensityInputDataset]
 def test_run_process_r_results(input_datasets: list[IntensityInputDataset], fake_file_manager: FileManager):
     test_data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": ["a", "b", "c"]})
     test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": [1, 2, 3]})
-    fake_file_manager.load_parquet_to_df.side_effect = [test_data, test_metadata]
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
 
     with conversion.localconverter(default_converter):
         result = prepare_test_run_r(input_datasets, TestRParams(dataset_name="name", \
@@ -131,16 +184,179 @@ def test_run_process_r_results(input_datasets: list[IntensityInputDataset], fake
     assert result["tables"][1]["name"] == "Protein_Metadata"
     assert result["tables"][1]["path"] == f"job_runs/{result['run_id']}/Protein_Metadata.parquet"
 
-    fake_file_manager.save_tables.assert_called_once()
-    args, _ = fake_file_manager.save_tables.call_args
+    saved = saved_tables(fake_file_manager)
 
-    assert isinstance(args[0], list)
-    assert len(args[0]) == 2 # noqa: PLR2004
+    assert len(saved) == 2 # noqa: PLR2004
+
+    intensity = saved[f"job_runs/{result['run_id']}/Protein_Intensity.parquet"]
+    pd.testing.assert_frame_equal(intensity.reset_index(drop=True), test_data[test_data.columns[::-1]])
+
+    metadata = saved[f"job_runs/{result['run_id']}/Protein_Metadata.parquet"]
+    pd.testing.assert_frame_equal(metadata.reset_index(drop=True), \
+            pd.DataFrame({"Test": ["First"], "Message": ["hello"]}))
+
+
+def test_run_process_r_warms_up_r_while_loading(mocker: MockerFixture, \
+        input_datasets: list[IntensityInputDataset], fake_file_manager: FileManager):
+    warm_up = mocker.patch("md_dataset.r.session.warm_up")
+    test_data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": ["a", "b", "c"]})
+    test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": [1, 2, 3]})
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
+
+    with conversion.localconverter(default_converter):
+        prepare_test_run_r(input_datasets, TestRParams(dataset_name="name", message="hello"), DatasetType.INTENSITY)
+
+    warm_up.assert_called_once_with("./tests/test_process.r", [])
+
+
+def test_run_process_r_ignores_warm_up_failures(mocker: MockerFixture, \
+        input_datasets: list[IntensityInputDataset], fake_file_manager: FileManager):
+    mocker.patch("md_dataset.r.session.warm_up", side_effect=RuntimeError("no R yet"))
+    test_data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": ["a", "b", "c"]})
+    test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": [1, 2, 3]})
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
+
+    with conversion.localconverter(default_converter):
+        result = prepare_test_run_r(input_datasets, TestRParams(dataset_name="name", message="hello"), \
+                DatasetType.INTENSITY)
+
+    assert [table["name"] for table in result["tables"]] == ["Protein_Intensity", "Protein_Metadata"]
 
-    assert args[0][0][0] == f"job_runs/{result['run_id']}/Protein_Intensity.parquet"
-    pd.testing.assert_frame_equal(args[0][0][1].reset_index(drop=True), \
-            test_data[test_data.columns[::-1]])
 
-    assert args[0][1][0] == f"job_runs/{result['run_id']}/Protein_Metadata.parquet"
-    pd.testing.assert_frame_equal(args[0][1][1].reset_index(drop=True), \
+def test_run_process_r_arrow_transfer(input_datasets: list[IntensityInputDataset], fake_file_manager: FileManager):
+    test_data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": [1.5, 2.5, None]})
+    test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": [1, 2, 3]})
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
+
+    with conversion.localconverter(default_converter):
+        result = prepare_test_run_r_arrow(input_datasets, TestRParams(dataset_name="name", \
+                message="hello"), DatasetType.INTENSITY)
+
+    saved = saved_tables(fake_file_manager)
+
+    intensity = saved[f"job_runs/{result['run_id']}/Protein_Intensity.parquet"]
+    pd.testing.assert_frame_equal(intensity.reset_index(drop=True), test_data[test_data.columns[::-1]])
+
+    metadata = saved[f"job_runs/{result['run_id']}/Protein_Metadata.parquet"]
+    pd.testing.assert_frame_equal(metadata.reset_index(drop=True), \
             pd.DataFrame({"Test": ["First"], "Message": ["hello"]}))
+
+
+def test_run_process_r_worker_execution(input_datasets: list[IntensityInputDataset], \
+        fake_file_manager: FileManager):
+    test_data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": ["a", "b", "c"]})
+    test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": [1, 2, 3]})
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"baz/qux": test_data, "qux/quux": test_metadata})
+
+    result = prepare_test_run_r_worker(input_datasets, TestRParams(dataset_name="name", message="hello"), \
+            DatasetType.INTENSITY)
+
+    assert [table["name"] for table in result["tables"]] == ["Protein_Intensity", "Protein_Metadata"]
+
+    saved = saved_tables(fake_file_manager)
+
+    intensity = saved[f"job_runs/{result['run_id']}/Protein_Intensity.parquet"]
+    pd.testing.assert_frame_equal(intensity.reset_index(drop=True), test_data[test_data.columns[::-1]])
+
+
+def test_run_process_r_calls_per_entity(fake_file_manager: FileManager):
+    input_datasets = [IntensityInputDataset(id=UUID("11111111-1111-1111-1111-111111111111"), name="r", tables=[
+            InputDatasetTable(name="Protein_Intensity", bucket="bucket", key="protein/intensity"),
+            InputDatasetTable(name="Protein_Metadata", bucket="bucket", key="protein/metadata"),
+            InputDatasetTable(name="Peptide_Intensity", bucket="bucket", key="peptide/intensity"),
+            InputDatasetTable(name="Peptide_Metadata", bucket="bucket", key="peptide/metadata"),
+        ])]
+    protein = pd.DataFrame({"ProteinId": ["P1", "P2"], "Intensity": [1.0, 2.0]})
+    peptide = pd.DataFrame({"PeptideId": ["A", "B", "C"], "Intensity": [3.0, 4.0, 5.0]})
+    metadata = pd.DataFrame({"col1": [1]})
+    fake_file_manager.load_parquet_to_df.side_effect = load_by_key({"protein/intensity": protein, \
+            "protein/metadata": metadata, "peptide/intensity": peptide, "peptide/metadata": metadata})
+
+    result = prepare_test_run_r_entities(input_datasets, TestRParams(dataset_name="name", message="hello"), \
+            DatasetType.INTENSITY)
+
+    assert [table["name"] for table in result["tables"]] == ["Protein_Intensity", "Protein_Metadata", \
+            "Peptide_Intensity", "Peptide_Metadata"]
+
+    saved = saved_tables(fake_file_manager)
+
+    pd.testing.assert_frame_equal(saved[f"job_runs/{result['run_id']}/Protein_Intensity.parquet"] \
+            .reset_index(drop=True), protein)
+    pd.testing.assert_frame_equal(saved[f"job_runs/{result['run_id']}/Peptide_Intensity.parquet"] \
+            .reset_index(drop=True), peptide)
+
+
+def test_run_process_r_table_refs(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, \
+        input_datasets: list[IntensityInputDataset]):
+    monkeypatch.setenv("LOCAL_STORAGE_DIR", str(tmp_path))
+    monkeypatch.delenv("RESULTS_BUCKET", raising=False)
+    test_data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": ["a", "b", "c"]})
+    (tmp_path / "bucket" / "baz").mkdir(parents=True)
+    test_data.to_parquet(tmp_path / "bucket" / "baz" / "qux")
+
+    with conversion.localconverter(default_converter):
+        result = prepare_test_run_r_refs(input_datasets, TestRParams(dataset_name="name", message="hello"), \
+                DatasetType.INTENSITY)
+
+    intensity = get_file_manager().load_parquet_to_df(bucket=None, \
+            key=f"job_runs/{result['run_id']}/Protein_Intensity.parquet")
+    pd.testing.assert_frame_equal(intensity, test_data[["col2"]])
+
+
+def test_run_process_r_parquet_outputs(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, \
+        input_datasets: list[IntensityInputDataset]):
+    monkeypatch.setenv("LOCAL_STORAGE_DIR", str(tmp_path))
+    monkeypatch.delenv("RESULTS_BUCKET", raising=False)
+    test_data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": ["a", "b", "c"]})
+    test_metadata = pd.DataFrame({"col1": [4, 5, 6], "col2": [1, 2, 3]})
+    for key, data in (("baz/qux", test_data), ("qux/quux", test_metadata)):
+        (tmp_path / "bucket" / key).parent.mkdir(parents=True, exist_ok=True)
+        data.to_parquet(tmp_path / "bucket" / key)
+
+    with conversion.localconverter(default_converter):
+        result = prepare_test_run_r_parquet(input_datasets, TestRParams(dataset_name="name", message="hello"), \
+                DatasetType.INTENSITY)
+
+    file_manager = get_file_manager()
+    intensity = file_manager.load_parquet_to_df(bucket=None, \
+            key=f"job_runs/{result['run_id']}/Protein_Intensity.parquet")
+    pd.testing.assert_frame_equal(intensity, test_data[test_data.columns[::-1]], check_dtype=False)
+
+    metadata_csv = file_manager.load_bytes(f"job_runs/{result['run_id']}/Protein_Metadata.csv")
+    assert metadata_csv.decode() == "Test,Message\nFirst,hello\n"
+
+
+def test_run_process_r_parquet_outputs_per_call(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    monkeypatch.setenv("LOCAL_STORAGE_DIR", str(tmp_path))
+    monkeypatch.delenv("RESULTS_BUCKET", raising=False)
+    input_datasets = [IntensityInputDataset(id=UUID("11111111-1111-1111-1111-111111111111"), name="r", tables=[
+            InputDatasetTable(name="Protein_Intensity", bucket="bucket", key="protein/intensity"),
+            InputDatasetTable(name="Peptide_Intensity", bucket="bucket", key="peptide/intensity"),
+        ])]
+    protein = pd.DataFrame({"ProteinId": ["P1", "P2"], "Intensity": [1.0, 2.0]})
+    peptide = pd.DataFrame({"PeptideId": ["A", "B", "C"], "Intensity": [3.0, 4.0, 5.0]})
+    for key, data in (("protein/intensity", protein), ("peptide/intensity", peptide)):
+        (tmp_path / "bucket" / key).parent.mkdir(parents=True, exist_ok=True)
+        data.to_parquet(tmp_path / "bucket" / key)
+
+    with conversion.localconverter(default_converter):
+        result = prepare_test_run_r_entities_parquet(input_datasets, \
+                TestRParams(dataset_name="name", message="hello"), DatasetType.INTENSITY)
+
+    file_manager = get_file_manager()
+    for name, data in (("Protein_Intensity", protein), ("Peptide_Intensity", peptide)):
+        saved = file_manager.load_parquet_to_df(bucket=None, key=f"job_runs/{result['run_id']}/{name}.parquet")
+        pd.testing.assert_frame_equal(saved, data, check_dtype=False)
+
+
+def test_recursive_conversion_is_deprecated():
+    import rpy2.robjects as ro
+    from rpy2.robjects import pandas2ri
+
+    r_out = ro.r('list(message = "done", data = data.frame(value = c(1.5, 2.5)))')
+    with conversion.localconverter(default_converter + pandas2ri.converter), \
+            pytest.warns(DeprecationWarning, match="RResultConverter"):
+        result = recursive_conversion(r_out)
+
+    assert result["message"] == "done"
+    assert result["data"]["value"].tolist() == [1.5, 2.5]
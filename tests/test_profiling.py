@@ -0,0 +1,60 @@
+import logging
+import marshal
+import pstats
+import time
+from pathlib import Path
+import pytest
+from md_dataset.telemetry import Profiler
+from md_dataset.telemetry import current_profiler
+from md_dataset.telemetry import profile_section
+from md_dataset.telemetry import profiler_from_env
+from md_dataset.telemetry.profiling import ProfilerMode
+
+
+def busy_user_function(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1_000))
+
+
+def test_profile_section_is_noop_without_profiler():
+    with profile_section("user_function"):
+        busy_user_function(0.01)
+    assert current_profiler() is None
+
+
+def test_cprofile_artifact_loads_with_pstats(tmp_path: Path):
+    with Profiler(ProfilerMode.CPROFILE) as profiler, profile_section("user_function"):
+        busy_user_function(0.05)
+
+    content = profiler.artifacts["user_function.prof"]
+    assert any(key[2] == "busy_user_function" for key in marshal.loads(content))  # noqa: S302
+    path = tmp_path / "user_function.prof"
+    path.write_bytes(content)
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_sampling_artifact_is_collapsed_stacks():
+    with Profiler(ProfilerMode.SAMPLING, interval=0.001) as profiler, profile_section("user_function"):
+        busy_user_function(0.2)
+
+    lines = profiler.artifacts["user_function.collapsed"].decode("utf-8").splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "busy_user_function" in stack
+    assert stack.index("test_sampling_artifact_is_collapsed_stacks") < stack.index("busy_user_function")
+
+
+def test_profiler_from_env(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture):
+    monkeypatch.delenv("PROFILER", raising=False)
+    assert profiler_from_env() is None
+    monkeypatch.setenv("PROFILER", "sampling")
+    assert profiler_from_env().mode == ProfilerMode.SAMPLING
+
+    assert profiler_from_env("") is None
+    assert profiler_from_env("cprofile").mode == ProfilerMode.CPROFILE
+    assert profiler_from_env("sampling").mode == ProfilerMode.SAMPLING
+    with caplog.at_level(logging.WARNING):
+        assert profiler_from_env("pyspy") is None
+    assert "Unknown profiler pyspy" in caplog.text
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+from md_dataset.models.dataset import DatasetType
+from md_dataset.models.dataset import IntensityEntity
+from md_dataset.models.dataset import IntensityTableType
+from md_dataset.r.convert import RResultConverter
+
+
+def test_convert_python_builds_intensity_data():
+    data = pd.DataFrame({"value": [1.0, 2.0]})
+    metadata = pd.DataFrame({"Test": ["First"]})
+    result = [{"entity": entity, "tables": [{"type": "intensity", "data": data}, \
+            {"type": "metadata", "data": metadata}]} for entity in ("Protein", "Peptide")]
+
+    converter = RResultConverter()
+    converted = converter.convert_python(result)
+
+    assert [item.entity for item in converted] == [IntensityEntity.PROTEIN, IntensityEntity.PEPTIDE]
+    assert [table.type for table in converted[0].tables] == [IntensityTableType.INTENSITY, \
+            IntensityTableType.METADATA]
+    pd.testing.assert_frame_equal(converted[1].tables[0].data, data)
+    assert converter.summary() == {"tables": 4, "rows": 6}
+
+
+def test_convert_python_keeps_other_results():
+    data = pd.DataFrame({"value": [1.0]})
+    result = {"intensity": data, "message": "done", "nested": [{"entity": "Protein", "tables": []}]}
+
+    converter = RResultConverter(DatasetType.DOSE_RESPONSE)
+    converted = converter.convert_python(result)
+
+    pd.testing.assert_frame_equal(converted["intensity"], data)
+    assert converted["message"] == "done"
+    assert converted["nested"] == [{"entity": "Protein", "tables": []}]
+    assert converter.summary() == {"tables": 1, "rows": 1}
+
+
+def test_convert_python_rejects_tables_without_data_frames():
+    result = [{"entity": "Protein", "tables": [{"type": "intensity", "data": 1.0}]}]
+
+    with pytest.raises(TypeError, match="data frame"):
+        RResultConverter().convert_python(result)
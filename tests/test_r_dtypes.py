@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from md_dataset.r.dtypes import NA_INTEGER
+from md_dataset.r.dtypes import arrow_types_mapper
+from md_dataset.r.dtypes import compact_frame
+
+
+def test_compact_frame_maps_r_classes():
+    data = pd.DataFrame({
+        "count": np.array([1, NA_INTEGER, 3], dtype="int32"),
+        "rank": [1.0, np.nan, 2.0],
+        "significant": [True, None, False],
+        "comparison": ["A-B", "A-C", "A-B"],
+        "label": ["x", "y", None],
+        "value": [0.5, 1.5, 2.5],
+    })
+
+    compact = compact_frame(data, ["integer", "integer", "logical", "factor", "character", "numeric"])
+
+    assert compact["count"].dtype == pd.Int32Dtype()
+    assert compact["count"].isna().tolist() == [False, True, False]
+    assert compact["rank"].tolist() == [1, pd.NA, 2]
+    assert compact["significant"].dtype == pd.BooleanDtype()
+    assert compact["significant"].isna().tolist() == [False, True, False]
+    assert isinstance(compact["comparison"].dtype, pd.CategoricalDtype)
+    assert compact["value"].dtype == np.float64
+    pd.testing.assert_series_equal(data["label"], compact["label"])
+
+
+def test_compact_frame_arrow_strings():
+    data = pd.DataFrame({"label": np.array(["x", "y", None], dtype=object)})
+
+    compact = compact_frame(data, ["character"], arrow_strings=True)
+
+    assert compact["label"].dtype.storage == "pyarrow"
+    assert compact["label"].isna().tolist() == [False, False, True]
+
+
+def test_compact_frame_keeps_compact_frames():
+    data = pd.DataFrame({"count": pd.array([1, None], dtype="Int32"), "value": [0.5, 1.5]})
+
+    assert compact_frame(data, ["integer", "numeric"]) is data
+
+
+def test_arrow_types_mapper():
+    table = pa.table({"count": pa.array([1, None], pa.int32()), "flag": pa.array([True, None]), \
+            "label": pa.array(["x", None]), "group": pa.array(["a", "b"]).dictionary_encode()})
+
+    data = table.to_pandas(types_mapper=arrow_types_mapper(arrow_strings=True))
+
+    assert data["count"].dtype == pd.Int32Dtype()
+    assert data["flag"].dtype == pd.BooleanDtype()
+    assert data["label"].dtype == pd.StringDtype("pyarrow")
+    assert isinstance(data["group"].dtype, pd.CategoricalDtype)
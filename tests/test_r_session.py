@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+from md_dataset.r.session import RSession
+
+COUNTING_R = """
+assign("times_sourced", get0("times_sourced", envir = globalenv(), ifnotfound = 0) + 1, envir = globalenv())
+answer <- function() {value}
+"""
+
+
+def write_r_file(path: Path, value: int) -> None:
+    path.write_text(COUNTING_R.format(value=value))
+
+
+def times_sourced() -> int:
+    import rpy2.robjects as ro
+    return int(ro.r("get0('times_sourced', envir = globalenv(), ifnotfound = 0)")[0])
+
+
+def test_session_sources_a_file_once(tmp_path: Path):
+    r_file = tmp_path / "answer.r"
+    write_r_file(r_file, 42)
+    session = RSession()
+    before = times_sourced()
+
+    assert session.function(str(r_file), "answer")()[0] == 42  # noqa: PLR2004
+    assert session.function(str(r_file), "answer")()[0] == 42  # noqa: PLR2004
+    assert times_sourced() == before + 1
+
+
+def test_session_reloads_a_changed_file(tmp_path: Path):
+    r_file = tmp_path / "answer.r"
+    write_r_file(r_file, 1)
+    session = RSession()
+    session.function(str(r_file), "answer")
+
+    write_r_file(r_file, 2)
+    os.utime(r_file, ns=(r_file.stat().st_atime_ns, r_file.stat().st_mtime_ns + 1_000_000_000))
+
+    assert session.function(str(r_file), "answer")()[0] == 2  # noqa: PLR2004
+
+
+def test_session_skips_touched_but_unchanged_file(tmp_path: Path):
+    r_file = tmp_path / "answer.r"
+    write_r_file(r_file, 1)
+    session = RSession()
+    session.source(str(r_file))
+
+    os.utime(r_file, ns=(r_file.stat().st_atime_ns, r_file.stat().st_mtime_ns + 1_000_000_000))
+
+    assert session.source(str(r_file)) is False
+
+
+def test_session_keeps_functions_of_files_apart(tmp_path: Path):
+    first, second = tmp_path / "first.r", tmp_path / "second.r"
+    write_r_file(first, 1)
+    write_r_file(second, 2)
+    session = RSession()
+
+    assert session.function(str(first), "answer")()[0] == 1
+    assert session.function(str(second), "answer")()[0] == 2  # noqa: PLR2004
+    assert session.function(str(first), "answer")()[0] == 1
@@ -0,0 +1,29 @@
+import logging
+import pytest
+from md_dataset.r.stats import RCallStats
+from md_dataset.telemetry import ResourceSampler
+
+
+def test_stats_from_snapshots():
+    before = [1.0, 0.5, 10.0, 0.25, 100.0, 100.0]
+    after = [3.0, 1.0, 13.0, 0.75, 120.0, 400.0]
+
+    stats = RCallStats.from_snapshots("process", before, after, python_to_r_seconds=0.1, r_to_python_seconds=0.2)
+
+    assert stats.r_elapsed_seconds == 3.0  # noqa: PLR2004
+    assert stats.r_cpu_seconds == 2.5  # noqa: PLR2004
+    assert stats.r_gc_seconds == 0.5  # noqa: PLR2004
+    assert stats.r_heap_before_bytes == 100 * 1024 * 1024
+    assert stats.r_heap_after_bytes == 120 * 1024 * 1024
+    assert stats.r_heap_peak_bytes == 400 * 1024 * 1024
+
+
+def test_report_logs_and_records_stats(caplog: pytest.LogCaptureFixture):
+    stats = RCallStats.from_snapshots("process", [0.0] * 6, [1.0] * 6, python_to_r_seconds=0.1, \
+            r_to_python_seconds=0.2)
+
+    with caplog.at_level(logging.INFO), ResourceSampler(interval=0) as sampler:
+        stats.report(logging.getLogger("test"))
+
+    assert "R call process: python to R 0.100s, R elapsed 1.000s" in caplog.text
+    assert sampler.summary()["r_calls"] == [stats._asdict()]
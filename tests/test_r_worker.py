@@ -0,0 +1,138 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pandas as pd
+import pytest
+from md_dataset.models.r import RFuncArgs
+from md_dataset.r.worker import RSCRIPT
+from md_dataset.r.worker import RWorkerError
+from md_dataset.r.worker import RWorkerPool
+from md_dataset.r.worker import RWorkerTimeoutError
+from md_dataset.telemetry import ResourceSampler
+
+pytestmark = pytest.mark.skipif(shutil.which(RSCRIPT) is None, reason=f"{RSCRIPT} is not installed")
+
+WORKER_R = """
+double_values <- function(data, column) {
+  data[[column]] <- data[[column]] * 2
+  list(doubled = data, pid = Sys.getpid())
+}
+
+typed_columns <- function() {
+  data.frame(
+    group = factor(c("a", "b", "a")),
+    count = c(1L, NA, 3L),
+    flag = c(TRUE, NA, FALSE),
+    value = c(0.5, 1.5, NA)
+  )
+}
+
+fail <- function() stop("bad input")
+
+crash <- function() quit(status = 3)
+
+hang <- function() Sys.sleep(60)
+"""
+
+
+@pytest.fixture
+def r_file(tmp_path: Path) -> str:
+    path = tmp_path / "worker_test.r"
+    path.write_text(WORKER_R)
+    return str(path)
+
+
+@pytest.fixture
+def pool():
+    pool = RWorkerPool(size=2, libraries=[])
+    yield pool
+    pool.close()
+
+
+def test_pool_runs_intensity_results(pool: RWorkerPool):
+    data = pd.DataFrame({"col1": ["x", "y", "z"], "col2": ["a", "b", "c"]})
+    result = pool.run("./tests/test_process.r", "process", RFuncArgs(data_frames=[data, data], r_args=["hello"]))
+
+    assert result[0]["entity"] == "Protein"
+    assert [table["type"] for table in result[0]["tables"]] == ["intensity", "metadata"]
+    pd.testing.assert_frame_equal(result[0]["tables"][0]["data"], data[data.columns[::-1]])
+    pd.testing.assert_frame_equal(result[0]["tables"][1]["data"], pd.DataFrame({"Test": ["First"], \
+            "Message": ["hello"]}))
+
+
+def test_pool_records_r_call_stats(pool: RWorkerPool, r_file: str):
+    data = pd.DataFrame({"value": [1.0, 2.0, 3.0]})
+    with ResourceSampler(interval=0) as sampler:
+        pool.run(r_file, "double_values", RFuncArgs(data_frames=[data], r_args=["value"]))
+
+    (stats,) = sampler.summary()["r_calls"]
+    assert stats["function"] == "double_values"
+    assert stats["r_elapsed_seconds"] >= 0
+    assert stats["r_heap_peak_bytes"] >= stats["r_heap_after_bytes"] > 0
+
+
+def test_pool_runs_calls_in_parallel(pool: RWorkerPool, r_file: str):
+    data = pd.DataFrame({"value": [1.0, 2.0, 3.0]})
+    r_args = RFuncArgs(data_frames=[data], r_args=["value"])
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda _: pool.run(r_file, "double_values", r_args), range(4)))
+
+    for result in results:
+        pd.testing.assert_frame_equal(result["doubled"], pd.DataFrame({"value": [2.0, 4.0, 6.0]}))
+    assert len({result["pid"] for result in results}) <= 2  # noqa: PLR2004
+
+
+def test_pool_reads_default_column_types(pool: RWorkerPool, r_file: str):
+    result = pool.run(r_file, "typed_columns", RFuncArgs(data_frames=[]))
+
+    assert result["count"].dtype == "float64"
+    assert result["flag"].dtype == object
+    assert result["count"].isna().tolist() == [False, True, False]
+
+
+def test_pool_keeps_r_column_types(pool: RWorkerPool, r_file: str):
+    result = pool.run(r_file, "typed_columns", RFuncArgs(data_frames=[]), compact_dtypes=True)
+
+    assert isinstance(result["group"].dtype, pd.CategoricalDtype)
+    assert result["count"].dtype == pd.Int32Dtype()
+    assert result["flag"].dtype == pd.BooleanDtype()
+    assert result["count"].isna().tolist() == [False, True, False]
+    assert result["flag"].isna().tolist() == [False, True, False]
+
+
+def test_pool_reports_r_errors(pool: RWorkerPool, r_file: str):
+    with pytest.raises(RWorkerError, match="bad input"):
+        pool.run(r_file, "fail", RFuncArgs(data_frames=[]))
+
+
+def test_pool_replaces_crashed_worker(pool: RWorkerPool, r_file: str):
+    with pytest.raises(RWorkerError, match="exited with code 3"):
+        pool.run(r_file, "crash", RFuncArgs(data_frames=[]))
+
+    result = pool.run(r_file, "double_values", RFuncArgs(data_frames=[pd.DataFrame({"value": [1.0]})], \
+            r_args=["value"]))
+    pd.testing.assert_frame_equal(result["doubled"], pd.DataFrame({"value": [2.0]}))
+
+
+def test_pool_kills_hung_worker(r_file: str):
+    pool = RWorkerPool(size=1, libraries=[], call_timeout=5)
+    try:
+        with pytest.raises(RWorkerTimeoutError, match="did not answer within 5s"):
+            pool.run(r_file, "hang", RFuncArgs(data_frames=[]))
+
+        result = pool.run(r_file, "double_values", RFuncArgs(data_frames=[pd.DataFrame({"value": [1.0]})], \
+                r_args=["value"]))
+        pd.testing.assert_frame_equal(result["doubled"], pd.DataFrame({"value": [2.0]}))
+    finally:
+        pool.close()
+
+
+def test_pool_recycles_workers(r_file: str):
+    pool = RWorkerPool(size=1, max_calls=1, libraries=[])
+    r_args = RFuncArgs(data_frames=[pd.DataFrame({"value": [1.0]})], r_args=["value"])
+    try:
+        pids = {pool.run(r_file, "double_values", r_args)["pid"] for _ in range(2)}
+    finally:
+        pool.close()
+
+    assert len(pids) == 2  # noqa: PLR2004
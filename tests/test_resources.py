@@ -0,0 +1,69 @@
+import logging
+import numpy as np
+import pytest
+from md_dataset.telemetry import ResourceSampler
+from md_dataset.telemetry import record_usage
+from md_dataset.telemetry import resource_phase
+from md_dataset.telemetry.resources import format_bytes
+
+ALLOCATION_BYTES = 64 * 1024 * 1024
+
+
+def test_phases_are_recorded_in_order():
+    with ResourceSampler(interval=0.01) as sampler:
+        with sampler.phase("load"):
+            pass
+        with sampler.phase("compute"):
+            sum(range(100_000))
+
+    assert [phase.phase for phase in sampler.phases] == ["load", "compute"]
+    assert all(phase.wall_seconds >= 0 for phase in sampler.phases)
+    assert sampler.phases[1].cpu_seconds > 0
+
+
+def test_peak_rss_covers_allocation():
+    with ResourceSampler(interval=0.01) as sampler, sampler.phase("compute"):
+        data = np.ones(ALLOCATION_BYTES // 8)
+        del data
+
+    phase = sampler.phases[0]
+    assert phase.peak_rss_bytes - phase.start_rss_bytes >= ALLOCATION_BYTES * 0.9
+
+
+def test_resource_phase_nests_within_current_sampler():
+    with ResourceSampler(interval=0) as sampler, sampler.phase("compute"), resource_phase("r_call"):
+        pass
+
+    assert [phase.phase for phase in sampler.phases] == ["r_call", "compute"]
+
+
+def test_resource_phase_without_sampler_is_a_noop():
+    with resource_phase("r_call"):
+        pass
+
+
+def test_record_usage_adds_records_to_the_summary():
+    with ResourceSampler(interval=0) as sampler:
+        record_usage("r_calls", {"function": "process", "r_elapsed_seconds": 1.5})
+        record_usage("r_calls", {"function": "process", "r_elapsed_seconds": 0.5})
+    record_usage("r_calls", {"function": "outside"})
+
+    assert [call["r_elapsed_seconds"] for call in sampler.summary()["r_calls"]] == [1.5, 0.5]
+
+
+def test_summary_and_log(caplog: pytest.LogCaptureFixture):
+    with ResourceSampler(interval=0) as sampler, sampler.phase("save"):
+        pass
+
+    summary = sampler.summary()
+    assert summary["phases"][0]["phase"] == "save"
+    assert summary["peak_rss_bytes"] > 0
+
+    with caplog.at_level(logging.INFO):
+        sampler.log_summary(logging.getLogger("test"))
+    assert "Resource usage save" in caplog.text
+
+
+def test_format_bytes():
+    assert format_bytes(512) == "512.0B"
+    assert format_bytes(3 * 1024 * 1024) == "3.0MiB"
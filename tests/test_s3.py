@@ -0,0 +1,46 @@
+import pytest
+from pytest_mock import MockerFixture
+from md_dataset.storage import s3
+
+
+@pytest.fixture(autouse=True)
+def clear_block_cache():
+    s3.get_s3_block.cache_clear()
+    yield
+    s3.get_s3_block.cache_clear()
+
+
+def test_result_storage_saves_block_once(monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture):
+    monkeypatch.setenv("RESULTS_BUCKET", "results")
+    monkeypatch.delenv("BOTO3_PROFILE", raising=False)
+    save = mocker.patch("prefect_aws.s3.S3Bucket.save")
+
+    block = s3.get_result_storage()
+
+    assert s3.get_result_storage() is block
+    assert block.bucket_name == "results"
+    save.assert_called_once_with("mdprocess", overwrite=True)
+
+def test_result_storage_without_bucket_or_with_profile(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("RESULTS_BUCKET", raising=False)
+    assert s3.get_result_storage() is None
+
+    monkeypatch.setenv("RESULTS_BUCKET", "results")
+    monkeypatch.setenv("BOTO3_PROFILE", "dev")
+    assert s3.get_result_storage() is None
+
+def test_s3_block_saved_once(monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture):
+    monkeypatch.delenv("BOTO3_PROFILE", raising=False)
+    save = mocker.patch("prefect_aws.s3.S3Bucket.save")
+
+    block = s3.get_s3_block("results")
+
+    assert s3.get_s3_block("results") is block
+    assert block.bucket_name == "results"
+    save.assert_called_once_with("mdprocess", overwrite=True)
+
+def test_s3_block_needs_bucket(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("RESULTS_BUCKET", raising=False)
+
+    with pytest.raises(ValueError, match="RESULTS_BUCKET"):
+        s3.get_s3_block()
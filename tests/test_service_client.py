@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import pytest
+import requests
+from md_dataset.dataset_job_api import create_or_update_dataset_job_and_deployment_send_http_request
+from md_dataset.models.dataset import DatasetType
+from md_dataset.service_client import PollPolicy
+from md_dataset.service_client import PollTimeoutError
+from md_dataset.service_client import await_accepted_all
+from md_dataset.service_client import retry_after_seconds
+from md_dataset.service_client import wait_for_accepted
+
+FAST = PollPolicy(initial_delay=0.02, max_delay=0.08, deadline=10)
+
+
+class StubService(ThreadingHTTPServer):
+    """Answers each path with its queued (status, headers, body) responses, repeating the last one."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.responses = defaultdict(list)
+        self.requests = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def respond(self, path: str, *responses: tuple[int, dict, dict | None]) -> None:
+        self.responses[path].extend(responses)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        self.respond()
+
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.respond()
+
+    def respond(self) -> None:
+        self.server.requests.append((self.command, self.path, self.client_address[1], dict(self.headers)))
+        queued = self.server.responses[self.path]
+        status, headers, body = queued.pop(0) if len(queued) > 1 else queued[0] if queued else (404, {}, None)
+        content = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def service() -> Iterator[StubService]:
+    server = StubService()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def accepted(location: str) -> tuple[int, dict, dict]:
+    return 202, {"Location": location}, {}
+
+
+def test_polls_with_backoff_over_one_connection(service: StubService):
+    service.respond("/deploy/1", accepted("/deploy/1"), accepted("/deploy/1"), accepted("/deploy/1"), \
+            (200, {}, {"id": 1}))
+    waits = []
+
+    response = wait_for_accepted(service.base_url, "/deploy/1", policy=FAST, sleep=waits.append)
+
+    assert response.json() == {"id": 1}
+    assert len(waits) == 3  # noqa: PLR2004
+    for wait, backoff in zip(waits, (0.02, 0.04, 0.08), strict=True):
+        assert backoff / 2 <= wait <= backoff
+    assert len({port for _, _, port, _ in service.requests}) == 1
+
+def test_follows_location_and_sends_headers(service: StubService):
+    service.respond("/deploy/1", accepted("/deploy/1/pod"))
+    service.respond("/deploy/1/pod", (200, {}, {"id": 1}))
+
+    response = wait_for_accepted(service.base_url, "/deploy/1", headers={"Authorization": "Bearer key"}, \
+            policy=FAST, sleep=lambda _: None)
+
+    assert response.json() == {"id": 1}
+    assert [path for _, path, _, _ in service.requests] == ["/deploy/1", "/deploy/1/pod"]
+    assert all(headers["Authorization"] == "Bearer key" for _, _, _, headers in service.requests)
+
+def test_honors_retry_after(service: StubService):
+    service.respond("/deploy/1", (503, {"Retry-After": "3"}, None), (429, {"Retry-After": "1"}, None), \
+            (202, {"Location": "/deploy/1", "Retry-After": "2"}, {}), (200, {}, {"id": 1}))
+    waits = []
+
+    response = wait_for_accepted(service.base_url, "/deploy/1", policy=FAST, sleep=waits.append)
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert waits == [3, 1, 2]
+
+def test_gives_up_at_deadline(service: StubService):
+    service.respond("/deploy/1", accepted("/deploy/1"))
+
+    with pytest.raises(PollTimeoutError, match="/deploy/1"):
+        wait_for_accepted(service.base_url, "/deploy/1", policy=PollPolicy(0.02, 0.05, 0.2))
+
+def test_raises_failed_polls(service: StubService):
+    with pytest.raises(requests.exceptions.HTTPError):
+        wait_for_accepted(service.base_url, "/missing", policy=FAST)
+
+def test_retry_after_seconds():
+    assert retry_after_seconds("5") == 5  # noqa: PLR2004
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(format_datetime(datetime.now(UTC) - timedelta(seconds=5), usegmt=True)) == 0
+    assert 50 < retry_after_seconds(format_datetime(datetime.now(UTC) + timedelta(seconds=60), usegmt=True)) <= 60  # noqa: PLR2004
+
+def test_awaits_many_deployments(service: StubService):
+    for i in range(5):
+        service.respond(f"/deploy/{i}", accepted(f"/deploy/{i}"), (200, {}, {"id": i}))
+
+    results = asyncio.run(await_accepted_all(service.base_url, [f"/deploy/{i}" for i in range(5)] + ["/missing"], \
+            policy=FAST))
+
+    assert [result.json() for result in results[:5]] == [{"id": i} for i in range(5)]
+    assert isinstance(results[5], Exception)
+
+def test_deploy_request_polls_accepted_job(service: StubService):
+    service.respond("/api/jobs/create_or_update", accepted("/api/jobs/job/job_deploy_request/pod"))
+    service.respond("/api/jobs/job/job_deploy_request/pod", (200, {}, {"id": 123}))
+
+    result = create_or_update_dataset_job_and_deployment_send_http_request(
+        base_url=service.base_url,
+        api_key="key",
+        job_name="job",
+        run_type=DatasetType.INTENSITY.value,
+        job_deploy_request={"image": "image"},
+    )
+
+    assert result == {"id": 123}
+    assert [(method, path) for method, path, _, _ in service.requests] == \
+            [("POST", "/api/jobs/create_or_update"), ("GET", "/api/jobs/job/job_deploy_request/pod")]
@@ -0,0 +1,147 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from io import BytesIO
+from pathlib import Path
+import pandas as pd
+import pytest
+from pytest_mock import MockerFixture
+from md_dataset.storage import FileManager
+from md_dataset.telemetry import InMemoryCollector
+from md_dataset.telemetry import JsonFileExporter
+from md_dataset.telemetry import LogExporter
+from md_dataset.telemetry import Tracer
+from md_dataset.telemetry import exporters_from_env
+from md_dataset.telemetry import trace_span
+
+TRACE_ID = "0123456789abcdef0123456789abcdef"
+
+
+def test_trace_span_is_noop_without_tracer():
+    with trace_span("download", bytes=1) as span:
+        span.set_attribute("rows", 2)
+
+
+def test_spans_nest_and_carry_attributes():
+    collector = InMemoryCollector()
+    with Tracer([collector], trace_id=TRACE_ID), trace_span("load") as parent:
+        with trace_span("download", key="a") as child:
+            child.set_attribute("bytes", 10)
+        parent.set_attributes(rows=3)
+
+    child, parent = collector.spans
+    assert child.name == "download"
+    assert child.parent_span_id == parent.span_id
+    assert child.attributes == {"key": "a", "bytes": 10}
+    assert parent.parent_span_id is None
+    assert parent.attributes == {"rows": 3}
+    assert parent.end_time_ns >= child.end_time_ns >= child.start_time_ns
+    assert {span.trace_id for span in collector.spans} == {TRACE_ID}
+
+
+def test_span_parent_propagates_into_threads():
+    collector = InMemoryCollector()
+
+    def load() -> None:
+        with trace_span("download"):
+            pass
+
+    with Tracer([collector]), trace_span("load"), ThreadPoolExecutor(max_workers=2) as executor:
+        for future in [executor.submit(copy_context().run, load) for _ in range(2)]:
+            future.result()
+
+    downloads = [span for span in collector.spans if span.name == "download"]
+    load_span = next(span for span in collector.spans if span.name == "load")
+    assert len(downloads) == 2  # noqa: PLR2004
+    assert all(span.parent_span_id == load_span.span_id for span in downloads)
+
+
+def test_failed_span_is_exported_with_error_status():
+    collector = InMemoryCollector()
+    msg = "boom"
+    with pytest.raises(ValueError, match=msg), Tracer([collector]), trace_span("r_call"):
+        raise ValueError(msg)
+
+    assert collector.spans[0].status == "error"
+    assert collector.spans[0].attributes["error"] == "ValueError"
+
+
+def test_collector_renders_otlp():
+    collector = InMemoryCollector()
+    with Tracer([collector], trace_id=TRACE_ID), trace_span("load"), \
+            trace_span("upload", key="k", bytes=5, ratio=0.5, ok=True):
+        pass
+
+    otlp = collector.to_otlp()
+    resource_spans = otlp["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "md_dataset"}}]
+    upload, load = resource_spans["scopeSpans"][0]["spans"]
+    assert upload["traceId"] == TRACE_ID
+    assert upload["parentSpanId"] == load["spanId"]
+    assert "parentSpanId" not in load
+    assert upload["attributes"] == [
+        {"key": "key", "value": {"stringValue": "k"}},
+        {"key": "bytes", "value": {"intValue": "5"}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+        {"key": "ok", "value": {"boolValue": True}},
+    ]
+    assert upload["status"] == {"code": 1}
+    json.dumps(otlp)
+
+
+def test_json_file_exporter_writes_lines(tmp_path: Path):
+    path = tmp_path / "trace.jsonl"
+    with Tracer([JsonFileExporter(path)], trace_id=TRACE_ID):
+        with trace_span("parquet_encode", rows=2):
+            pass
+        with trace_span("upload", bytes=7):
+            pass
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["parquet_encode", "upload"]
+    assert lines[1]["attributes"] == {"bytes": 7}
+    assert lines[0]["trace_id"] == TRACE_ID
+
+
+def test_log_exporter_logs_duration(caplog: pytest.LogCaptureFixture):
+    with caplog.at_level(logging.INFO), Tracer([LogExporter()]), trace_span("csv_encode", rows=4):
+        pass
+
+    assert "Span csv_encode:" in caplog.text
+    assert "rows=4" in caplog.text
+
+
+def test_exporters_from_env(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("TRACE_EXPORTERS", raising=False)
+    assert exporters_from_env(TRACE_ID) == []
+
+    monkeypatch.setenv("TRACE_EXPORTERS", "log")
+    assert [type(exporter) for exporter in exporters_from_env(TRACE_ID)] == [LogExporter]
+
+    exporters = exporters_from_env(TRACE_ID, names="log, otel,json")
+    assert [type(exporter) for exporter in exporters] == [LogExporter, InMemoryCollector, JsonFileExporter]
+    assert exporters[2].path.name == f"{TRACE_ID}.jsonl"
+    assert exporters_from_env(TRACE_ID, names="") == []
+
+
+def test_file_manager_spans(mocker: MockerFixture):
+    client = mocker.Mock()
+    file_manager = FileManager(client, default_bucket="default-bucket")
+    test_df = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+    content = BytesIO()
+    test_df.to_parquet(content, engine="pyarrow")
+    client.download_fileobj.side_effect = lambda _bucket, _key, fileobj: fileobj.write(content.getvalue())
+
+    collector = InMemoryCollector()
+    with Tracer([collector]):
+        file_manager.load_parquet_to_df(bucket="bucket", key="in.parquet")
+        file_manager.save_tables([("out.parquet", test_df)])
+
+    spans = {(span.name, span.attributes["key"]): span.attributes for span in collector.spans}
+    assert spans["download", "in.parquet"]["bytes"] == len(content.getvalue())
+    assert spans["parquet_decode", "in.parquet"]["rows"] == len(test_df)
+    assert spans["parquet_encode", "out.parquet"]["rows"] == len(test_df)
+    assert spans["csv_encode", "out.csv"]["bytes"] == len(test_df.to_csv(index=False))
+    assert spans["upload", "out.parquet"]["bytes"] == spans["parquet_encode", "out.parquet"]["bytes"]
+    assert spans["upload", "out.csv"]["bytes"] == spans["csv_encode", "out.csv"]["bytes"]
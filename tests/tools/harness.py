@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from contextlib import contextmanager
 from unittest.mock import MagicMock
 from unittest.mock import patch
@@ -20,3 +21,18 @@ def md_dataset_test_harness():
 
     with patch("md_dataset.process.get_file_manager", return_value=mock_fm):
         yield mock_fm, saved
+
+
+def load_by_key(frames: dict[str, pd.DataFrame]) -> Callable:
+    """Side effect for `load_parquet_to_df` returning the frame stored under each key.
+
+    Tables are loaded concurrently, so frames are looked up by key rather than call order.
+    """
+    def load(bucket: str, key: str) -> pd.DataFrame:  # noqa: ARG001
+        return frames[key]
+    return load
+
+
+def saved_tables(file_manager: MagicMock) -> dict[str, pd.DataFrame]:
+    """All (path, DataFrame) pairs passed to `save_tables`, across the per-table save calls."""
+    return {path: df for call in file_manager.save_tables.call_args_list for path, df in call.args[0]}